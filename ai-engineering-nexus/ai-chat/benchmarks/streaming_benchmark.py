@@ -0,0 +1,105 @@
+"""
+Messages/sec and CPU per stream with token coalescing on and off.
+
+Simulates many concurrent model streams (a token every --gap-ms per
+stream) and sends each message as a WebSocket text frame written to a
+real socket, one send() per message, drained by a reader thread. The
+"off" run is the old /ws1 path: one json.dumps() (as send_json does) and
+one frame per token. The others coalesce with the given flush windows
+and encode with content_message().
+
+Usage (from the ai-chat directory):
+    python -m benchmarks.streaming_benchmark
+    python -m benchmarks.streaming_benchmark --streams 500 --flush-ms 10 30 100
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import struct
+import threading
+import time
+
+from streaming import START_MESSAGE, coalesce, content_message
+
+
+async def fake_model_stream(tokens: int, gap: float):
+    for i in range(tokens):
+        await asyncio.sleep(gap)
+        yield f" tok{i % 10}"
+    yield None  # final chunk of an OpenAI stream has no content
+
+
+def send_frame(sock: socket.socket, message: str) -> None:
+    """Write one unmasked RFC 6455 text frame, as the server side does"""
+    payload = message.encode()
+    if len(payload) < 126:
+        header = struct.pack("!BB", 0x81, len(payload))
+    else:
+        header = struct.pack("!BBH", 0x81, 126, len(payload))
+    sock.send(header + payload)
+
+
+async def run_stream(sock: socket.socket, tokens: int, gap: float, flush_ms: float, max_bytes: int) -> int:
+    sent = 1
+    send_frame(sock, START_MESSAGE)
+    stream = fake_model_stream(tokens, gap)
+    if flush_ms <= 0:
+        async for token in stream:
+            message = json.dumps({"type": "content", "data": token}, separators=(",", ":"), ensure_ascii=False)
+            send_frame(sock, message)
+            sent += 1
+        return sent
+    async for chunk in coalesce(stream, flush_ms, max_bytes):
+        send_frame(sock, content_message(chunk))
+        sent += 1
+    return sent
+
+
+def drain(sock: socket.socket) -> None:
+    while sock.recv(1 << 16):
+        pass
+
+
+async def measure(label: str, args, flush_ms: float) -> None:
+    writer, reader = socket.socketpair()
+    drainer = threading.Thread(target=drain, args=(reader,), daemon=True)
+    drainer.start()
+
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    sent = await asyncio.gather(
+        *(run_stream(writer, args.tokens, args.gap_ms / 1000, flush_ms, args.max_bytes) for _ in range(args.streams))
+    )
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    writer.close()
+    drainer.join()
+    reader.close()
+
+    messages = sum(sent)
+    print(
+        f"{label:<12} {messages:>10} {messages / wall:>12.0f} "
+        f"{args.streams * args.tokens / messages:>11.1f} {cpu / args.streams * 1000:>15.2f}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--streams", type=int, default=300)
+    parser.add_argument("--tokens", type=int, default=200, help="tokens per stream")
+    parser.add_argument("--gap-ms", type=float, default=10.0, help="time between tokens")
+    parser.add_argument("--flush-ms", type=float, nargs="+", default=[30.0, 100.0])
+    parser.add_argument("--max-bytes", type=int, default=512)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12} {'messages':>10} {'messages/s':>12} {'tokens/msg':>11} {'CPU/stream (ms)':>15}")
+    await measure("off", args, 0)
+    for flush_ms in args.flush_ms:
+        await measure(f"{flush_ms:g}ms", args, flush_ms)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
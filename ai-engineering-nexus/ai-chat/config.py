@@ -5,6 +5,37 @@ class Settings(BaseSettings):
     google_api_key: str 
     openrouter_api_key: str
     default_model: str = "gemini-2.5-flash"
+    # Token micro-batching for /ws1 and /ask/stream: flush buffered tokens
+    # after this many ms or once they take this many bytes to send
+    # (non-ASCII text is sent \u-escaped, 6 bytes per character).
+    # stream_flush_ms = 0 sends every token as its own message.
+    stream_flush_ms: float = 30.0
+    stream_flush_bytes: int = 512
+    # Connection pools of the LLM providers (see models.ProviderRegistry)
+    gemini_max_connections: int = 100
+    gemini_max_keepalive: int = 20
+    openrouter_max_connections: int = 50
+    openrouter_max_keepalive: int = 10
+    provider_keepalive_expiry: float = 120.0
+    provider_ping_interval: float = 60.0
+    # Opt-in cache of answers (see response_cache.cache.ResponseCache). A
+    # similarity of 0 keeps only exact matches of the normalized question;
+    # above 0 also near-duplicates with the same key words are replayed
+    response_cache_enabled: bool = False
+    response_cache_ttl: float = 3600.0
+    response_cache_size: int = 1000
+    response_cache_similarity: float = 0.0
+    # Opt-in hedging (see hedging.Hedger): also ask the other provider when
+    # the first one is slower than its recent hedge_percentile TTFB, and
+    # fail over to it on errors before the first token
+    hedge_enabled: bool = False
+    hedge_percentile: float = 95.0
+    hedge_min_delay: float = 0.2
+    hedge_max_delay: float = 5.0
+    hedge_default_delay: float = 1.0
+    # Opt-in: seconds a losing primary keeps running so /metrics/hedging
+    # can report the TTFT saved; 0 cancels it as soon as it loses
+    hedge_measure_for: float = 0.0
 
     model_config = SettingsConfigDict(env_file="../../.env", extra="ignore")
 
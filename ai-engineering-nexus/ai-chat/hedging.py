@@ -0,0 +1,225 @@
+import asyncio
+import collections
+import logging
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger("uvicorn")
+
+TokenStream = AsyncIterator[Optional[str]]
+# Provider name and a function that starts its token stream
+Candidate = Tuple[str, Callable[[], TokenStream]]
+
+
+async def _first_token(tokens: TokenStream) -> Tuple[Optional[str], float]:
+    """First non-empty token (None for an empty answer) and when it arrived"""
+    async for token in tokens:
+        if token:
+            return token, time.perf_counter()
+    return None, time.perf_counter()
+
+
+class _Attempt:
+    """One provider's stream, raced up to its first token"""
+
+    __slots__ = ("name", "tokens", "task")
+
+    def __init__(self, name: str, start: Callable[[], TokenStream]):
+        self.name = name
+        self.tokens = start()
+        self.task = asyncio.create_task(_first_token(self.tokens))
+
+    async def close(self) -> None:
+        if not self.task.done():
+            self.task.cancel()
+        try:
+            await self.task
+        except BaseException:
+            pass
+        await self.tokens.aclose()
+
+
+class HedgeStats:
+    """Who won the races, and what it did to time to first token"""
+
+    def __init__(self):
+        self.requests = 0
+        self.hedged = 0  # secondary launched because the primary was slow
+        self.failovers = 0  # secondary launched because the primary failed
+        self.failures = 0  # no provider produced a first token
+        self.wins: Dict[str, int] = collections.Counter()
+        self.secondary_wins = 0
+        self.ttft = collections.deque(maxlen=1024)  # seconds, served requests
+        # Primary TTFT minus served TTFT, measured on secondary wins
+        self.saved = collections.deque(maxlen=1024)
+        self.saved_censored = 0  # primary still silent when measuring gave up
+
+    def metrics(self) -> dict:
+        won = sum(self.wins.values())
+        ttft = sorted(self.ttft)
+        saved = list(self.saved)
+
+        def percentile_ms(percent):
+            return ttft[min(len(ttft) - 1, int(len(ttft) * percent / 100))] * 1000 if ttft else None
+
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "failovers": self.failovers,
+            "failures": self.failures,
+            "wins": dict(self.wins),
+            "win_rate": {name: wins / won for name, wins in self.wins.items()},
+            "hedge_win_rate": self.secondary_wins / (self.hedged + self.failovers) if self.hedged + self.failovers else 0.0,
+            "ttft_p50_ms": percentile_ms(50),
+            "ttft_p95_ms": percentile_ms(95),
+            "ttft_saved_avg_ms": sum(saved) / len(saved) * 1000 if saved else None,
+            "ttft_saved_samples": len(saved),
+            "ttft_saved_censored": self.saved_censored,
+        }
+
+
+class Hedger:
+    """
+    Hedged requests with failover across two providers.
+
+    The primary provider is asked first. If it hasn't produced a first
+    token after `delay` seconds (derived from its recent TTFB percentile,
+    which counts primaries cancelled by a hedge at their elapsed time),
+    the same question goes to the secondary too, and whichever answers
+    first is streamed while the other is cancelled. An error before the
+    first token fails over to the secondary at once; once a token has
+    been sent, errors reach the caller as before.
+
+    Measuring the TTFT saved by hedging is opt-in: with `measure_for`
+    set, a primary that lost to the secondary is kept alive (for at most
+    that many seconds) until its own first token, so the saving is
+    measured instead of guessed. That keeps paying for the primary's
+    request, so by default the loser is cancelled at once.
+
+    Example:
+        >>> hedger = Hedger(percentile=95)
+        >>> delay = hedger.delay(provider.ttfb_percentile(hedger.percentile))
+        >>> tokens = hedger.stream(("gemini", start_gemini), ("openrouter", start_openrouter), delay)
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        min_delay: float = 0.2,
+        max_delay: float = 5.0,
+        default_delay: float = 1.0,
+        measure_for: float = 0.0,
+    ):
+        """
+        Args:
+            percentile: Primary TTFB percentile after which to hedge
+            min_delay: Shortest hedge delay, so a fast primary isn't
+                doubled on every request
+            max_delay: Longest hedge delay
+            default_delay: Hedge delay before the primary has any TTFB
+                samples
+            measure_for: Seconds a losing primary may keep running to
+                measure the TTFT saved; 0 (the default) cancels it
+                immediately and leaves ttft_saved unmeasured
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.default_delay = default_delay
+        self.measure_for = measure_for
+        self.stats = HedgeStats()
+        self._measuring: Set[asyncio.Task] = set()
+
+    def delay(self, ttfb: Optional[float]) -> float:
+        """Hedge delay for a primary with this TTFB percentile"""
+        if ttfb is None:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, ttfb))
+
+    async def stream(
+        self,
+        primary: Candidate,
+        secondary: Optional[Candidate],
+        delay: float,
+    ) -> TokenStream:
+        """Token stream of whichever candidate produces a first token first"""
+        stats = self.stats
+        stats.requests += 1
+        started = time.perf_counter()
+        first = _Attempt(*primary)
+        racing: List[_Attempt] = [first]
+        winner: Optional[_Attempt] = None
+        error: Optional[BaseException] = None
+        try:
+            while winner is None:
+                timeout = None
+                if secondary is not None:
+                    timeout = max(0.0, started + delay - time.perf_counter())
+                done, _ = await asyncio.wait(
+                    [attempt.task for attempt in racing],
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    stats.hedged += 1
+                    racing.append(_Attempt(*secondary))
+                    secondary = None
+                    continue
+                for attempt in [attempt for attempt in racing if attempt.task.done()]:
+                    racing.remove(attempt)
+                    error = attempt.task.exception()
+                    if error is None:
+                        winner = attempt
+                        break
+                    logger.warning(f"{attempt.name} failed before its first token: {error}")
+                    await attempt.tokens.aclose()
+                if winner is None and not racing:
+                    if secondary is None:
+                        stats.failures += 1
+                        raise error
+                    stats.failovers += 1
+                    racing.append(_Attempt(*secondary))
+                    secondary = None
+
+            token, arrived = winner.task.result()
+            ttft = arrived - started
+            stats.ttft.append(ttft)
+            stats.wins[winner.name] += 1
+            if winner is not first:
+                stats.secondary_wins += 1
+            losers, racing = racing, []
+            for loser in losers:
+                if loser is first and self.measure_for > 0:
+                    task = asyncio.create_task(self._measure(loser, started, ttft))
+                    self._measuring.add(task)
+                    task.add_done_callback(self._measuring.discard)
+                else:
+                    await loser.close()
+
+            if token is not None:
+                yield token
+            async for token in winner.tokens:
+                yield token
+        finally:
+            for attempt in racing:
+                await attempt.close()
+            if winner is not None:
+                await winner.tokens.aclose()
+
+    async def _measure(self, primary: _Attempt, started: float, ttft: float) -> None:
+        """Wait for the losing primary's first token, then cancel it"""
+        try:
+            done, _ = await asyncio.wait([primary.task], timeout=self.measure_for)
+            if not done:
+                self.stats.saved_censored += 1
+            elif primary.task.exception() is None:
+                _, arrived = primary.task.result()
+                self.stats.saved.append(arrived - started - ttft)
+        finally:
+            await primary.close()
+
+    async def aclose(self) -> None:
+        """Cancel primaries still being measured"""
+        for task in list(self._measuring):
+            task.cancel()
+        await asyncio.gather(*self._measuring, return_exceptions=True)
@@ -1,14 +1,58 @@
 import asyncio
+from contextlib import asynccontextmanager
 from typing import List
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse
 from fastapi.responses import StreamingResponse
 import json
-from models import get_model_stream
+from response_cache.cache import ResponseCache
+from config import settings
+from hedging import Hedger
+from models import ProviderRegistry, get_hedged_stream, get_model_stream
+from streaming import START_MESSAGE, END_MESSAGE, coalesce, content_message, sse_event
 import logging
 logger = logging.getLogger("uvicorn") # Hooks into FastAPI's default logger
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled, pre-warmed client per provider for the whole process
+    providers = ProviderRegistry.from_settings(settings)
+    await providers.start()
+    app.state.providers = providers
+    app.state.response_cache = ResponseCache(
+        ttl=settings.response_cache_ttl,
+        max_entries=settings.response_cache_size,
+        similarity=settings.response_cache_similarity or None,
+    ) if settings.response_cache_enabled else None
+    app.state.hedger = Hedger(
+        percentile=settings.hedge_percentile,
+        min_delay=settings.hedge_min_delay,
+        max_delay=settings.hedge_max_delay,
+        default_delay=settings.hedge_default_delay,
+        measure_for=settings.hedge_measure_for,
+    ) if settings.hedge_enabled else None
+    yield
+    if app.state.hedger is not None:
+        await app.state.hedger.aclose()
+    await providers.aclose()
+
+app = FastAPI(lifespan=lifespan)
+
+def model_tokens(app: FastAPI, model: str, question: str):
+    """Token stream for a question, from the response cache when enabled"""
+    providers = app.state.providers
+    cache = app.state.response_cache
+    hedger = app.state.hedger
+
+    def generate():
+        if hedger is not None:
+            return get_hedged_stream(providers, hedger, model, question)
+        return get_model_stream(providers, model, question)
+
+    if cache is None:
+        return generate()
+    _, model = providers.resolve(model)
+    return cache.stream(model, question, generate)
 
 running_tasks = {}
 
@@ -81,23 +125,40 @@ async def get():
 #     except WebSocketDisconnect:
 #         logger.error(f"Client Disconnected!")
 
+@app.get("/metrics/providers")
+async def provider_metrics(request: Request):
+    # Pool saturation and time-to-first-byte per provider
+    return request.app.state.providers.metrics()
+
+@app.get("/metrics/cache")
+async def cache_metrics(request: Request):
+    # Hit rates and model time saved by the response cache
+    cache = request.app.state.response_cache
+    return cache.stats() if cache is not None else {"enabled": False}
+
+@app.get("/metrics/hedging")
+async def hedging_metrics(request: Request):
+    # Win rates per provider and time to first token saved by hedging
+    hedger = request.app.state.hedger
+    return hedger.stats.metrics() if hedger is not None else {"enabled": False}
+
 @app.post("/ask/stream")
-async def ask_stream(payload: dict):
+async def ask_stream(payload: dict, request: Request):
     # 1. Extract data
     question = payload.get("question")
     model = payload.get("model", "gemini-2.5-flash")
 
     # 2. Define the SSE wrapper
     async def sse_wrapper():
-        # Reuse your model logic
-        async for token in get_model_stream(model, question):
+        # Reuse your model logic, several tokens per event
+        tokens = model_tokens(request.app, model, question)
+        async for chunk in coalesce(tokens, settings.stream_flush_ms, settings.stream_flush_bytes):
             # SSE requirement: 'data: <payload>\n\n'
             # We send JSON to match our WebSocket format
-            message = json.dumps({"type": "content", "data": token})
-            yield f"data: {message}\n\n"
+            yield sse_event(content_message(chunk))
         
         # Signal completion
-        yield f"data: {json.dumps({'type': 'end'})}\n\n"
+        yield sse_event(END_MESSAGE)
 
     # 3. Return the stream
     return StreamingResponse(sse_wrapper(), media_type="text/event-stream")
@@ -126,10 +187,13 @@ async def process_ai_response(websocket, question):
         model = "gemini-2.5-flash"
         question = question
     try:
-        await websocket.send_json({"type": "start"})
-        async for token in get_model_stream(model, question):
-            await websocket.send_json({"type": "content", "data": token})
+        await websocket.send_text(START_MESSAGE)
+        tokens = model_tokens(websocket.app, model, question)
+        async for chunk in coalesce(tokens, settings.stream_flush_ms, settings.stream_flush_bytes):
+            await websocket.send_text(content_message(chunk))
     except Exception as e:
+        # With hedging on, this means every provider failed
+        logger.warning(f"Answer failed: {e}")
         await websocket.send_json({"type": "error", "data": "AI is sleepy. Try again!"})
 
 @app.websocket("/ws1")
@@ -1,40 +1,211 @@
-import os
-from dotenv import load_dotenv
-from openai import OpenAI, AsyncOpenAI
-from config import settings
-
-gemini_api_key = settings.google_api_key
-openrouter_api_key = settings.openrouter_api_key
-
-gemini = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
-)
-
-openai = AsyncOpenAI(
-    api_key=openrouter_api_key,
-    base_url="https://openrouter.ai/api/v1"
-)
-
-async def get_model_stream(model: str, question: str):
-    if model not in ["gemini-2.5-flash", "openai/gpt-oss-20b:free"]:
-        model = settings.default_model
-    if model == "gemini-2.5-flash":
-        response = await gemini.chat.completions.create(
-            model=model,
-            messages=[
-                {   "role": "system",
-                    "content": "You are a helpful assistant."
-                },
-                {
-                    "role": "user",
-                    "content": f"Answer this question: {question}"
-                }
+import asyncio
+import collections
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+from hedging import Hedger
+
+logger = logging.getLogger("uvicorn")
+
+try:
+    import h2  # noqa: F401  (httpx only speaks HTTP/2 with it installed)
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+
+@dataclass
+class ProviderConfig:
+    """Connection settings of one OpenAI-compatible provider"""
+    name: str
+    base_url: str
+    api_key: str
+    models: Tuple[str, ...]
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 120.0  # keep idle TLS connections this long
+    timeout: float = 60.0
+    ping_interval: float = 60.0  # ping after this long idle; 0 disables
+
+
+class Provider:
+    """One provider's pooled client plus its load and latency numbers"""
+
+    def __init__(self, config: ProviderConfig):
+        self.config = config
+        self.name = config.name
+        self.http_client = httpx.AsyncClient(
+            http2=HTTP2,
+            timeout=httpx.Timeout(config.timeout, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+        )
+        self.client = AsyncOpenAI(
+            api_key=config.api_key,
+            base_url=config.base_url,
+            http_client=self.http_client,
+        )
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.ttfb = collections.deque(maxlen=1024)  # seconds, most recent requests
+        self.last_used = time.monotonic()
+        self._pinger: Optional[asyncio.Task] = None
+
+    def acquire(self) -> float:
+        """Count a request as started; returns its start time"""
+        self.in_flight += 1
+        self.requests += 1
+        if self.in_flight > self.peak_in_flight:
+            self.peak_in_flight = self.in_flight
+        self.last_used = time.monotonic()
+        return time.perf_counter()
+
+    def release(self, failed: bool = False) -> None:
+        self.in_flight -= 1
+        if failed:
+            self.errors += 1
+        self.last_used = time.monotonic()
+
+    def observe_ttfb(self, seconds: float) -> None:
+        """Record a TTFB, or a lower bound of one for an abandoned request"""
+        self.ttfb.append(seconds)
+
+    def ttfb_percentile(self, percent: float) -> Optional[float]:
+        """Time to first byte over recent requests, None before any"""
+        if not self.ttfb:
+            return None
+        ordered = sorted(self.ttfb)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    async def ping(self) -> None:
+        """Cheap authenticated request that opens (or reuses) a connection"""
+        try:
+            await self.client.models.list()
+        except Exception as e:
+            logger.warning(f"Warm-up ping to {self.name} failed: {e}")
+
+    async def _keep_warm(self) -> None:
+        interval = self.config.ping_interval
+        while True:
+            await asyncio.sleep(interval)
+            if time.monotonic() - self.last_used >= interval:
+                await self.ping()
+
+    async def start(self) -> None:
+        await self.ping()
+        if self.config.ping_interval > 0:
+            self._pinger = asyncio.create_task(self._keep_warm())
+
+    async def aclose(self) -> None:
+        if self._pinger is not None:
+            self._pinger.cancel()
+        await self.http_client.aclose()
+
+    def metrics(self) -> dict:
+        p50, p95 = self.ttfb_percentile(50), self.ttfb_percentile(95)
+        return {
+            "http2": HTTP2,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "max_connections": self.config.max_connections,
+            "pool_saturation": self.in_flight / self.config.max_connections,
+            "requests": self.requests,
+            "errors": self.errors,
+            "ttfb_p50_ms": p50 * 1000 if p50 is not None else None,
+            "ttfb_p95_ms": p95 * 1000 if p95 is not None else None,
+        }
+
+
+class ProviderRegistry:
+    """
+    Providers by name and by the models they serve.
+
+    Created once in the app lifespan: every provider keeps its own tuned
+    connection pool (HTTP/2 when h2 is installed) for the life of the
+    process, is pinged at startup so the first user doesn't pay for the
+    TLS handshake, and is pinged again after idle periods so its
+    connections stay open.
+    """
+
+    def __init__(self, configs: List[ProviderConfig], default_model: str):
+        self.providers: Dict[str, Provider] = {}
+        self.models: Dict[str, Provider] = {}
+        for config in configs:
+            provider = self.providers[config.name] = Provider(config)
+            for model in config.models:
+                self.models[model] = provider
+        self.default_model = default_model
+
+    @classmethod
+    def from_settings(cls, settings) -> "ProviderRegistry":
+        return cls(
+            [
+                ProviderConfig(
+                    name="gemini",
+                    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+                    api_key=settings.google_api_key,
+                    models=("gemini-2.5-flash",),
+                    max_connections=settings.gemini_max_connections,
+                    max_keepalive_connections=settings.gemini_max_keepalive,
+                    keepalive_expiry=settings.provider_keepalive_expiry,
+                    ping_interval=settings.provider_ping_interval,
+                ),
+                ProviderConfig(
+                    name="openrouter",
+                    base_url="https://openrouter.ai/api/v1",
+                    api_key=settings.openrouter_api_key,
+                    models=("openai/gpt-oss-20b:free",),
+                    max_connections=settings.openrouter_max_connections,
+                    max_keepalive_connections=settings.openrouter_max_keepalive,
+                    keepalive_expiry=settings.provider_keepalive_expiry,
+                    ping_interval=settings.provider_ping_interval,
+                ),
             ],
-            stream = True
+            default_model=settings.default_model,
         )
-    else:
-        response = await openai.chat.completions.create(
+
+    def resolve(self, model: str) -> Tuple[Provider, str]:
+        """Provider serving model, falling back to the default model"""
+        provider = self.models.get(model)
+        if provider is None:
+            model = self.default_model
+            provider = self.models[model]
+        return provider, model
+
+    def alternate(self, provider: Provider) -> Optional[Tuple[Provider, str]]:
+        """Another provider, and the model to ask it, to hedge or fail over to"""
+        for other in self.providers.values():
+            if other is not provider and other.config.models:
+                return other, other.config.models[0]
+        return None
+
+    async def start(self) -> None:
+        await asyncio.gather(*(provider.start() for provider in self.providers.values()))
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(provider.aclose() for provider in self.providers.values()))
+
+    def metrics(self) -> dict:
+        return {name: provider.metrics() for name, provider in self.providers.items()}
+
+
+async def get_model_stream(providers: ProviderRegistry, model: str, question: str):
+    provider, model = providers.resolve(model)
+    started = provider.acquire()
+    failed = False
+    first = True
+    response = None
+    try:
+        response = await provider.client.chat.completions.create(
             model=model,
             messages=[
                 {   "role": "system",
@@ -47,6 +218,39 @@ async def get_model_stream(model: str, question: str):
             ],
             stream = True
         )
-    async for chunk in response:
-        if chunk:
-            yield chunk.choices[0].delta.content
\ No newline at end of file
+        async for chunk in response:
+            if first:
+                provider.observe_ttfb(time.perf_counter() - started)
+                first = False
+            if chunk:
+                yield chunk.choices[0].delta.content
+    except Exception:
+        failed = True
+        raise
+    finally:
+        if first and not failed:
+            # Cancelled before its first chunk, e.g. a primary that lost a
+            # hedge race: its TTFB is at least this long. Dropping these
+            # would leave out exactly the slowest requests and bias the
+            # hedge percentile low
+            provider.observe_ttfb(time.perf_counter() - started)
+        # Hand the connection back to the pool even when the consumer
+        # stopped early (client disconnect, lost hedge)
+        if response is not None:
+            await response.close()
+        provider.release(failed)
+
+
+def get_hedged_stream(providers: ProviderRegistry, hedger: Hedger, model: str, question: str):
+    """get_model_stream() raced against the same question on another provider"""
+    provider, model = providers.resolve(model)
+    alternate = providers.alternate(provider)
+    secondary = None
+    if alternate is not None:
+        other, other_model = alternate
+        secondary = (other.name, lambda: get_model_stream(providers, other_model, question))
+    return hedger.stream(
+        (provider.name, lambda: get_model_stream(providers, model, question)),
+        secondary,
+        hedger.delay(provider.ttfb_percentile(hedger.percentile)),
+    )
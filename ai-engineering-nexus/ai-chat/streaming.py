@@ -0,0 +1,115 @@
+import asyncio
+import json
+from typing import AsyncIterator, List, Optional
+
+# One shared C-accelerated string encoder instead of a json.dumps() call
+# (and a throwaway dict) per message. Output matches json.dumps().
+_encode_string = json.encoder.encode_basestring_ascii
+
+START_MESSAGE = json.dumps({"type": "start"})
+END_MESSAGE = json.dumps({"type": "end"})
+
+
+def content_message(text: str) -> str:
+    """JSON for {"type": "content", "data": text}, same as json.dumps()"""
+    return '{"type": "content", "data": ' + _encode_string(text) + "}"
+
+
+def sse_event(message: str) -> str:
+    """Frame a JSON message as one Server-Sent Event"""
+    return f"data: {message}\n\n"
+
+
+async def coalesce(
+    tokens: AsyncIterator[Optional[str]],
+    flush_ms: float = 30.0,
+    max_bytes: int = 512,
+) -> AsyncIterator[str]:
+    """
+    Group a token stream into fewer, larger chunks.
+
+    A chunk is flushed `flush_ms` after its first token arrived or as soon
+    as it would take `max_bytes` bytes to send, whichever comes first, so
+    each client message (and send syscall) carries many tokens while the
+    added latency stays bounded. Empty and None tokens are dropped.
+    Sizes are counted as content_message() sends them, with non-ASCII
+    characters escaped to \\uXXXX (6 bytes, 12 outside the BMP).
+
+    Tokens are read by a separate task, so a slow upstream never holds
+    back a chunk that is due. If the upstream raises, what was buffered
+    is flushed first and the exception is re-raised.
+
+    Args:
+        tokens: Upstream token stream, e.g. get_model_stream()
+        flush_ms: Longest time a token waits in the buffer; 0 disables
+            coalescing and passes tokens through one by one
+        max_bytes: Buffered bytes, as sent, that trigger an early flush
+    """
+    if flush_ms <= 0:
+        async for token in tokens:
+            if token:
+                yield token
+        return
+
+    loop = asyncio.get_running_loop()
+    flush_after = flush_ms / 1000
+    buffer: List[str] = []
+    size = 0
+    first_at = 0.0
+    finished = False
+    # Resolved when the consumer should look at the buffer again; one
+    # future (plus one timer) per chunk keeps the per-chunk cost low
+    waiter: Optional[asyncio.Future] = None
+
+    def wake():
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def pump():
+        nonlocal size, first_at, finished
+        try:
+            async for token in tokens:
+                if not token:
+                    continue
+                buffer.append(token)
+                # The escaped text minus the quotes around it
+                size += len(_encode_string(token)) - 2
+                if len(buffer) == 1:
+                    first_at = loop.time()
+                    wake()
+                elif size >= max_bytes:
+                    wake()
+        finally:
+            finished = True
+            wake()
+
+    producer = asyncio.create_task(pump())
+    try:
+        while True:
+            if not buffer and not finished:
+                waiter = loop.create_future()
+                await waiter
+            if buffer and not finished and size < max_bytes:
+                waiter = loop.create_future()
+                timer = loop.call_at(first_at + flush_after, wake)
+                try:
+                    await waiter
+                finally:
+                    timer.cancel()
+            waiter = None
+            if buffer:
+                chunk = "".join(buffer)
+                buffer.clear()
+                size = 0
+                yield chunk
+            elif finished:
+                break
+        # Surface an upstream failure once everything before it was sent
+        producer.result()
+    finally:
+        if not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,112 @@
+import asyncio
+import pytest
+from hedging import Hedger
+
+
+def provider(name, closed, delay=0.0, tokens=("Hello", " world"), error=None):
+    """Candidate whose stream answers after delay, or fails, and records its close"""
+
+    async def tokens_stream():
+        try:
+            await asyncio.sleep(delay)
+            if error is not None:
+                raise error
+            for token in tokens:
+                yield token
+            yield None
+        finally:
+            closed.append(name)
+
+    return name, tokens_stream
+
+
+async def collect(stream):
+    return "".join([token async for token in stream if token])
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    hedger, closed = Hedger(), []
+    started = []
+
+    def secondary():
+        started.append(1)
+        return provider("b", closed)[1]()
+
+    text = await collect(hedger.stream(provider("a", closed), ("b", secondary), delay=0.2))
+
+    assert text == "Hello world"
+    assert started == []
+    assert hedger.stats.metrics()["hedged"] == 0
+    assert hedger.stats.wins == {"a": 1}
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled():
+    hedger, closed = Hedger(), []
+
+    text = await collect(hedger.stream(
+        provider("a", closed, delay=1.0, tokens=("slow",)),
+        provider("b", closed, delay=0.01),
+        delay=0.05,
+    ))
+
+    assert text == "Hello world"
+    assert sorted(closed) == ["a", "b"]  # the loser was cancelled, not left running
+    metrics = hedger.stats.metrics()
+    assert metrics["hedged"] == 1
+    assert metrics["wins"] == {"b": 1}
+    assert metrics["hedge_win_rate"] == 1.0
+    assert metrics["ttft_saved_samples"] == 0  # measuring is opt-in
+
+
+@pytest.mark.asyncio
+async def test_error_before_first_token_fails_over():
+    hedger, closed = Hedger(), []
+
+    text = await collect(hedger.stream(
+        provider("a", closed, error=ConnectionError("refused")),
+        provider("b", closed),
+        delay=5.0,
+    ))
+
+    assert text == "Hello world"
+    metrics = hedger.stats.metrics()
+    assert metrics["failovers"] == 1
+    assert metrics["hedged"] == 0
+    assert metrics["wins"] == {"b": 1}
+
+
+@pytest.mark.asyncio
+async def test_both_providers_failing_raises():
+    hedger, closed = Hedger(), []
+
+    with pytest.raises(ConnectionError, match="second"):
+        await collect(hedger.stream(
+            provider("a", closed, error=ConnectionError("first")),
+            provider("b", closed, error=ConnectionError("second")),
+            delay=5.0,
+        ))
+
+    assert sorted(closed) == ["a", "b"]
+    assert hedger.stats.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_measure_for_records_ttft_saved():
+    hedger, closed = Hedger(measure_for=1.0), []
+
+    text = await collect(hedger.stream(
+        provider("a", closed, delay=0.15),
+        provider("b", closed),
+        delay=0.05,
+    ))
+    assert text == "Hello world"
+    assert "a" not in closed  # still running until its first token
+
+    await asyncio.sleep(0.2)
+    metrics = hedger.stats.metrics()
+    assert "a" in closed
+    assert metrics["ttft_saved_samples"] == 1
+    assert metrics["ttft_saved_avg_ms"] > 50
+    await hedger.aclose()
@@ -0,0 +1,128 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from models import ProviderConfig, ProviderRegistry, get_model_stream
+
+
+def make_registry():
+    return ProviderRegistry(
+        [
+            ProviderConfig(name="gemini", base_url="http://gemini.test", api_key="key", models=("gemini-2.5-flash",)),
+            ProviderConfig(name="openrouter", base_url="http://openrouter.test", api_key="key", models=("gpt-oss",)),
+        ],
+        default_model="gemini-2.5-flash",
+    )
+
+
+class FakeResponse:
+    """Streamed completion that records whether it was closed"""
+
+    def __init__(self, tokens, error=None, delay=0.0):
+        self.tokens = tokens
+        self.error = error
+        self.delay = delay
+        self.closed = False
+
+    async def __aiter__(self):
+        await asyncio.sleep(self.delay)
+        for token in self.tokens:
+            await asyncio.sleep(0)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+        if self.error is not None:
+            raise self.error
+
+    async def close(self):
+        self.closed = True
+
+
+def serve(provider, response):
+    async def create(**kwargs):
+        return response
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+@pytest.mark.asyncio
+async def test_resolve_and_alternate():
+    providers = make_registry()
+    gemini, openrouter = providers.providers["gemini"], providers.providers["openrouter"]
+    try:
+        assert providers.resolve("gpt-oss") == (openrouter, "gpt-oss")
+        assert providers.resolve("unknown-model") == (gemini, "gemini-2.5-flash")
+        assert providers.alternate(gemini) == (openrouter, "gpt-oss")
+        assert providers.alternate(openrouter) == (gemini, "gemini-2.5-flash")
+    finally:
+        await providers.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_counts_the_request_and_its_ttfb():
+    providers = make_registry()
+    gemini = providers.providers["gemini"]
+    response = FakeResponse(["Hel", "lo"])
+    serve(gemini, response)
+    try:
+        tokens = [token async for token in get_model_stream(providers, "gemini-2.5-flash", "Hi")]
+
+        assert tokens == ["Hel", "lo"]
+        assert response.closed
+        assert gemini.requests == 1 and gemini.in_flight == 0 and gemini.errors == 0
+        assert gemini.ttfb_percentile(50) is not None
+    finally:
+        await providers.aclose()
+
+
+@pytest.mark.asyncio
+async def test_response_is_closed_when_the_consumer_stops_early():
+    providers = make_registry()
+    gemini = providers.providers["gemini"]
+    response = FakeResponse(["a", "b", "c"])
+    serve(gemini, response)
+    try:
+        stream = get_model_stream(providers, "gemini-2.5-flash", "Hi")
+        assert await stream.__anext__() == "a"
+        await stream.aclose()
+
+        assert response.closed
+        assert gemini.in_flight == 0
+    finally:
+        await providers.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failed_stream_is_closed_and_counted():
+    providers = make_registry()
+    gemini = providers.providers["gemini"]
+    response = FakeResponse(["a"], error=RuntimeError("connection reset"))
+    serve(gemini, response)
+    try:
+        with pytest.raises(RuntimeError):
+            async for _ in get_model_stream(providers, "gemini-2.5-flash", "Hi"):
+                pass
+
+        assert response.closed
+        assert gemini.errors == 1 and gemini.in_flight == 0
+    finally:
+        await providers.aclose()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_stream_records_a_lower_bound_ttfb():
+    # A primary that loses a hedge race is cancelled before its first
+    # chunk; leaving it out would bias the TTFB percentile low
+    providers = make_registry()
+    gemini = providers.providers["gemini"]
+    response = FakeResponse(["late"], delay=10.0)
+    serve(gemini, response)
+    try:
+        stream = get_model_stream(providers, "gemini-2.5-flash", "Hi")
+        task = asyncio.create_task(stream.__anext__())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert response.closed
+        assert gemini.in_flight == 0 and gemini.errors == 0
+        assert list(gemini.ttfb) == [pytest.approx(0.05, abs=0.04)]
+    finally:
+        await providers.aclose()
@@ -0,0 +1,69 @@
+import asyncio
+import json
+import pytest
+from streaming import coalesce, content_message
+
+
+async def model_tokens(*tokens, pause=0.0, error=None):
+    for token in tokens:
+        if pause:
+            await asyncio.sleep(pause)
+        yield token
+    if error is not None:
+        raise error
+    yield None
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+def test_content_message_matches_json_dumps():
+    for text in ["plain", 'quote " and \\ slash', "line\nbreak", "ünïcode ✓"]:
+        assert content_message(text) == json.dumps({"type": "content", "data": text})
+
+
+@pytest.mark.asyncio
+async def test_fast_tokens_are_flushed_by_size():
+    tokens = ["abcd"] * 10
+    chunks = await collect(coalesce(model_tokens(*tokens), flush_ms=10_000, max_bytes=8))
+
+    assert "".join(chunks) == "abcd" * 10
+    assert len(chunks) < len(tokens)
+    assert all(len(chunk) >= 8 for chunk in chunks[:-1])
+
+
+@pytest.mark.asyncio
+async def test_size_counts_escaped_bytes():
+    # "é" is sent as \u00e9, so every second one fills 12 bytes; counted
+    # as characters, six would never reach the limit
+    chunks = await collect(coalesce(model_tokens(*"éééééé", pause=0.005), flush_ms=10_000, max_bytes=12))
+
+    assert chunks == ["éé", "éé", "éé"]
+
+
+@pytest.mark.asyncio
+async def test_slow_tokens_are_flushed_by_time():
+    # A token every 40ms with a 10ms window: every token goes out alone,
+    # long before max_bytes is reached
+    chunks = await collect(coalesce(model_tokens("a", "b", "c", pause=0.04), flush_ms=10, max_bytes=512))
+
+    assert chunks == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_buffer_is_flushed_before_the_error_is_reraised():
+    stream = coalesce(model_tokens("Hello", ", ", "wor", error=RuntimeError("upstream died")), flush_ms=10_000)
+
+    chunks = []
+    with pytest.raises(RuntimeError, match="upstream died"):
+        async for chunk in stream:
+            chunks.append(chunk)
+    assert "".join(chunks) == "Hello, wor"
+
+
+@pytest.mark.asyncio
+async def test_zero_flush_passes_tokens_through():
+    chunks = await collect(coalesce(model_tokens("a", "", "b"), flush_ms=0))
+
+    assert chunks == ["a", "b"]
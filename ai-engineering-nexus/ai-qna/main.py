@@ -6,6 +6,7 @@ from sse_starlette.sse import EventSourceResponse
 import uuid
 import json
 from redis.asyncio import Redis
+from response_cache.cache import ResponseCache
 
 load_dotenv(r'C:\Users\SRJ\SRJ\Work\agentic_ai\.env')
 
@@ -22,6 +23,14 @@ openai = AsyncOpenAI(
 
 model="gemini-2.5-flash"
 
+# Opt-in: RESPONSE_CACHE=1 replays answers to repeated (or near-duplicate)
+# questions instead of asking Gemini again
+response_cache = ResponseCache(
+    ttl=float(os.getenv('RESPONSE_CACHE_TTL', '3600')),
+    max_entries=int(os.getenv('RESPONSE_CACHE_SIZE', '1000')),
+    similarity=float(os.getenv('RESPONSE_CACHE_SIMILARITY', '0')) or None,
+) if os.getenv('RESPONSE_CACHE') == '1' else None
+
 @app.get("/")
 def home():
     return {"status": "running", "manager": "uv", "server": "uvicorn"}
@@ -30,7 +39,11 @@ def home():
 def health():
     return {"status": "healthy"}
 
-async def get_answer(question: str, request: Request):
+@app.get("/metrics/cache")
+def cache_metrics():
+    return response_cache.stats() if response_cache is not None else {"enabled": False}
+
+async def get_model_tokens(question: str):
     response = await openai.chat.completions.create(
         model=model,
         messages=[
@@ -45,9 +58,16 @@ async def get_answer(question: str, request: Request):
         stream = True
     )
     async for chunk in response:
+        yield chunk.choices[0].delta.content
+
+async def get_answer(question: str, request: Request):
+    if response_cache is not None:
+        tokens = response_cache.stream(model, question, lambda: get_model_tokens(question))
+    else:
+        tokens = get_model_tokens(question)
+    async for content in tokens:
         if await request.is_disconnected():
             break
-        content = chunk.choices[0].delta.content
         if content:
             yield {"data" : content}
 
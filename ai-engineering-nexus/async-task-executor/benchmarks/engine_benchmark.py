@@ -0,0 +1,105 @@
+"""
+Compares the "semaphore" and "pool" execution engines.
+
+Every (engine, batch size) pair runs in a fresh subprocess so peak RSS
+is not polluted by earlier runs. Tasks do no real work (a single
+asyncio.sleep(0)), so wall time and CPU time per task are almost pure
+scheduler overhead.
+
+Usage:
+    python benchmarks/engine_benchmark.py
+    python benchmarks/engine_benchmark.py --sizes 1000 10000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+from async_task_executor.benchmark import peak_rss_mb
+from async_task_executor.executor import AsyncTaskExecutor
+from async_task_executor.models import Task
+
+
+async def noop_task():
+    await asyncio.sleep(0)
+
+
+async def measure(engine: str, size: int, concurrency: int) -> dict:
+    executor = AsyncTaskExecutor(max_concurrent=concurrency, engine=engine)
+    tasks = [Task(func=noop_task) for _ in range(size)]
+
+    baseline_rss = peak_rss_mb()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    report = await executor.run(tasks)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    assert report.successful_count == size
+    peak_rss = peak_rss_mb()
+    return {
+        "engine": engine,
+        "tasks": size,
+        "wall_s": wall,
+        "cpu_us_per_task": cpu / size * 1e6,
+        "peak_rss_mb": peak_rss,
+        "rss_growth_mb": peak_rss - baseline_rss if peak_rss is not None else None,
+    }
+
+
+def run_isolated(engine: str, size: int, concurrency: int) -> dict:
+    """Run one measurement in a child process and return its JSON result."""
+
+    output = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "--single",
+            engine,
+            str(size),
+            "--concurrency",
+            str(concurrency),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--single", nargs=2, metavar=("ENGINE", "SIZE"))
+    args = parser.parse_args()
+
+    if args.single:
+        engine, size = args.single[0], int(args.single[1])
+        print(json.dumps(asyncio.run(measure(engine, size, args.concurrency))))
+        return
+
+    print(
+        f"{'engine':<10} {'tasks':>8} {'wall (s)':>10} "
+        f"{'cpu/task (us)':>14} {'peak RSS (MB)':>14} {'RSS growth (MB)':>16}"
+    )
+    for size in args.sizes:
+        for engine in AsyncTaskExecutor.ENGINES:
+            r = run_isolated(engine, size, args.concurrency)
+            if r["peak_rss_mb"] is None:
+                rss = f"{'n/a':>14} {'n/a':>16}"
+            else:
+                rss = f"{r['peak_rss_mb']:>14.1f} {r['rss_growth_mb']:>16.1f}"
+            print(
+                f"{r['engine']:<10} {r['tasks']:>8} {r['wall_s']:>10.3f} "
+                f"{r['cpu_us_per_task']:>14.1f} {rss}"
+            )
+
+
+if __name__ == "__main__":
+    main()
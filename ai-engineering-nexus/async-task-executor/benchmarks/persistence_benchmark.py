@@ -0,0 +1,65 @@
+"""
+Per-task cost of persisting a batch with SQLiteBackend.
+
+Runs the same batch of no-op tasks without a backend, with a fresh
+SQLite database, and again on the finished database (a resume where
+every task is skipped). Tasks do no real work, so the difference in CPU
+time per task is the cost of stable keys, state tracking and writes.
+
+Usage:
+    python benchmarks/persistence_benchmark.py
+    python benchmarks/persistence_benchmark.py --tasks 200000 --batch-size 2000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from async_task_executor.executor import AsyncTaskExecutor
+from async_task_executor.models import Task
+from async_task_executor.persistence import SQLiteBackend
+
+
+async def noop_task(i):
+    await asyncio.sleep(0)
+    return i
+
+
+async def measure(label: str, tasks: list, backend=None):
+    executor = AsyncTaskExecutor(max_concurrent=100, backend=backend)
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    report = await executor.run(tasks)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    assert report.successful_count == len(tasks)
+    print(
+        f"{label:<16} {wall:>9.2f} {cpu / len(tasks) * 1e6:>14.1f} "
+        f"{report.resumed_count:>9}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    tasks = [Task(func=noop_task, args=(i,)) for i in range(args.tasks)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "batch.db")
+        print(f"{'mode':<16} {'wall (s)':>9} {'cpu/task (us)':>14} {'resumed':>9}")
+        await measure("in-memory", tasks)
+        backend = SQLiteBackend(path, batch_size=args.batch_size)
+        await measure("sqlite", tasks, backend)
+        backend.close()
+        backend = SQLiteBackend(path, batch_size=args.batch_size)
+        await measure("sqlite resume", tasks, backend)
+        backend.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""
+Throughput of ShardedExecutor from 1 to N shards on parse-heavy tasks.
+
+Each task waits on simulated I/O and then decodes a JSON payload, the
+kind of Python work that pins a single event loop to one core. The
+single-process AsyncTaskExecutor is the baseline; sharded runs split the
+same global concurrency budget across the shard processes.
+
+Usage:
+    python benchmarks/sharding_benchmark.py
+    python benchmarks/sharding_benchmark.py --tasks 20000 --max-shards 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from async_task_executor.executor import AsyncTaskExecutor
+from async_task_executor.models import Task
+from async_task_executor.sharded import ShardedExecutor
+
+PAYLOAD = json.dumps(
+    {"choices": [{"index": i, "text": "token " * 40} for i in range(50)]}
+)
+
+
+async def parse_response(payload: str) -> int:
+    await asyncio.sleep(0.005)  # the upstream call
+    return len(json.loads(payload)["choices"])
+
+
+async def measure(label: str, executor, tasks: list) -> float:
+    start = time.perf_counter()
+    report = await executor.run(tasks)
+    wall = time.perf_counter() - start
+
+    assert report.successful_count == len(tasks)
+    print(f"{label:<18} {wall:>9.2f} {len(tasks) / wall:>10.0f}")
+    return wall
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--max-shards", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    tasks = [Task(func=parse_response, args=(PAYLOAD,)) for _ in range(args.tasks)]
+    print(f"{'mode':<18} {'wall (s)':>9} {'tasks/sec':>10}")
+    await measure(
+        "single loop", AsyncTaskExecutor(max_concurrent=args.concurrency), tasks
+    )
+    shards = 1
+    while shards <= args.max_shards:
+        await measure(
+            f"{shards} shard(s)",
+            ShardedExecutor(shards=shards, max_concurrent=args.concurrency),
+            tasks,
+        )
+        shards *= 2
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,6 +5,20 @@ Async Task Executor Package
 # Import everything you want users to access
 from .models import Task, TaskResult, ExecutionReport
 from .executor import AsyncTaskExecutor
+from .store import ResultStore
+from .cache import ResultCache
+from .limits import (
+    AdaptiveConfig,
+    AdaptiveLimit,
+    PartitionLimit,
+    PrioritySemaphore,
+    TokenBucket,
+)
+from .circuit import BreakerConfig, CircuitBreaker
+from .timeouts import TimeoutScheduler
+from .metrics import ExecutorMetrics, MetricsRegistry
+from .persistence import SQLiteBackend, TaskBackend
+from .sharded import ShardedExecutor
 
 # Define the public API
 __all__ = [
@@ -13,4 +27,24 @@ __all__ = [
     "TaskResult",
     "ExecutionReport",
     "AsyncTaskExecutor",
+    "ResultStore",
+    "ResultCache",
+    "ShardedExecutor",
+    # Rate limiting
+    "PartitionLimit",
+    "PrioritySemaphore",
+    "TokenBucket",
+    "AdaptiveConfig",
+    "AdaptiveLimit",
+    # Circuit breaking
+    "BreakerConfig",
+    "CircuitBreaker",
+    # Timeouts
+    "TimeoutScheduler",
+    # Metrics
+    "ExecutorMetrics",
+    "MetricsRegistry",
+    # Persistence
+    "TaskBackend",
+    "SQLiteBackend",
 ]
@@ -0,0 +1,349 @@
+"""
+Reproducible load benchmarks for AsyncTaskExecutor.
+
+Each workload profile generates a seeded batch of synthetic tasks
+(simulated latency via asyncio.sleep, optional failures and hangs), so
+two runs of the same profile and size schedule exactly the same work.
+Every measurement runs in a fresh subprocess so peak RSS belongs to that
+run alone.
+
+Usage:
+    python -m async_task_executor.benchmark
+    python -m async_task_executor.benchmark --profiles uniform heavy_tail \\
+        --sizes 10 1000 100000 --save baseline.json
+    python -m async_task_executor.benchmark --compare baseline.json
+
+With --compare the exit status is 1 if any metric regressed by more
+than --threshold, so the command can gate CI.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from async_task_executor.executor import AsyncTaskExecutor
+from async_task_executor.models import Task
+
+
+@dataclass
+class WorkloadProfile:
+    """Shape of a synthetic batch."""
+
+    name: str
+    latency: float = 0.01  # mean simulated latency in seconds
+    distribution: str = "uniform"  # "uniform", "lognormal" or "constant"
+    sigma: float = 1.0  # lognormal shape; larger means a heavier tail
+    failure_rate: float = 0.0  # fraction of attempts that raise
+    hang_rate: float = 0.0  # fraction of tasks that outlive their timeout
+    timeout: float = 1.0
+    retry: int = 1
+    backoff_factor: float = 0.01
+
+    def latencies(self, size: int, seed: int = 0) -> List[float]:
+        """Per-task latencies, identical for the same size and seed."""
+
+        rng = random.Random(seed)
+        if self.distribution == "constant":
+            return [self.latency] * size
+        if self.distribution == "uniform":
+            return [rng.uniform(0, 2 * self.latency) for _ in range(size)]
+        if self.distribution == "lognormal":
+            # mu chosen so the mean stays at self.latency
+            mu = math.log(self.latency) - self.sigma**2 / 2
+            return [rng.lognormvariate(mu, self.sigma) for _ in range(size)]
+        raise ValueError(f"unknown distribution {self.distribution!r}")
+
+
+PROFILES: Dict[str, WorkloadProfile] = {
+    profile.name: profile
+    for profile in (
+        WorkloadProfile("overhead", latency=0.0, distribution="constant"),
+        WorkloadProfile("uniform", latency=0.01),
+        WorkloadProfile("heavy_tail", latency=0.01, distribution="lognormal"),
+        WorkloadProfile("flaky", latency=0.01, failure_rate=0.2, retry=3),
+        WorkloadProfile("timeouts", latency=0.01, hang_rate=0.05, timeout=0.2),
+    )
+}
+
+# Metrics where a larger value is worse; tasks_per_sec is the one exception
+LOWER_IS_BETTER = ("overhead_us_per_task", "p50_s", "p99_s", "peak_rss_mb")
+HIGHER_IS_BETTER = ("tasks_per_sec",)
+
+
+@dataclass
+class BenchmarkResult:
+    """Metrics from one (profile, engine, size) run."""
+
+    profile: str
+    engine: str
+    tasks: int
+    concurrency: int
+    wall_s: float
+    tasks_per_sec: float
+    overhead_us_per_task: float  # event-loop CPU time per task
+    p50_s: float
+    p99_s: float
+    peak_rss_mb: Optional[float]  # None where it can't be measured
+    successful: int
+    failed: int
+
+    @property
+    def key(self) -> tuple:
+        return (self.profile, self.engine, self.tasks, self.concurrency)
+
+
+def build_tasks(profile: WorkloadProfile, size: int, seed: int = 0) -> List[Task]:
+    """Seeded synthetic batch for a profile."""
+
+    rng = random.Random(seed + 1)
+    tasks = []
+    for latency in profile.latencies(size, seed):
+        if rng.random() < profile.hang_rate:
+            latency = profile.timeout * 10
+        fails = rng.random() < profile.failure_rate
+        tasks.append(
+            Task(
+                func=_simulated_call,
+                args=(latency, fails),
+                timeout=profile.timeout,
+                retry=profile.retry,
+                backoff_factor=profile.backoff_factor,
+            )
+        )
+    return tasks
+
+
+async def _simulated_call(latency: float, fails: bool) -> float:
+    await asyncio.sleep(latency)
+    if fails:
+        raise RuntimeError("simulated failure")
+    return latency
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Peak resident set size of this process in MB.
+
+    Uses getrusage() on POSIX and psutil's peak working set on Windows
+    when psutil is installed; None when neither is available.
+    """
+
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS reports bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    if psutil is not None:
+        memory = psutil.Process().memory_info()
+        # peak_wset only exists on Windows
+        return getattr(memory, "peak_wset", memory.rss) / (1024 * 1024)
+    return None
+
+
+async def measure(
+    profile: WorkloadProfile,
+    size: int,
+    engine: str = "semaphore",
+    concurrency: int = 100,
+    seed: int = 0,
+) -> BenchmarkResult:
+    """Run one batch in this process and collect its metrics."""
+
+    tasks = build_tasks(profile, size, seed)
+    executor = AsyncTaskExecutor(max_concurrent=concurrency, engine=engine)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    report = await executor.run(tasks)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    latency = report.latency_percentiles()
+    return BenchmarkResult(
+        profile=profile.name,
+        engine=engine,
+        tasks=size,
+        concurrency=concurrency,
+        wall_s=wall,
+        tasks_per_sec=size / wall if wall else 0.0,
+        # Simulated latency is asyncio.sleep and costs no CPU, so CPU
+        # time is the executor's own scheduling work
+        overhead_us_per_task=cpu / size * 1e6,
+        p50_s=latency["p50"],
+        p99_s=latency["p99"],
+        peak_rss_mb=peak_rss_mb(),
+        successful=report.successful_count,
+        failed=report.failed_count,
+    )
+
+
+def run_isolated(
+    profile: str, size: int, engine: str, concurrency: int, seed: int = 0
+) -> BenchmarkResult:
+    """Run one measurement in a child process."""
+
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "async_task_executor.benchmark",
+            "--single",
+            profile,
+            engine,
+            str(size),
+            "--concurrency",
+            str(concurrency),
+            "--seed",
+            str(seed),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return BenchmarkResult(**json.loads(output))
+
+
+def save_baseline(path: str, results: List[BenchmarkResult]) -> None:
+    """Write results plus the environment they were measured in."""
+
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": [asdict(r) for r in results],
+            },
+            f,
+            indent=2,
+        )
+
+
+def load_baseline(path: str) -> List[BenchmarkResult]:
+    with open(path) as f:
+        return [BenchmarkResult(**r) for r in json.load(f)["results"]]
+
+
+def compare(
+    baseline: List[BenchmarkResult],
+    current: List[BenchmarkResult],
+    threshold: float = 0.10,
+) -> List[str]:
+    """
+    Describe every metric that got worse by more than threshold.
+
+    Args:
+        baseline: Results loaded from an earlier run
+        current: Results of this run; entries with no matching baseline
+            (same profile, engine, size and concurrency) are skipped
+        threshold: Allowed relative change, 0.10 = 10%
+
+    Returns:
+        One line per regression, empty if there are none
+    """
+
+    previous = {r.key: r for r in baseline}
+    regressions = []
+    for result in current:
+        old = previous.get(result.key)
+        if old is None:
+            continue
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            before, after = getattr(old, metric), getattr(result, metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > threshold:
+                regressions.append(
+                    f"{result.profile}/{result.engine}/{result.tasks}: {metric} "
+                    f"{before:.4g} -> {after:.4g} ({change:+.0%} worse)"
+                )
+    return regressions
+
+
+def format_table(results: List[BenchmarkResult]) -> str:
+    lines = [
+        f"{'profile':<11} {'engine':<10} {'tasks':>8} {'tasks/sec':>10} "
+        f"{'overhead (us)':>14} {'p50 (s)':>8} {'p99 (s)':>8} "
+        f"{'peak RSS (MB)':>14} {'failed':>7}"
+    ]
+    for r in results:
+        rss = f"{r.peak_rss_mb:>14.1f}" if r.peak_rss_mb is not None else f"{'n/a':>14}"
+        lines.append(
+            f"{r.profile:<11} {r.engine:<10} {r.tasks:>8} {r.tasks_per_sec:>10.0f} "
+            f"{r.overhead_us_per_task:>14.1f} {r.p50_s:>8.3f} {r.p99_s:>8.3f} "
+            f"{rss} {r.failed:>7}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--profiles", nargs="+", choices=sorted(PROFILES), default=sorted(PROFILES)
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        choices=AsyncTaskExecutor.ENGINES,
+        default=list(AsyncTaskExecutor.ENGINES),
+    )
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="PATH", help="write a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="diff against a baseline")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--single", nargs=3, metavar=("PROFILE", "ENGINE", "SIZE"))
+    args = parser.parse_args(argv)
+
+    if args.single:
+        profile, engine, size = args.single
+        result = asyncio.run(
+            measure(PROFILES[profile], int(size), engine, args.concurrency, args.seed)
+        )
+        print(json.dumps(asdict(result)))
+        return 0
+
+    results = []
+    for profile in args.profiles:
+        for size in args.sizes:
+            for engine in args.engines:
+                results.append(
+                    run_isolated(profile, size, engine, args.concurrency, args.seed)
+                )
+    print(format_table(results))
+
+    if args.save:
+        save_baseline(args.save, results)
+    if args.compare:
+        regressions = compare(load_baseline(args.compare), results, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class BreakerConfig:
+    """When a circuit opens and how it recovers."""
+
+    failure_threshold: int = 5  # consecutive failures that open the circuit
+    recovery_time: float = 30.0  # seconds open before a trial call is let through
+    half_open_max_calls: int = 1  # trial calls allowed while half-open
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one upstream (a task function or partition).
+
+    closed: calls go through; consecutive failures are counted.
+    open: calls are rejected without touching the upstream until
+        recovery_time has passed.
+    half_open: a limited number of trial calls go through. A success
+        closes the circuit, a failure opens it again, and a cancelled
+        trial (release()) frees its slot for the next one.
+
+    Example:
+        >>> breaker = CircuitBreaker("gemini", BreakerConfig(failure_threshold=3))
+        >>> if breaker.allow():
+        ...     ok = await call_upstream()
+        ...     breaker.record_success() if ok else breaker.record_failure()
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, key: str, config: BreakerConfig):
+        self.key = key
+        self.config = config
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+
+    @property
+    def state(self) -> str:
+        """Current state; an open circuit turns half-open once it has rested."""
+
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self._opened_at >= self.config.recovery_time
+        ):
+            self._state = self.HALF_OPEN
+            self._trials = 0
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go to the upstream right now."""
+
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._trials < self.config.half_open_max_calls:
+            self._trials += 1
+            return True
+        return False
+
+    def release(self) -> None:
+        """Give back a trial slot whose call ended without an outcome.
+
+        For calls that were cancelled, so a half-open circuit isn't left
+        with every trial slot taken and nothing ever recorded.
+        """
+
+        if self._state == self.HALF_OPEN and self._trials > 0:
+            self._trials -= 1
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if (
+            self._state == self.HALF_OPEN
+            or self._failures >= self.config.failure_threshold
+        ):
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
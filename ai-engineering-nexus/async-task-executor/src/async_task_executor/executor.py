@@ -1,10 +1,170 @@
 import asyncio
+import functools
+import inspect
+import itertools
 import logging
 import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from async_task_executor.models import Task, TaskResult, ExecutionReport
-from typing import List
+from async_task_executor.cache import ResultCache
+from async_task_executor.metrics import ExecutorMetrics
+from async_task_executor.persistence import RecordingStore, TaskBackend, stable_key
+from async_task_executor.circuit import BreakerConfig, CircuitBreaker
+from async_task_executor.store import ResultStore
+from async_task_executor.timeouts import TimeoutScheduler
+from async_task_executor.limits import (
+    AdaptiveConfig,
+    AdaptiveLimit,
+    Partition,
+    PartitionLimit,
+    PrioritySemaphore,
+)
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 import random
 
+logger = logging.getLogger(__name__)
+
+
+async def _iterate_tasks(
+    tasks: Union[Iterable[Task], AsyncIterable[Task]],
+) -> AsyncIterator[Task]:
+    """Iterate a sync or async iterable of tasks as an async iterator."""
+
+    if hasattr(tasks, "__aiter__"):
+        async for task in tasks:
+            yield task
+    else:
+        for task in tasks:
+            yield task
+
+
+def _func_name(func) -> str:
+    """Stable label for a task function, used for breakers and metrics."""
+
+    return getattr(func, "__qualname__", None) or repr(func)
+
+
+class _Job:
+    """Bookkeeping for one task while it moves between attempts."""
+
+    __slots__ = (
+        "task",
+        "index",
+        "attempt",
+        "start_time",
+        "queued_at",
+        "wait_time",
+        "run_time",
+        "error",
+        "fresh",
+        "holds_partition",
+        "share_key",
+        "budget_at",
+        "recorder",
+    )
+
+    def __init__(
+        self,
+        task: Task,
+        index: Optional[int],
+        submitted: Optional[float] = None,
+        budget_at: Optional[float] = None,
+    ):
+        self.task = task
+        self.index = index
+        self.attempt = 0
+        self.start_time = time.perf_counter() if submitted is None else submitted
+        self.queued_at = self.start_time
+        self.wait_time = 0.0
+        self.run_time = 0.0
+        self.error: Optional[str] = None
+        self.fresh = True  # not yet picked up by a pool worker
+        self.holds_partition = False  # owns a slot (and token) of its partition
+        self.share_key: Optional[Hashable] = None  # set while leading a coalesced key
+        # Loop time by which the whole task (queueing and every attempt)
+        # must be done: Task.total_timeout and/or the run()'s timeout
+        self.budget_at = budget_at
+        self.recorder: Optional[RecordingStore] = None  # set when persisting
+
+    def expired(self) -> bool:
+        """Whether the task's absolute deadline or its time budget has passed."""
+
+        deadline = self.task.deadline
+        if deadline is not None and time.time() >= deadline:
+            return True
+        return (
+            self.budget_at is not None
+            and asyncio.get_running_loop().time() >= self.budget_at
+        )
+
+    def budget_allows(self, delay: float) -> bool:
+        """Whether the time budget lasts beyond a backoff of delay seconds."""
+
+        return (
+            self.budget_at is None
+            or asyncio.get_running_loop().time() + delay < self.budget_at
+        )
+
+    def result(self, success: bool, result=None) -> TaskResult:
+        return TaskResult(
+            success=success,
+            result=result,
+            error=None if success else self.error,
+            execution_time=time.perf_counter() - self.start_time,
+            attempt_count=self.attempt,
+            index=self.index,
+            wait_time=self.wait_time,
+            run_time=self.run_time,
+        )
+
+    def shared_result(self, source: TaskResult, shared: str) -> TaskResult:
+        """Copy of another execution's outcome, delivered to this job."""
+
+        return TaskResult(
+            success=source.success,
+            result=source.result,
+            error=source.error,
+            execution_time=time.perf_counter() - self.start_time,
+            attempt_count=0,
+            index=self.index,
+            wait_time=time.perf_counter() - self.start_time,
+            shared=shared,
+        )
+
+
+def _cancelled_result(index: int, elapsed: float) -> TaskResult:
+    """Result for a task that shutdown() stopped before it completed."""
+
+    return TaskResult(
+        success=False,
+        error="Cancelled",
+        execution_time=elapsed,
+        attempt_count=0,
+        index=index,
+    )
+
+
+class _Batch:
+    """A run() in progress, as seen by shutdown()."""
+
+    __slots__ = ("workers", "report", "queue")
+
+    def __init__(self):
+        # Cancelled by shutdown() unless they are in the middle of an attempt
+        self.workers: List[asyncio.Task] = []
+        self.report: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.queue: Optional[asyncio.Queue] = None  # the pool engine's ready queue
+
 
 class AsyncTaskExecutor:
     """
@@ -17,6 +177,60 @@ class AsyncTaskExecutor:
     Attributes:
         max_concurrent (int): Maximum number of tasks running simultaneously
         default_timeout (float): Default timeout in seconds for tasks
+        engine (str): "semaphore" launches one coroutine per task that waits
+            for a slot; "pool" runs max_concurrent workers that pull tasks
+            from a bounded asyncio.Queue
+        partitions (dict): PartitionLimit per Task.partition key. A task
+            first takes a slot and a rate-limit token from its partition
+            and only then a global slot, so a slow or throttled partition
+            never ties up slots the others could use
+        max_threads (int): Size of the thread pool that runs sync callables
+            (None lets ThreadPoolExecutor pick its default)
+        max_processes (int): Size of the process pool used for
+            Task(executor="process") (None means one per CPU)
+        breaker (BreakerConfig): Enables a circuit breaker per partition
+            (or per task function for tasks without one). While a circuit
+            is open, tasks fail fast with error "CircuitOpen" instead of
+            calling the upstream
+        adaptive (AdaptiveConfig): Enables an AIMD limit that moves the
+            live concurrency_limit between AdaptiveConfig.min_limit and
+            max_concurrent based on attempt latency and error rate
+        dedup (bool): Coalesce identical tasks (same Task.key, or same func,
+            args and kwargs when they are hashable): while one is running,
+            the others wait for it and share its TaskResult
+        cache (ResultCache): Serve successful results of identical tasks
+            from a TTL/LRU cache, e.g. across repeated batches
+        metrics (ExecutorMetrics): Live Prometheus-style metrics; without
+            it the executor records none
+        backend (TaskBackend): Durable task state, e.g. SQLiteBackend. run()
+            skips tasks the backend has finished results for (matched by
+            persistence.stable_key) and records the rest as they progress,
+            so a batch interrupted by a crash or shutdown() resumes where
+            it stopped
+
+    Coroutine functions run on the event loop. Any other callable, or a
+    task with Task.executor="thread", runs on the executor's thread pool;
+    Task.executor="process" runs it on the process pool. Pools are created
+    on first use and shut down by close() or by leaving an
+    "async with executor:" block. Timeouts and retries apply to offloaded
+    calls too, but a call that times out in a thread cannot be interrupted:
+    the thread finishes it in the background after its slot is released.
+
+    Waiting tasks are dispatched highest Task.priority first. A task whose
+    Task.deadline has passed by the time it would get a slot is dropped
+    with error "DeadlineExceeded" instead of running.
+
+    Timeouts are hierarchical: Task.timeout bounds each attempt,
+    Task.total_timeout bounds the task as a whole (queueing, attempts and
+    backoff) and run(tasks, timeout=...) bounds the whole batch. An
+    attempt that hits its own timeout fails with "TimeoutError" (retried
+    only with Task.retry_on_timeout); a task that runs out of its overall
+    budget fails with "DeadlineExceeded". All of them share one
+    heap-based TimeoutScheduler per event loop.
+
+    shutdown() stops the executor cooperatively: running attempts get a
+    drain budget to finish, everything else ends with error "Cancelled"
+    and every run() in progress returns a partial report.
 
     Example:
         >>> executor = AsyncTaskExecutor(max_concurrent=5)
@@ -25,13 +239,212 @@ class AsyncTaskExecutor:
         >>> print(f"Success: {report.successful}, Failed: {report.failed}")
     """
 
-    def __init__(self, max_concurrent):
+    ENGINES = ("semaphore", "pool")
+
+    def __init__(
+        self,
+        max_concurrent,
+        engine: str = "semaphore",
+        partitions: Optional[Dict[str, PartitionLimit]] = None,
+        max_threads: Optional[int] = None,
+        max_processes: Optional[int] = None,
+        breaker: Optional[BreakerConfig] = None,
+        adaptive: Optional[AdaptiveConfig] = None,
+        dedup: bool = False,
+        cache: Optional[ResultCache] = None,
+        metrics: Optional[ExecutorMetrics] = None,
+        backend: Optional[TaskBackend] = None,
+    ):
         """Initialize the AsyncTaskExecutor with configuration parameters."""
 
+        if engine not in self.ENGINES:
+            raise ValueError(f"engine must be one of {self.ENGINES}, got {engine!r}")
         self.max_concurrent = max_concurrent
-        self._sem = asyncio.Semaphore(max_concurrent)
+        self.engine = engine
+        self._sem = PrioritySemaphore(max_concurrent)
+        self._partitions: Dict[str, Partition] = {
+            key: Partition(key, limit) for key, limit in (partitions or {}).items()
+        }
+        self.max_threads = max_threads
+        self.max_processes = max_processes
+        self._pools: Dict[str, Executor] = {}
+        self._breaker_config = breaker
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._adaptive = (
+            AdaptiveLimit(adaptive, max_concurrent) if adaptive is not None else None
+        )
+        if self._adaptive is not None:
+            self._sem.resize(self._adaptive.limit)
+        self.dedup = dedup
+        self.cache = cache
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._draining = False
+        self._batches: set = set()
+        self._attempting: set = set()  # asyncio tasks inside an attempt
+        self._timeouts: Optional[TimeoutScheduler] = None
+        self._waiting = 0  # semaphore engine tasks waiting for a slot
+        self.backend = backend
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.track(self)
+
+    @property
+    def concurrency_limit(self) -> int:
+        """Live global concurrency limit (moves when adaptive is enabled)."""
+
+        return self._sem.max_concurrent
+
+    @property
+    def in_flight(self) -> int:
+        """Attempts running right now."""
+
+        return len(self._attempting)
 
-    async def run(self, tasks: List[Task]) -> ExecutionReport:
+    @property
+    def queue_depth(self) -> int:
+        """Tasks waiting for a global or partition slot."""
+
+        depth = self._waiting
+        for batch in self._batches:
+            if batch.queue is not None:
+                depth += batch.queue.qsize()
+        if self.engine == "pool":
+            # Parked jobs are off the ready queue while they wait
+            depth += sum(p.waiting for p in self._partitions.values())
+        return depth
+
+    def breaker_states(self) -> Dict[str, str]:
+        """Current state of every circuit breaker, keyed by partition/function."""
+
+        return {key: breaker.state for key, breaker in self._breakers.items()}
+
+    def _share_key(self, task: Task) -> Optional[Hashable]:
+        """Key identifying identical tasks, or None if results can't be shared."""
+
+        if not self.dedup and self.cache is None:
+            return None
+        if task.key is not None:
+            return task.key
+        key = (
+            task.func,
+            task.args,
+            tuple(sorted(task.kwargs.items())) if task.kwargs else (),
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _claim(
+        self, job: _Job, key: Hashable
+    ) -> Tuple[Optional[TaskResult], Optional[asyncio.Future]]:
+        """Find an existing result for key before executing a job.
+
+        Returns:
+            (cached TaskResult, None) on a cache hit,
+            (None, future of the identical in-flight task) to follow it, or
+            (None, None) when the job has to execute and now leads the key
+        """
+
+        if self.cache is not None:
+            hit, value = self.cache.get(key)
+            if hit:
+                cached = TaskResult(success=True, result=value)
+                return job.shared_result(cached, "cache"), None
+        if self.dedup:
+            leader = self._in_flight.get(key)
+            if leader is not None:
+                return None, leader
+            self._in_flight[key] = asyncio.get_running_loop().create_future()
+        return None, None
+
+    def _publish(self, key: Hashable, result: Optional[TaskResult]) -> None:
+        """Hand the leader's result to the cache and to waiting followers.
+
+        result=None means the leader was cancelled; followers then run
+        the task themselves.
+        """
+
+        if result is not None and result.success and self.cache is not None:
+            self.cache.set(key, result.result)
+        leader = self._in_flight.pop(key, None) if self.dedup else None
+        if leader is not None and not leader.done():
+            leader.set_result(result)
+
+    def _breaker_for(self, task: Task) -> Optional[CircuitBreaker]:
+        """Circuit breaker guarding the upstream of task, if enabled."""
+
+        if self._breaker_config is None:
+            return None
+        key = task.partition or _func_name(task.func)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(key, self._breaker_config)
+        return breaker
+
+    async def __aenter__(self) -> "AsyncTaskExecutor":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # Waiting for pool threads/processes to exit blocks, keep it off the loop
+        await asyncio.to_thread(self.close)
+
+    def close(self, wait: bool = True) -> None:
+        """Shut down the thread and process pools used for sync callables.
+
+        Args:
+            wait: Block until running calls have finished
+        """
+
+        pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _pool(self, kind: str) -> Executor:
+        """Thread or process pool for offloaded calls, created on first use."""
+
+        pool = self._pools.get(kind)
+        if pool is None:
+            if kind == "process":
+                pool = ProcessPoolExecutor(max_workers=self.max_processes)
+            else:
+                pool = ThreadPoolExecutor(
+                    max_workers=self.max_threads,
+                    thread_name_prefix="async-task-executor",
+                )
+            self._pools[kind] = pool
+        return pool
+
+    async def _invoke(self, task: Task):
+        """Call task.func once, on the loop or on a pool depending on its kind."""
+
+        kind = task.executor
+        if kind is None and inspect.iscoroutinefunction(task.func):
+            return await task.func(*task.args, **(task.kwargs or {}))
+
+        # One partial per attempt: the process pool pickles it (and with
+        # it the args) exactly once, on its feeder thread
+        call = functools.partial(task.func, *task.args, **(task.kwargs or {}))
+        result = await asyncio.get_running_loop().run_in_executor(
+            self._pool(kind or "thread"), call
+        )
+        if kind is None and inspect.isawaitable(result):
+            # A plain function that returns a coroutine, e.g. a lambda
+            # wrapping an async call: the coroutine still runs on the loop
+            result = await result
+        return result
+
+    def _partition_for(self, task: Task) -> Optional[Partition]:
+        """Partition enforcing the quota of task, if it has one."""
+
+        if task.partition is None:
+            return None
+        return self._partitions.get(task.partition)
+
+    async def run(
+        self, tasks: List[Task], timeout: Optional[float] = None
+    ) -> ExecutionReport:
         """
         Execute all tasks concurrently and return execution report.
 
@@ -41,30 +454,422 @@ class AsyncTaskExecutor:
 
         Args:
             tasks: List of Task objects to execute
+            timeout: Seconds the whole batch may take. Attempts still
+                running at that point are cancelled and every unfinished
+                task fails with "DeadlineExceeded"
 
         Returns:
             ExecutionReport containing results and summary
 
         Example:
             >>> tasks = [Task(my_func, args=(1,)), Task(my_func, args=(2,))]
-            >>> report = await executor.run(tasks)
+            >>> report = await executor.run(tasks, timeout=30)
         """
 
-        results = await asyncio.gather(
-            *[self._execute_task(task) for task in tasks], return_exceptions=True
+        if self._draining:
+            raise RuntimeError("executor has been shut down")
+        start = time.perf_counter()
+        deadline = (
+            None if timeout is None else asyncio.get_running_loop().time() + timeout
         )
-        return ExecutionReport(
-            total_tasks=len(tasks),
-            successful_count=sum(1 for r in results if r.success),
-            failed_count=sum(1 for r in results if not r.success),
-            results=results,
+        if self.backend is not None:
+            # Reads and registers on the backend's storage, off the loop
+            results, pending = await asyncio.to_thread(self._resume, tasks)
+        else:
+            results, pending = ResultStore(len(tasks)), list(enumerate(tasks))
+        batch = _Batch()
+        self._batches.add(batch)
+        try:
+            if self.engine == "pool":
+                await self._run_pool(pending, results, batch, deadline)
+            else:
+                # Started in priority order, like the pool engine's feed, so
+                # the first free slots go to the most urgent tasks too.
+                # sorted() is stable: equal priorities keep submission order
+                batch.workers = [
+                    asyncio.create_task(
+                        self._execute_into(results, task, index, deadline)
+                    )
+                    for index, task in sorted(
+                        pending, key=lambda item: -item[1].priority
+                    )
+                ]
+                # Tasks cancelled by shutdown() are reported, not raised
+                for outcome in await asyncio.gather(
+                    *batch.workers, return_exceptions=True
+                ):
+                    if isinstance(outcome, BaseException) and not isinstance(
+                        outcome, asyncio.CancelledError
+                    ):
+                        raise outcome
+        except BaseException:
+            batch.report.cancel()
+            raise
+        finally:
+            self._batches.discard(batch)
+            if self.backend is not None:
+                await asyncio.to_thread(self.backend.flush)
+
+        if self._draining:
+            elapsed = time.perf_counter() - start
+            for index in list(results.pending()):
+                results.set(index, _cancelled_result(index, elapsed))
+        report = ExecutionReport.from_store(results)
+        batch.report.set_result(report)
+        return report
+
+    def _resume(self, tasks: List[Task]) -> Tuple[RecordingStore, List[tuple]]:
+        """Fill in results the backend already has; return what is left to run."""
+
+        keys = [stable_key(task) for task in tasks]
+        finished = self.backend.load(keys)
+        results = RecordingStore(self.backend, keys)
+        pending = []
+        for index, task in enumerate(tasks):
+            stored = finished.get(keys[index])
+            if stored is None:
+                pending.append((index, task))
+            else:
+                results.restore(index, stored)
+        self.backend.register([keys[index] for index, _ in pending])
+        if finished:
+            logger.info(
+                "Resuming batch: %d of %d tasks already finished",
+                len(tasks) - len(pending),
+                len(tasks),
+            )
+        return results, pending
+
+    async def shutdown(
+        self, drain_timeout: Optional[float] = None
+    ) -> List[ExecutionReport]:
+        """
+        Stop admitting work, drain running attempts and cancel the rest.
+
+        Tasks that are queued, waiting for a slot or sitting out a backoff
+        are cancelled at once. Attempts already running get drain_timeout
+        seconds to finish (their results are kept) and are cancelled after
+        that. Every run() in progress then returns a partial report in
+        which each task that did not complete has error "Cancelled". The
+        thread and process pools are closed without waiting. run_stream()
+        stops pulling new tasks and its queued tasks come back "Cancelled".
+
+        Args:
+            drain_timeout: Seconds running attempts may take to finish,
+                None waits for all of them
+
+        Returns:
+            The partial ExecutionReport of every run() that was in progress
+
+        Example:
+            >>> batch = asyncio.create_task(executor.run(tasks))
+            >>> ...  # deploy starts
+            >>> [report] = await executor.shutdown(drain_timeout=10)
+            >>> report.cancelled_count
+        """
+
+        self._draining = True
+        batches = list(self._batches)
+        for batch in batches:
+            for worker in batch.workers:
+                if worker not in self._attempting:
+                    worker.cancel()
+        if self._attempting:
+            _, late = await asyncio.wait(set(self._attempting), timeout=drain_timeout)
+            for worker in late:
+                worker.cancel()
+        reports = await asyncio.gather(
+            *(batch.report for batch in batches), return_exceptions=True
         )
+        self.close(wait=False)
+        return [report for report in reports if isinstance(report, ExecutionReport)]
+
+    async def run_stream(
+        self, tasks: Union[Iterable[Task], AsyncIterable[Task]]
+    ) -> AsyncIterator[TaskResult]:
+        """
+        Execute tasks and yield each result as soon as it completes.
+
+        Unlike run(), tasks are pulled from the iterable lazily and at most
+        max_concurrent of them are in flight at any time, so memory stays
+        bounded by the concurrency limit rather than the batch size.
+        Results come back in completion order; TaskResult.index holds the
+        position of the task in the input.
+
+        Args:
+            tasks: Iterable or async iterable of Task objects
+
+        Yields:
+            TaskResult for each task, in completion order
+
+        Example:
+            >>> async for result in executor.run_stream(task_generator()):
+            ...     print(result.index, result.success)
+        """
+
+        source = _iterate_tasks(tasks)
+        in_flight = set()
+        pull: Optional[asyncio.Future] = None  # the source's pending __anext__()
+        exhausted = False
+        index = 0
+        try:
+            while True:
+                if (
+                    pull is None
+                    and not exhausted
+                    and not self._draining
+                    and len(in_flight) < self.max_concurrent
+                ):
+                    pull = asyncio.ensure_future(source.__anext__())
+                waiting = in_flight if pull is None else in_flight | {pull}
+                if not waiting:
+                    break
+                # A slow source never holds back results that are ready
+                done, _ = await asyncio.wait(
+                    waiting, return_when=asyncio.FIRST_COMPLETED
+                )
+                if pull in done:
+                    done.discard(pull)
+                    try:
+                        task = pull.result()
+                    except StopAsyncIteration:
+                        exhausted = True
+                    else:
+                        if self._draining:
+                            exhausted = True
+                        else:
+                            in_flight.add(
+                                asyncio.create_task(self._execute_task(task, index))
+                            )
+                            index += 1
+                    pull = None
+                for finished in done:
+                    in_flight.discard(finished)
+                    yield finished.result()
+        finally:
+            # Consumer stopped early (break/aclose) - don't leak running tasks
+            for pending in in_flight:
+                pending.cancel()
+            if pull is not None:
+                pull.cancel()
+                await asyncio.gather(pull, return_exceptions=True)
+            await source.aclose()
+
+    async def _run_pool(
+        self,
+        tasks: List[Tuple[int, Task]],
+        results: ResultStore,
+        batch: _Batch,
+        deadline: Optional[float] = None,
+    ) -> None:
+        """Execute tasks on a fixed set of worker coroutines.
+
+        Only the workers and at most max_concurrent queued items exist at
+        any time, instead of one suspended coroutine per task. Tasks are
+        admitted in priority order and the ready queue is a priority queue.
+        A task that needs a retry is handed to the loop's timer (the delay
+        queue) and put back on the ready queue once its backoff expires,
+        so the worker moves straight on to the next task.
+
+        Args:
+            tasks: (index, Task) pairs to execute
+            results: Store receiving each result at its task's index
+            batch: Registration of this run; its workers are the feeder
+                and the worker coroutines
+            deadline: Loop time by which the batch must be done
+        """
+
+        ready: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        batch.queue = ready
+        recorder = results if isinstance(results, RecordingStore) else None
+        seq = itertools.count()  # FIFO among equal priorities
+        # Bounds fresh tasks waiting on the ready queue; retries bypass it
+        admission = asyncio.Semaphore(self.max_concurrent)
+        loop = asyncio.get_running_loop()
+
+        def push(job: _Job):
+            ready.put_nowait((-job.task.priority, next(seq), job))
+
+        def resume(job: _Job):
+            push(job)
+            # Only now mark the previous get() done, so join() can't
+            # return while the job is parked or sitting out its backoff
+            ready.task_done()
+
+        def retry(job: _Job):
+            job.queued_at = time.perf_counter()
+            resume(job)
+
+        def take_token(job: _Job, partition: Partition) -> bool:
+            """Mark the partition slot as owned and reserve a rate token.
+
+            Returns True if the job may run now; otherwise it is resumed
+            once the token becomes valid, or finished with DeadlineExceeded
+            (without taking a token) if that would be past its budget.
+            """
+            if not partition.token_within(job.budget_at):
+                partition.release()
+                job.wait_time += time.perf_counter() - job.queued_at
+                finish(job, self._deadline_exceeded(job))
+                return False
+            job.holds_partition = True
+            delay = partition.bucket.reserve() if partition.bucket else 0.0
+            if delay:
+                loop.call_later(delay, resume, job)
+                return False
+            return True
+
+        def on_partition_slot(job: _Job, partition: Partition):
+            if take_token(job, partition):
+                resume(job)
+
+        def follow(job: _Job, result: Optional[TaskResult]):
+            if self._draining:
+                # run() reports the job as cancelled
+                return
+            if result is None:
+                # Leader was cancelled: run this one after all
+                resume(job)
+            else:
+                results.set(job.index, job.shared_result(result, "coalesced"))
+                ready.task_done()
+
+        def finish(job: _Job, result: TaskResult):
+            if job.share_key is not None:
+                self._publish(job.share_key, result)
+            results.set(job.index, result)
+            ready.task_done()
+
+        async def worker():
+            while not self._draining:
+                _, _, job = await ready.get()
+                if job.fresh:
+                    job.fresh = False
+                    admission.release()
+                    key = self._share_key(job.task)
+                    if key is not None:
+                        cached, leader = self._claim(job, key)
+                        if cached is not None:
+                            results.set(job.index, cached)
+                            ready.task_done()
+                            continue
+                        if leader is not None:
+                            leader.add_done_callback(
+                                lambda f, job=job: follow(job, f.result())
+                            )
+                            continue
+                        job.share_key = key
+
+                partition = self._partition_for(job.task)
+                if job.expired():
+                    job.wait_time += time.perf_counter() - job.queued_at
+                    if job.holds_partition:
+                        job.holds_partition = False
+                        partition.release()
+                    finish(job, self._deadline_exceeded(job))
+                    continue
+                if partition is not None and not job.holds_partition:
+                    # Park instead of blocking the worker on another
+                    # partition's quota
+                    if not partition.try_acquire():
+                        partition.wait(job.task.priority).add_done_callback(
+                            lambda _, job=job, p=partition: on_partition_slot(job, p)
+                        )
+                        continue
+                    if not take_token(job, partition):
+                        continue
+
+                try:
+                    # Uncontended unless the adaptive limit has shrunk
+                    # below the number of workers
+                    await self._sem.acquire(job.task.priority)
+                    try:
+                        waited = time.perf_counter() - job.queued_at
+                        job.wait_time += waited
+                        if self.metrics is not None:
+                            self.metrics.slot_wait.observe(waited)
+                        result = await self._attempt(job)
+                    finally:
+                        self._sem.release()
+                except BaseException:
+                    if job.share_key is not None:
+                        self._publish(job.share_key, None)
+                    ready.task_done()
+                    raise
+                finally:
+                    if job.holds_partition:
+                        job.holds_partition = False
+                        partition.release()
+                if result is None:
+                    delay = self._backoff_delay(job)
+                    if job.budget_allows(delay):
+                        loop.call_later(delay, retry, job)
+                    else:
+                        finish(job, self._deadline_exceeded(job))
+                else:
+                    finish(job, result)
 
-    async def _execute_task(self, task: Task) -> TaskResult:
+        async def feed():
+            # Time spent waiting for admission counts as queue wait too
+            submitted = time.perf_counter()
+            # sorted() is stable, so equal priorities keep submission order
+            for index, task in sorted(tasks, key=lambda item: -item[1].priority):
+                await admission.acquire()
+                job = _Job(task, index, submitted, self._budget(task, deadline))
+                job.recorder = recorder
+                push(job)
+            await ready.join()
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(self.max_concurrent, len(tasks)))
+        ]
+        feeder = asyncio.create_task(feed())
+        batch.workers = [feeder, *workers]
+        try:
+            await asyncio.wait([feeder])
+            if self._draining:
+                # Wait for the workers to finish their last attempt or be
+                # cancelled; the feeder was cancelled by shutdown()
+                if workers:
+                    await asyncio.wait(workers)
+            else:
+                feeder.result()
+        finally:
+            for w in batch.workers:
+                w.cancel()
+            await asyncio.gather(*batch.workers, return_exceptions=True)
+
+    async def _execute_into(
+        self,
+        results: ResultStore,
+        task: Task,
+        index: int,
+        deadline: Optional[float] = None,
+    ):
+        """Execute a task and store its result, so no TaskResult outlives it."""
+
+        recorder = results if isinstance(results, RecordingStore) else None
+        results.set(index, await self._execute_task(task, index, deadline, recorder))
+
+    async def _execute_task(
+        self,
+        task: Task,
+        index: Optional[int] = None,
+        deadline: Optional[float] = None,
+        recorder: Optional[RecordingStore] = None,
+    ) -> TaskResult:
         """Method to execute a single task asynchronously.
 
+        The concurrency slot is held only while an attempt runs: between
+        attempts the task gives it up, sleeps through its backoff and
+        queues for a slot again.
+
         Args:
             task: Task object to execute
+            index: Position of the task in its batch, copied to the result
+            deadline: Loop time by which the task's batch must be done
+            recorder: Store to report the task's start to, when persisting
 
         Returns:
             TaskResult containing the outcome of the task
@@ -74,48 +879,247 @@ class AsyncTaskExecutor:
 
         """
 
-        task_name = task.func.__name__
-        logger = logging.getLogger(__name__)
-        logger.debug(f"Executing task: {task_name}")
-        start_time = time.perf_counter()
-        errorMsg = None
-        retries = task.retry
-        timeout = task.timeout
-        backoff = task.backoff_factor
-        attempt = 0
-        async with self._sem:
-            for i in range(retries):
-                attempt += 1
+        job = _Job(task, index, budget_at=self._budget(task, deadline))
+        job.recorder = recorder
+        key = self._share_key(task)
+        if key is None:
+            return await self._execute_job(job)
+
+        while True:
+            cached, leader = self._claim(job, key)
+            if cached is not None:
+                return cached
+            if leader is None:
+                break
+            # Shielded: a cancelled follower must not cancel the leader's future
+            result = await asyncio.shield(leader)
+            if result is not None:
+                return job.shared_result(result, "coalesced")
+
+        try:
+            result = await self._execute_job(job)
+        except BaseException:
+            self._publish(key, None)
+            raise
+        self._publish(key, result)
+        return result
+
+    async def _execute_job(self, job: _Job) -> TaskResult:
+        """Run a job's attempts, taking a slot for each one."""
+
+        task = job.task
+        partition = self._partition_for(task)
+        while True:
+            if self._draining:
+                return self._cancelled(job)
+            if job.expired():
+                return self._deadline_exceeded(job)
+            job.queued_at = time.perf_counter()
+            self._waiting += 1
+            try:
+                if partition is not None and not await partition.acquire(
+                    task.priority, job.budget_at
+                ):
+                    # Its rate-limit token would come too late
+                    self._waiting -= 1
+                    job.wait_time += time.perf_counter() - job.queued_at
+                    return self._deadline_exceeded(job)
+            except BaseException:
+                self._waiting -= 1
+                raise
+            try:
                 try:
-                    res = await asyncio.wait_for(
-                        task.func(*task.args, **(task.kwargs or {})), timeout=timeout
-                    )
-                    return TaskResult(
-                        success=True,
-                        result=res,
-                        execution_time=time.perf_counter() - start_time,
-                        attempt_count=attempt,
-                    )
-                except asyncio.TimeoutError as e:
-                    errorMsg = "TimeoutError"
-                    return TaskResult(
-                        success=False,
-                        error=errorMsg,
-                        execution_time=time.perf_counter() - start_time,
-                        attempt_count=attempt,
-                    )
-                except Exception as e:
-                    logger.error(f"Error in task {task_name}: {e}")
-                    errorMsg = str(e)
-                    delay = backoff * (2 ** (i))
-                    # jittered_delay = random.uniform(0, delay)
-                    await asyncio.sleep(delay)
-                    logger.info(
-                        f"Retrying task {task_name} (attempt {attempt + 1}/{retries})"
-                    )
-            return TaskResult(
-                success=False,
-                error=errorMsg,
-                execution_time=time.perf_counter() - start_time,
-                attempt_count=attempt,
+                    await self._sem.acquire(task.priority)
+                finally:
+                    self._waiting -= 1
+                try:
+                    waited = time.perf_counter() - job.queued_at
+                    job.wait_time += waited
+                    if self.metrics is not None:
+                        self.metrics.slot_wait.observe(waited)
+                    if self._draining:
+                        return self._cancelled(job)
+                    if job.expired():
+                        # Expired while queued: hand the slot straight back
+                        return self._deadline_exceeded(job)
+                    result = await self._attempt(job)
+                finally:
+                    self._sem.release()
+            finally:
+                if partition is not None:
+                    partition.release()
+            if result is not None:
+                return result
+            if self._draining:
+                return self._cancelled(job)
+            delay = self._backoff_delay(job)
+            if not job.budget_allows(delay):
+                return self._deadline_exceeded(job)
+            await asyncio.sleep(delay)
+
+    async def _attempt(self, job: _Job) -> Optional[TaskResult]:
+        """Run one attempt of a job; the caller must hold a slot.
+
+        Args:
+            job: Job to run
+
+        Returns:
+            Final TaskResult, or None if the job should be retried
+        """
+
+        task = job.task
+        breaker = self._breaker_for(task)
+        if breaker is not None and not breaker.allow():
+            logger.warning(
+                "Circuit %s open, rejecting task %s", breaker.key, task.func.__name__
+            )
+            job.error = "CircuitOpen"
+            return job.result(success=False)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Executing task: %s", task.func.__name__)
+        job.attempt += 1
+        if job.attempt == 1 and job.recorder is not None:
+            job.recorder.started(job.index)
+        attempt_start = time.perf_counter()
+        current = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        # The attempt ends at its own timeout or at the end of the task's
+        # budget, whichever comes first
+        attempt_deadline = loop.time() + task.timeout
+        over_budget = job.budget_at is not None and job.budget_at <= attempt_deadline
+        timeouts = self._timeout_scheduler(loop)
+        timer = timeouts.schedule(
+            job.budget_at if over_budget else attempt_deadline, current
+        )
+        cancelling = current.cancelling()
+        # shutdown() lets tasks in this set finish their attempt
+        self._attempting.add(current)
+        try:
+            try:
+                res = await self._invoke(task)
+            finally:
+                timeouts.cancel(timer)
+                # Withdraw the timer's cancellation; one requested by anyone
+                # else (the caller, shutdown()) still propagates
+                timed_out = timer.fired and current.uncancel() <= cancelling
+        except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+            if isinstance(e, asyncio.CancelledError) and not timed_out:
+                # Cancelled from outside: no outcome for the breaker
+                if breaker is not None:
+                    breaker.release()
+                raise
+            elapsed = time.perf_counter() - attempt_start
+            job.run_time += elapsed
+            self._record_outcome(task, breaker, elapsed, False)
+            if self.metrics is not None:
+                self.metrics.timeouts.labels(_func_name(task.func)).inc()
+            if timed_out and over_budget:
+                return self._deadline_exceeded(job)
+            job.error = "TimeoutError"
+            if task.retry_on_timeout and job.attempt < task.retry:
+                logger.info(
+                    "Retrying task %s after timeout (attempt %d/%d)",
+                    task.func.__name__,
+                    job.attempt + 1,
+                    task.retry,
+                )
+                return self._retrying(task)
+            return job.result(success=False)
+        except Exception as e:
+            elapsed = time.perf_counter() - attempt_start
+            job.run_time += elapsed
+            self._record_outcome(task, breaker, elapsed, False)
+            logger.error("Error in task %s: %s", task.func.__name__, e)
+            job.error = str(e)
+            if job.attempt >= task.retry:
+                return job.result(success=False)
+            logger.info(
+                "Retrying task %s (attempt %d/%d)",
+                task.func.__name__,
+                job.attempt + 1,
+                task.retry,
             )
+            return self._retrying(task)
+        except BaseException:
+            if breaker is not None:
+                breaker.release()
+            raise
+        finally:
+            self._attempting.discard(current)
+        elapsed = time.perf_counter() - attempt_start
+        job.run_time += elapsed
+        self._record_outcome(task, breaker, elapsed, True)
+        return job.result(success=True, result=res)
+
+    def _retrying(self, task: Task) -> None:
+        """Count a retry; returns None, the _attempt() result for "retry"."""
+
+        if self.metrics is not None:
+            self.metrics.retries.labels(_func_name(task.func)).inc()
+        return None
+
+    def _record_outcome(
+        self,
+        task: Task,
+        breaker: Optional[CircuitBreaker],
+        latency: float,
+        ok: bool,
+    ) -> None:
+        """Feed one attempt's outcome to its breaker, the adaptive limit and metrics."""
+
+        if self.metrics is not None:
+            name = _func_name(task.func)
+            self.metrics.attempt_duration.labels(name).observe(latency)
+            if not ok:
+                self.metrics.failures.labels(name).inc()
+        if breaker is not None:
+            if ok:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+        if self._adaptive is not None:
+            new_limit = self._adaptive.record(latency, ok)
+            if new_limit is not None:
+                logger.info("Adaptive concurrency limit -> %d", new_limit)
+                self._sem.resize(new_limit)
+
+    def _timeout_scheduler(self, loop: asyncio.AbstractEventLoop) -> TimeoutScheduler:
+        """The TimeoutScheduler of loop, replaced if the executor moved loops."""
+
+        if self._timeouts is None or self._timeouts.loop is not loop:
+            self._timeouts = TimeoutScheduler(loop)
+        return self._timeouts
+
+    @staticmethod
+    def _budget(task: Task, deadline: Optional[float]) -> Optional[float]:
+        """Loop time by which task must finish, from its own and its batch's budget."""
+
+        if task.total_timeout is None:
+            return deadline
+        own = asyncio.get_running_loop().time() + task.total_timeout
+        return own if deadline is None else min(own, deadline)
+
+    @staticmethod
+    def _deadline_exceeded(job: _Job) -> TaskResult:
+        """Result for a job dropped because its deadline passed."""
+
+        job.error = "DeadlineExceeded"
+        return job.result(success=False)
+
+    @staticmethod
+    def _cancelled(job: _Job) -> TaskResult:
+        """Result for a job stopped by shutdown() between attempts."""
+
+        job.error = "Cancelled"
+        return job.result(success=False)
+
+    @staticmethod
+    def _backoff_delay(job: _Job) -> float:
+        """Exponential backoff before the next attempt, optionally jittered."""
+
+        delay = job.task.backoff_factor * (2 ** (job.attempt - 1))
+        if job.task.jitter:
+            # "Full jitter": spread retries of tasks that failed together
+            delay = random.uniform(0, delay)
+        return delay
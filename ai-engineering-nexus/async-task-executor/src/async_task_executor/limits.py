@@ -0,0 +1,256 @@
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+@dataclass
+class PartitionLimit:
+    """Quota for every task that shares a partition key."""
+
+    max_concurrent: Optional[int] = None  # attempts running at once
+    rate: Optional[float] = None  # attempts started per second
+    burst: Optional[int] = None  # bucket capacity, defaults to max(1, rate)
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of polling.
+
+    reserve() always takes a token, letting the balance go negative, and
+    returns how long the caller has to wait for it. Waiters are therefore
+    served in arrival order and each one sleeps exactly once.
+
+    Example:
+        >>> bucket = TokenBucket(rate=10, capacity=5)
+        >>> await asyncio.sleep(bucket.reserve())
+    """
+
+    __slots__ = ("rate", "capacity", "_tokens", "_updated")
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def delay(self) -> float:
+        """Delay reserve() would return right now, without taking a token."""
+
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def reserve(self) -> float:
+        """Take one token and return the delay in seconds until it is valid."""
+
+        self._refill()
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+
+class PrioritySemaphore:
+    """
+    Semaphore that wakes the highest-priority waiter first.
+
+    Waiters of equal priority are served in arrival order. Slots are
+    handed directly from release() to the next waiter, so a woken waiter
+    already owns its slot. max_concurrent=None means unlimited.
+
+    Example:
+        >>> slots = PrioritySemaphore(max_concurrent=2)
+        >>> await slots.acquire(priority=10)
+        >>> slots.release()
+    """
+
+    def __init__(self, max_concurrent: Optional[int]):
+        self.max_concurrent = max_concurrent
+        self.active = 0
+        self._waiters: list = []  # heap of (-priority, seq, future)
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        """Number of callers queued for a slot."""
+
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free and nobody is queued, without waiting."""
+
+        if self.max_concurrent is None or (
+            self.active < self.max_concurrent and not self._waiters
+        ):
+            self.active += 1
+            return True
+        return False
+
+    def wait(self, priority: int = 0) -> asyncio.Future:
+        """Queue for a slot; the future resolves once the slot is ours."""
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._seq), waiter))
+        return waiter
+
+    async def acquire(self, priority: int = 0) -> None:
+        """Wait for a slot."""
+
+        if self.try_acquire():
+            return
+        waiter = self.wait(priority)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over just before we were cancelled
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Give the slot to the best live waiter, or free it."""
+
+        if self.max_concurrent is None or self.active <= self.max_concurrent:
+            while self._waiters:
+                waiter = heapq.heappop(self._waiters)[2]
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        # Over the limit after a resize(): let the slot lapse
+        self.active -= 1
+
+    def resize(self, max_concurrent: int) -> None:
+        """Change the limit; running holders are never interrupted.
+
+        Growing wakes waiters straight away. Shrinking takes effect as
+        current holders release their slots.
+        """
+
+        self.max_concurrent = max_concurrent
+        while self._waiters and self.active < max_concurrent:
+            waiter = heapq.heappop(self._waiters)[2]
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+
+class Partition(PrioritySemaphore):
+    """Concurrency cap and rate limit shared by tasks with the same key."""
+
+    def __init__(self, key: str, limit: PartitionLimit):
+        super().__init__(limit.max_concurrent)
+        self.key = key
+        self.limit = limit
+        self.bucket = (
+            TokenBucket(limit.rate, limit.burst) if limit.rate is not None else None
+        )
+
+    def token_within(self, budget_at: Optional[float]) -> bool:
+        """Whether a rate-limit token becomes valid before loop time budget_at."""
+
+        return (
+            self.bucket is None
+            or budget_at is None
+            or asyncio.get_running_loop().time() + self.bucket.delay() < budget_at
+        )
+
+    async def acquire(
+        self, priority: int = 0, budget_at: Optional[float] = None
+    ) -> bool:
+        """Wait for a slot and then for a rate-limit token.
+
+        Returns False, holding nothing and without taking a token, when
+        the token would only become valid at or after loop time budget_at.
+        """
+
+        await super().acquire(priority)
+        if not self.token_within(budget_at):
+            self.release()
+            return False
+        if self.bucket is not None:
+            delay = self.bucket.reserve()
+            if delay:
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    self.release()
+                    raise
+        return True
+
+
+@dataclass
+class AdaptiveConfig:
+    """Additive-increase / multiplicative-decrease tuning for AdaptiveLimit."""
+
+    min_limit: int = 1
+    initial_limit: Optional[int] = None  # defaults to the executor's max_concurrent
+    window: int = 50  # attempts per evaluation
+    latency_target: Optional[float] = None  # healthy while p95 latency <= this
+    max_error_rate: float = 0.1  # healthy while errors / attempts <= this
+    increase: int = 1
+    decrease_factor: float = 0.5
+
+
+class AdaptiveLimit:
+    """
+    AIMD concurrency limit driven by attempt latency and errors.
+
+    Every `window` attempts the limit is re-evaluated: while p95 latency
+    and error rate stay healthy it grows by `increase`, otherwise it is
+    multiplied by `decrease_factor`. It always stays within
+    [min_limit, max_limit].
+
+    Example:
+        >>> limit = AdaptiveLimit(AdaptiveConfig(latency_target=0.5), max_limit=50)
+        >>> new_limit = limit.record(latency=0.12, ok=True)
+    """
+
+    def __init__(self, config: AdaptiveConfig, max_limit: int):
+        self.config = config
+        self.max_limit = max_limit
+        initial = config.initial_limit or max_limit
+        self.limit = max(config.min_limit, min(initial, max_limit))
+        self._latencies: List[float] = []
+        self._errors = 0
+
+    def record(self, latency: float, ok: bool) -> Optional[int]:
+        """Add one attempt; return the new limit if it changed."""
+
+        self._latencies.append(latency)
+        if not ok:
+            self._errors += 1
+        if len(self._latencies) < self.config.window:
+            return None
+
+        latencies = sorted(self._latencies)
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        error_rate = self._errors / len(latencies)
+        self._latencies = []
+        self._errors = 0
+
+        healthy = error_rate <= self.config.max_error_rate and (
+            self.config.latency_target is None or p95 <= self.config.latency_target
+        )
+        if healthy:
+            new_limit = min(self.max_limit, self.limit + self.config.increase)
+        else:
+            new_limit = max(
+                self.config.min_limit, int(self.limit * self.config.decrease_factor)
+            )
+        if new_limit == self.limit:
+            return None
+        self.limit = new_limit
+        return new_limit
@@ -0,0 +1,293 @@
+import bisect
+import weakref
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Content-Type of MetricsRegistry.render() output
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base for a metric family with optional labels."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """Child metric for one combination of label values."""
+
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} expects labels {self.labelnames}, got {values}"
+                )
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. retries per task function."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        if not name.endswith("_total"):
+            name += "_total"
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self):
+        for values, child in self._children.items():
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}{labels} {_format_value(child.value)}"
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, set directly or read at render time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], float]] = None
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def set(self, value: float) -> None:
+        self.labels().value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the (unlabelled) value only when the registry is rendered."""
+
+        self._function = function
+
+    def _samples(self):
+        if self._function is not None:
+            yield f"{self.name} {_format_value(self._function())}"
+            return
+        for values, child in self._children.items():
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}{labels} {_format_value(child.value)}"
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: List[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = sorted(buckets)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self):
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + [float("inf")], child.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                labels = _format_labels(self.labelnames, values, le)
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    In-process collection of metrics, rendered in Prometheus text format.
+
+    Example:
+        >>> registry = MetricsRegistry()
+        >>> retries = registry.counter("retries", "Retries", ["task"])
+        >>> retries.labels("fetch").inc()
+        >>> print(registry.render())
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+class ExecutorMetrics:
+    """
+    Live metrics for one or more AsyncTaskExecutors.
+
+    Gauges are computed from executor state when the registry is
+    rendered, so they cost nothing while tasks run. Counters and
+    histograms are updated in place; executors created without metrics
+    skip all of it.
+
+    Metrics (prefix defaults to "async_task_executor"):
+        <prefix>_in_flight: attempts running right now
+        <prefix>_queue_depth: tasks waiting for a concurrency slot
+        <prefix>_slot_wait_seconds: time from queueing to getting a slot
+        <prefix>_attempt_duration_seconds{task}: latency of each attempt
+        <prefix>_retries_total{task}: attempts that will be retried
+        <prefix>_timeouts_total{task}: attempts that timed out
+        <prefix>_failures_total{task}: attempts that failed or timed out
+
+    Example:
+        >>> metrics = ExecutorMetrics()
+        >>> executor = AsyncTaskExecutor(max_concurrent=10, metrics=metrics)
+        >>> print(metrics.registry.render())
+    """
+
+    def __init__(
+        self,
+        registry: Optional[MetricsRegistry] = None,
+        prefix: str = "async_task_executor",
+    ):
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self._executors = weakref.WeakSet()
+        in_flight = self.registry.gauge(f"{prefix}_in_flight", "Attempts running")
+        in_flight.set_function(lambda: sum(e.in_flight for e in list(self._executors)))
+        queue_depth = self.registry.gauge(
+            f"{prefix}_queue_depth", "Tasks waiting for a concurrency slot"
+        )
+        queue_depth.set_function(
+            lambda: sum(e.queue_depth for e in list(self._executors))
+        )
+        self.slot_wait = self.registry.histogram(
+            f"{prefix}_slot_wait_seconds", "Time tasks waited for a concurrency slot"
+        )
+        self.attempt_duration = self.registry.histogram(
+            f"{prefix}_attempt_duration_seconds", "Latency of each attempt", ["task"]
+        )
+        self.retries = self.registry.counter(
+            f"{prefix}_retries", "Attempts that will be retried", ["task"]
+        )
+        self.timeouts = self.registry.counter(
+            f"{prefix}_timeouts", "Attempts that timed out", ["task"]
+        )
+        self.failures = self.registry.counter(
+            f"{prefix}_failures", "Attempts that failed or timed out", ["task"]
+        )
+
+    def track(self, executor) -> None:
+        """Include executor in the in-flight and queue-depth gauges."""
+
+        self._executors.add(executor)
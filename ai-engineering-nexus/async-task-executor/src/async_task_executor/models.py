@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Callable, Any, Dict, List, Optional
+from typing import Callable, Any, Dict, Hashable, Iterable, List, Optional, Sequence
 
 
 @dataclass
@@ -9,12 +9,28 @@ class Task:
     func: Callable
     args: tuple = ()
     kwargs: Dict[str, Any] = None
-    timeout: float = 3.0
+    timeout: float = 3.0  # per attempt
     retry: int = 3
     backoff_factor: float = 0.5
+    jitter: bool = False  # randomize each backoff delay in [0, delay]
+    partition: Optional[str] = None  # quota key, e.g. the upstream provider
+    priority: int = 0  # higher values are dispatched first
+    deadline: Optional[float] = None  # absolute time.time(); dropped once passed
+    executor: Optional[str] = None  # "thread"/"process"; None auto-detects
+    key: Optional[Hashable] = None  # identity for coalescing/caching
+    total_timeout: Optional[float] = None  # budget across attempts and queueing
+    retry_on_timeout: bool = False  # retry attempts that hit `timeout`
 
+    def __post_init__(self):
+        if self.executor not in (None, "thread", "process"):
+            raise ValueError(
+                f'executor must be "thread", "process" or None, got {self.executor!r}'
+            )
+        if self.total_timeout is not None and self.total_timeout <= 0:
+            raise ValueError("total_timeout must be positive")
 
-@dataclass
+
+@dataclass(slots=True)
 class TaskResult:
     """Represents the result of execution"""
 
@@ -23,6 +39,11 @@ class TaskResult:
     error: Optional[str] = None
     execution_time: float = 0.0
     attempt_count: int = 1
+    index: Optional[int] = None  # position of the task in the submitted batch
+    wait_time: float = 0.0  # time spent waiting for a concurrency slot
+    run_time: float = 0.0  # time spent inside attempts
+    # "coalesced", "cache" or "resumed" (from a TaskBackend) if not executed itself
+    shared: Optional[str] = None
 
 
 @dataclass
@@ -32,7 +53,61 @@ class ExecutionReport:
     total_tasks: int
     successful_count: int
     failed_count: int
-    results: List[TaskResult]
+    results: Sequence[TaskResult]  # a list, or a ResultStore for executor runs
+    deadline_missed_count: int = 0
+    cancelled_count: int = 0  # stopped by AsyncTaskExecutor.shutdown()
+    total_wait_time: float = 0.0  # summed time tasks spent waiting for a slot
+    max_wait_time: float = 0.0
+    coalesced_count: int = 0  # results shared from an identical in-flight task
+    cache_hit_count: int = 0
+    resumed_count: int = 0  # finished in an earlier run, loaded from a backend
+
+    @classmethod
+    def from_results(cls, results: List[TaskResult]) -> "ExecutionReport":
+        """Build a report by tallying a list of results"""
+
+        successful = sum(1 for r in results if r.success)
+        return cls(
+            total_tasks=len(results),
+            successful_count=successful,
+            failed_count=len(results) - successful,
+            results=results,
+            deadline_missed_count=sum(
+                1 for r in results if r.error == "DeadlineExceeded"
+            ),
+            cancelled_count=sum(1 for r in results if r.error == "Cancelled"),
+            total_wait_time=sum(r.wait_time for r in results),
+            max_wait_time=max((r.wait_time for r in results), default=0.0),
+            coalesced_count=sum(1 for r in results if r.shared == "coalesced"),
+            cache_hit_count=sum(1 for r in results if r.shared == "cache"),
+            resumed_count=sum(1 for r in results if r.shared == "resumed"),
+        )
+
+    @classmethod
+    def from_store(cls, store) -> "ExecutionReport":
+        """Build a report from a ResultStore, using its running counters"""
+
+        return cls(
+            total_tasks=len(store),
+            successful_count=store.successful_count,
+            failed_count=store.failed_count,
+            results=store,
+            deadline_missed_count=store.deadline_missed_count,
+            cancelled_count=store.cancelled_count,
+            total_wait_time=store.total_wait_time,
+            max_wait_time=store.max_wait_time,
+            coalesced_count=store.coalesced_count,
+            cache_hit_count=store.cache_hit_count,
+            resumed_count=store.resumed_count,
+        )
+
+    def latency_percentiles(self) -> Dict[str, float]:
+        """p50/p95/p99/max of end-to-end task execution time in seconds"""
+
+        times = getattr(self.results, "execution_times", None)
+        if times is None:
+            times = [r.execution_time for r in self.results]
+        return latency_percentiles(times)
 
     def summary(self) -> str:
         """Return human-readable summary of execution"""
@@ -42,5 +117,28 @@ class ExecutionReport:
             f"Total Tasks: {self.total_tasks}\n"
             f"Successful: {self.successful_count}\n"
             f"Failed: {self.failed_count}\n"
-            f"Success Rate: {self.successful_count / self.total_tasks * 100:.2f}%"
+            f"Success Rate: {self.successful_count / self.total_tasks * 100:.2f}%\n"
+            f"Deadline Missed: {self.deadline_missed_count}\n"
+            f"Cancelled: {self.cancelled_count}\n"
+            f"Queue Wait: avg {self.total_wait_time / self.total_tasks:.3f}s, "
+            f"max {self.max_wait_time:.3f}s\n"
+            f"Shared: {self.coalesced_count} coalesced, "
+            f"{self.cache_hit_count} cache hits, {self.resumed_count} resumed\n"
+            f"Latency: "
+            + ", ".join(f"{k} {v:.3f}s" for k, v in self.latency_percentiles().items())
         )
+
+
+def latency_percentiles(values: Iterable[float]) -> Dict[str, float]:
+    """Nearest-rank p50/p95/p99/max of a set of latencies"""
+
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    last = len(ordered) - 1
+    return {
+        "p50": ordered[int(0.50 * last)],
+        "p95": ordered[int(0.95 * last)],
+        "p99": ordered[int(0.99 * last)],
+        "max": ordered[last],
+    }
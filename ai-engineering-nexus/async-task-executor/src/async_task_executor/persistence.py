@@ -0,0 +1,286 @@
+import hashlib
+import logging
+import pickle
+import sqlite3
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+
+from async_task_executor.models import Task, TaskResult
+from async_task_executor.store import ResultStore
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Keys per "WHERE key IN (...)" query, well below SQLite's variable limit
+_QUERY_CHUNK = 500
+
+
+def stable_key(task: Task) -> str:
+    """
+    Identity of a task that survives a process restart.
+
+    Task.key is used as is when set. Otherwise the key is a hash of the
+    function's module and qualified name plus the repr() of args and
+    kwargs, so arguments must have a deterministic repr (str, numbers,
+    tuples, dicts of those...). For anything else set Task.key.
+    """
+
+    if task.key is not None:
+        return task.key if isinstance(task.key, str) else repr(task.key)
+    func = task.func
+    identity = (
+        f"{getattr(func, '__module__', '')}."
+        f"{getattr(func, '__qualname__', None) or repr(func)}:"
+        f"{task.args!r}:{sorted((task.kwargs or {}).items())!r}"
+    )
+    return hashlib.sha256(identity.encode()).hexdigest()
+
+
+class TaskBackend:
+    """
+    Durable record of task state, so a restarted run() can resume.
+
+    Tasks move pending -> running -> done (or failed). run() loads the
+    done results of its batch, skips those tasks and executes the rest.
+    Subclasses decide how and when state reaches storage; run() calls
+    flush() before it returns, also when it is cancelled or shut down.
+    run() calls load(), register() and flush() from a worker thread, and
+    started() and finished() on the event loop, so those two must not
+    block.
+    """
+
+    def load(self, keys: Sequence[str]) -> Dict[str, TaskResult]:
+        """Stored results of the finished tasks among keys."""
+        raise NotImplementedError
+
+    def register(self, keys: Sequence[str]) -> None:
+        """Record keys as pending unless they are already known."""
+        raise NotImplementedError
+
+    def started(self, key: str) -> None:
+        """Record that the first attempt of a task has started."""
+        raise NotImplementedError
+
+    def finished(self, key: str, result: TaskResult) -> None:
+        """Record the final result of a task."""
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Write out any buffered state changes."""
+
+    def close(self) -> None:
+        """Flush and release the storage."""
+        self.flush()
+
+
+class SQLiteBackend(TaskBackend):
+    """
+    TaskBackend storing one row per task key in a SQLite database.
+
+    State changes are buffered and written in one transaction every
+    `batch_size` changes or `flush_interval` seconds, so a crash loses at
+    most that window; the affected tasks simply run again on resume.
+    The connection belongs to a single writer thread: buffered changes
+    are handed to it and written there, so the event loop never waits
+    on the disk.
+    Result values are pickled. A result that can't be pickled is not
+    recorded and its task runs again on resume.
+
+    Example:
+        >>> backend = SQLiteBackend("backfill.db")
+        >>> executor = AsyncTaskExecutor(max_concurrent=50, backend=backend)
+        >>> report = await executor.run(tasks)  # after a crash: only the rest
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        resume_failed: bool = True,
+    ):
+        """
+        Args:
+            path: Database file, created if missing (":memory:" for tests)
+            batch_size: Buffered state changes that trigger a write
+            flush_interval: Seconds after which buffered changes are
+                written at the next state change
+            resume_failed: Run tasks that failed last time again; with
+                False their stored failure is reported instead
+        """
+
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.resume_failed = resume_failed
+        # Only ever used on the writer thread (after this constructor)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sqlite-backend"
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " key TEXT PRIMARY KEY,"
+            " state TEXT NOT NULL,"
+            " result BLOB,"
+            " updated REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._started: List[Tuple[float, str]] = []
+        self._finished: List[Tuple[str, bytes, float, str]] = []
+        self._last_flush = time.monotonic()
+
+    def _call(self, func, *args):
+        """Run func on the writer thread and wait for its result."""
+
+        return self._writer.submit(func, *args).result()
+
+    def load(self, keys: Sequence[str]) -> Dict[str, TaskResult]:
+        return self._call(self._load, list(keys))
+
+    def _load(self, keys: List[str]) -> Dict[str, TaskResult]:
+        states = (DONE,) if self.resume_failed else (DONE, FAILED)
+        state_marks = ",".join("?" * len(states))
+        loaded = {}
+        for start in range(0, len(keys), _QUERY_CHUNK):
+            chunk = keys[start : start + _QUERY_CHUNK]
+            # Looked up through the primary key index
+            rows = self._conn.execute(
+                f"SELECT key, result FROM tasks WHERE key IN ({','.join('?' * len(chunk))})"
+                f" AND state IN ({state_marks})",
+                (*chunk, *states),
+            )
+            for key, blob in rows:
+                success, value, error, execution_time, attempts = pickle.loads(blob)
+                loaded[key] = TaskResult(
+                    success=success,
+                    result=value,
+                    error=error,
+                    execution_time=execution_time,
+                    attempt_count=attempts,
+                    shared="resumed",
+                )
+        return loaded
+
+    def register(self, keys: Sequence[str]) -> None:
+        self._call(self._register, list(keys))
+
+    def _register(self, keys: List[str]) -> None:
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO tasks (key, state, updated) VALUES (?, ?, ?)",
+            ((key, PENDING, now) for key in keys),
+        )
+        self._conn.commit()
+
+    def started(self, key: str) -> None:
+        self._started.append((time.time(), key))
+        self._maybe_flush()
+
+    def finished(self, key: str, result: TaskResult) -> None:
+        try:
+            blob = pickle.dumps(
+                (
+                    result.success,
+                    result.result,
+                    result.error,
+                    result.execution_time,
+                    result.attempt_count,
+                ),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        except Exception as e:
+            logger.warning("Not persisting result of %s: %s", key, e)
+            return
+        state = DONE if result.success else FAILED
+        self._finished.append((state, blob, time.time(), key))
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if (
+            len(self._started) + len(self._finished) >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self._submit().add_done_callback(self._log_write_error)
+
+    def _submit(self) -> Future:
+        """Hand the buffered changes to the writer thread."""
+
+        started, self._started = self._started, []
+        finished, self._finished = self._finished, []
+        self._last_flush = time.monotonic()
+        return self._writer.submit(self._write, started, finished)
+
+    @staticmethod
+    def _log_write_error(write: Future) -> None:
+        error = write.exception()
+        if error is not None:
+            logger.error("Writing task state failed: %s", error)
+
+    def flush(self) -> None:
+        """Write buffered changes and wait until every write is done."""
+
+        # The writer runs submissions in order, so earlier writes are done too
+        self._submit().result()
+
+    def _write(self, started: list, finished: list) -> None:
+        if not started and not finished:
+            return
+        with self._conn:
+            # Never move a task that is already done back to running
+            self._conn.executemany(
+                "UPDATE tasks SET state = 'running', updated = ? "
+                "WHERE key = ? AND state != 'done'",
+                started,
+            )
+            self._conn.executemany(
+                "UPDATE tasks SET state = ?, result = ?, updated = ? WHERE key = ?",
+                finished,
+            )
+
+    def counts(self) -> Dict[str, int]:
+        """Number of stored tasks in each state."""
+
+        self.flush()
+        return self._call(
+            lambda: dict(
+                self._conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state")
+            )
+        )
+
+    def close(self) -> None:
+        self.flush()
+        self._call(self._conn.close)
+        self._writer.shutdown()
+
+
+class RecordingStore(ResultStore):
+    """ResultStore that also reports every final result to a TaskBackend."""
+
+    __slots__ = ("backend", "keys")
+
+    def __init__(self, backend: TaskBackend, keys: List[str]):
+        super().__init__(len(keys))
+        self.backend = backend
+        self.keys = keys
+
+    def restore(self, index: int, result: TaskResult) -> None:
+        """Store a result loaded from the backend without recording it again."""
+
+        super().set(index, result)
+
+    def started(self, index: int) -> None:
+        self.backend.started(self.keys[index])
+
+    def set(self, index: int, result: TaskResult) -> None:
+        super().set(index, result)
+        # Cancelled tasks stay pending so that a resumed run executes them
+        if result.error != "Cancelled":
+            self.backend.finished(self.keys[index], result)
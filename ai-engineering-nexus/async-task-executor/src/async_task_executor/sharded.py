@@ -0,0 +1,316 @@
+import asyncio
+import logging
+import multiprocessing
+import pickle
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from async_task_executor.executor import AsyncTaskExecutor
+from async_task_executor.limits import PartitionLimit
+from async_task_executor.models import ExecutionReport, Task, TaskResult
+from async_task_executor.store import ResultStore
+
+logger = logging.getLogger(__name__)
+
+
+def split_budget(total: int, shards: int) -> List[int]:
+    """Split a concurrency budget into per-shard budgets that sum to total."""
+
+    if total < shards:
+        raise ValueError(f"a budget of {total} can't give {shards} shards a slot each")
+    base, extra = divmod(total, shards)
+    return [base + (1 if shard < extra else 0) for shard in range(shards)]
+
+
+def _max_shards(
+    max_concurrent: int, partitions: Optional[Dict[str, PartitionLimit]]
+) -> int:
+    """Most shards that can each get a slot of every concurrency budget."""
+
+    caps = [max_concurrent]
+    for limit in (partitions or {}).values():
+        if limit.max_concurrent is not None:
+            caps.append(limit.max_concurrent)
+    return min(caps)
+
+
+def _split_partitions(
+    partitions: Optional[Dict[str, PartitionLimit]], shards: int, shard: int
+) -> Optional[Dict[str, PartitionLimit]]:
+    """A shard's share of every partition's concurrency cap and rate."""
+
+    if not partitions:
+        return partitions
+    split = {}
+    for key, limit in partitions.items():
+        split[key] = PartitionLimit(
+            max_concurrent=(
+                None
+                if limit.max_concurrent is None
+                else split_budget(limit.max_concurrent, shards)[shard]
+            ),
+            rate=None if limit.rate is None else limit.rate / shards,
+            burst=None if limit.burst is None else max(1, limit.burst // shards),
+        )
+    return split
+
+
+def _pack(result: TaskResult) -> tuple:
+    """A TaskResult as a plain tuple, its value pickled up front.
+
+    Pickling each value on its own keeps one unpicklable result from
+    failing the whole batch it is sent in.
+    """
+
+    success, error = result.success, result.error
+    try:
+        value = pickle.dumps(result.result, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        value, success, error = None, False, f"UnpicklableResult: {e}"
+    return (
+        success,
+        value,
+        error,
+        result.execution_time,
+        result.attempt_count,
+        result.wait_time,
+        result.run_time,
+        result.shared,
+    )
+
+
+def _unpack(packed: tuple, index: int) -> TaskResult:
+    success, value, error, execution_time, attempts, wait, run, shared = packed
+    return TaskResult(
+        success=success,
+        result=None if value is None else pickle.loads(value),
+        error=error,
+        execution_time=execution_time,
+        attempt_count=attempts,
+        index=index,
+        wait_time=wait,
+        run_time=run,
+        shared=shared,
+    )
+
+
+def _shard_main(
+    conn,
+    items: List[Tuple[int, Task]],
+    max_concurrent: int,
+    executor_kwargs: Dict[str, Any],
+    batch_size: int,
+    flush_interval: float,
+) -> None:
+    """Entry point of a shard process: run items, send results in batches."""
+
+    async def main():
+        executor = AsyncTaskExecutor(max_concurrent=max_concurrent, **executor_kwargs)
+        buffer = []
+        last_send = time.monotonic()
+        async with executor:
+            async for result in executor.run_stream(task for _, task in items):
+                buffer.append((items[result.index][0], _pack(result)))
+                now = time.monotonic()
+                if len(buffer) >= batch_size or now - last_send >= flush_interval:
+                    conn.send(buffer)
+                    buffer = []
+                    last_send = now
+        if buffer:
+            conn.send(buffer)
+
+    try:
+        asyncio.run(main())
+    finally:
+        conn.close()
+
+
+class ShardedExecutor:
+    """
+    Runs one batch across several processes, each with its own event loop.
+
+    Tasks are dealt round-robin to `shards` worker processes. Each one
+    runs its share through an AsyncTaskExecutor.run_stream() with
+    max_concurrent split between the shards (as are partition caps and
+    rates), so the shards together never exceed the global budget, and
+    sends results back over a pipe in batches of up to
+    batch_size (or whatever has finished after flush_interval seconds).
+    The parent merges them into one ExecutionReport in input order.
+
+    Use it when tasks do enough Python work around their I/O (parsing,
+    decoding) to saturate one core. Task functions, arguments and results
+    must be picklable: functions defined at module level, not lambdas or
+    closures. With the default "spawn" start method, scripts must guard
+    their entry point with `if __name__ == "__main__":`. Results that
+    can't be pickled come back as failures with error
+    "UnpicklableResult: ...", and tasks of a shard that dies fail with
+    "ShardFailed".
+
+    A shard needs at least one slot of every budget, so fewer shards
+    than requested are started when max_concurrent (or a partition's
+    max_concurrent) is smaller than `shards`.
+
+    Example:
+        >>> executor = ShardedExecutor(shards=4, max_concurrent=200)
+        >>> report = await executor.run(tasks)
+    """
+
+    def __init__(
+        self,
+        shards: int,
+        max_concurrent: int,
+        batch_size: int = 256,
+        flush_interval: float = 0.1,
+        start_method: str = "spawn",
+        **executor_kwargs,
+    ):
+        """
+        Args:
+            shards: Number of worker processes
+            max_concurrent: Global concurrency budget, split across shards
+            batch_size: Results per message sent back to the parent
+            flush_interval: Seconds after which a shard sends a partial batch
+            start_method: multiprocessing start method for the shards
+            **executor_kwargs: Passed to each shard's AsyncTaskExecutor
+                (partitions, breaker...); must be picklable. `engine`
+                is rejected: shards run tasks through run_stream(),
+                which doesn't use the pool engine
+        """
+
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        if "engine" in executor_kwargs:
+            raise ValueError(
+                "engine has no effect on a ShardedExecutor: shards use run_stream()"
+            )
+        self.shards = shards
+        self.max_concurrent = max_concurrent
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._context = multiprocessing.get_context(start_method)
+        self.executor_kwargs = executor_kwargs
+
+    async def run(self, tasks: List[Task]) -> ExecutionReport:
+        """
+        Execute tasks across the shards and return one merged report.
+
+        Args:
+            tasks: List of Task objects to execute
+
+        Returns:
+            ExecutionReport over all tasks, results in input order
+        """
+
+        results = ResultStore(len(tasks))
+        shards = min(
+            self.shards,
+            len(tasks),
+            _max_shards(self.max_concurrent, self.executor_kwargs.get("partitions")),
+        )
+        if shards == 0:
+            return ExecutionReport.from_store(results)
+        budgets = split_budget(self.max_concurrent, shards)
+        indexed = list(enumerate(tasks))
+        assignments = [indexed[shard::shards] for shard in range(shards)]
+
+        workers = []
+        for shard, items in enumerate(assignments):
+            kwargs = dict(self.executor_kwargs)
+            kwargs["partitions"] = _split_partitions(
+                kwargs.get("partitions"), shards, shard
+            )
+            receiver, sender = self._context.Pipe(duplex=False)
+            process = self._context.Process(
+                target=_shard_main,
+                args=(
+                    sender,
+                    items,
+                    budgets[shard],
+                    kwargs,
+                    self.batch_size,
+                    self.flush_interval,
+                ),
+                name=f"async-task-executor-shard-{shard}",
+                daemon=True,
+            )
+            workers.append((process, receiver, sender, items))
+
+        # One thread per shard blocks in recv(), so the shards never starve
+        # the loop's default executor
+        readers = ThreadPoolExecutor(
+            max_workers=shards, thread_name_prefix="async-task-executor-shard"
+        )
+        try:
+            # Starting (and, for spawn, pickling every task) blocks
+            await asyncio.to_thread(self._start, workers)
+            await asyncio.gather(
+                *(
+                    self._collect(process, receiver, items, results, readers)
+                    for process, receiver, _, items in workers
+                )
+            )
+        finally:
+            for process, receiver, _, _ in workers:
+                if process.is_alive():
+                    process.terminate()
+            await asyncio.to_thread(
+                lambda: [process.join() for process, *_ in workers if process.pid]
+            )
+            for _, receiver, _, _ in workers:
+                receiver.close()
+            readers.shutdown(wait=False)
+        return ExecutionReport.from_store(results)
+
+    @staticmethod
+    def _start(workers: list) -> None:
+        for process, _, sender, _ in workers:
+            process.start()
+            # The child owns the sending end now; closing ours lets recv()
+            # raise EOFError once the child is done
+            sender.close()
+
+    @staticmethod
+    async def _collect(
+        process,
+        receiver,
+        items: List[Tuple[int, Task]],
+        results: ResultStore,
+        readers: Executor,
+    ) -> None:
+        """Store a shard's result batches until its pipe closes."""
+
+        loop = asyncio.get_running_loop()
+        received = 0
+        while True:
+            try:
+                batch = await loop.run_in_executor(readers, receiver.recv)
+            except EOFError:
+                break
+            for index, packed in batch:
+                results.set(index, _unpack(packed, index))
+            received += len(batch)
+
+        if received < len(items):
+            await asyncio.to_thread(process.join)
+            logger.error(
+                "Shard %s exited with code %s after %d of %d results",
+                process.name,
+                process.exitcode,
+                received,
+                len(items),
+            )
+            pending = set(results.pending())
+            for index, _ in items:
+                if index in pending:
+                    results.set(
+                        index,
+                        TaskResult(
+                            success=False,
+                            error="ShardFailed",
+                            attempt_count=0,
+                            index=index,
+                        ),
+                    )
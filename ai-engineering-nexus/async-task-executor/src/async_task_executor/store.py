@@ -0,0 +1,159 @@
+from array import array
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, Union
+
+from async_task_executor.models import TaskResult
+
+_PENDING, _SUCCEEDED, _FAILED = 0, 1, 2
+
+
+class ResultStore(Sequence):
+    """
+    Columnar, array-backed storage for the results of one batch.
+
+    Instead of one TaskResult object per task, status flags, timings and
+    attempt counts live in flat arrays (about 37 bytes per task plus the
+    result value itself) and errors are kept only for failed tasks.
+    TaskResult objects are built on demand when an item is read.
+    Counters are updated as results are stored, so an ExecutionReport
+    never has to walk the results again.
+
+    Example:
+        >>> store = ResultStore(size=len(tasks))
+        >>> store.set(0, TaskResult(success=True, result=42))
+        >>> store[0].result
+        42
+    """
+
+    __slots__ = (
+        "_status",
+        "_execution_time",
+        "_wait_time",
+        "_run_time",
+        "_attempts",
+        "_values",
+        "_errors",
+        "_shared",
+        "successful_count",
+        "failed_count",
+        "deadline_missed_count",
+        "cancelled_count",
+        "total_wait_time",
+        "max_wait_time",
+        "coalesced_count",
+        "cache_hit_count",
+        "resumed_count",
+    )
+
+    def __init__(self, size: int = 0):
+        """
+        Args:
+            size: Number of results to preallocate; set() fills them by
+                index, append() grows the store past them
+        """
+
+        self._status = bytearray(size)  # _PENDING, _SUCCEEDED or _FAILED
+        self._execution_time = array("d", bytes(8 * size))
+        self._wait_time = array("d", bytes(8 * size))
+        self._run_time = array("d", bytes(8 * size))
+        self._attempts = array("I", bytes(4 * size))
+        self._values: List[Any] = [None] * size
+        self._errors: Dict[int, str] = {}
+        self._shared: Dict[int, str] = {}
+        self.successful_count = 0
+        self.failed_count = 0
+        self.deadline_missed_count = 0
+        self.cancelled_count = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.coalesced_count = 0
+        self.cache_hit_count = 0
+        self.resumed_count = 0
+
+    def set(self, index: int, result: TaskResult) -> None:
+        """Store the result of the task at position index."""
+
+        self._status[index] = _SUCCEEDED if result.success else _FAILED
+        self._execution_time[index] = result.execution_time
+        self._wait_time[index] = result.wait_time
+        self._run_time[index] = result.run_time
+        self._attempts[index] = result.attempt_count
+        self._values[index] = result.result
+        if result.success:
+            self.successful_count += 1
+        else:
+            self.failed_count += 1
+            if result.error is not None:
+                self._errors[index] = result.error
+                if result.error == "DeadlineExceeded":
+                    self.deadline_missed_count += 1
+                elif result.error == "Cancelled":
+                    self.cancelled_count += 1
+        if result.shared is not None:
+            self._shared[index] = result.shared
+            if result.shared == "cache":
+                self.cache_hit_count += 1
+            elif result.shared == "resumed":
+                self.resumed_count += 1
+            else:
+                self.coalesced_count += 1
+        self.total_wait_time += result.wait_time
+        if result.wait_time > self.max_wait_time:
+            self.max_wait_time = result.wait_time
+
+    def append(self, result: TaskResult) -> None:
+        """Store a result after the current last one."""
+
+        self._status.append(_PENDING)
+        self._execution_time.append(0.0)
+        self._wait_time.append(0.0)
+        self._run_time.append(0.0)
+        self._attempts.append(0)
+        self._values.append(None)
+        self.set(len(self._values) - 1, result)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[TaskResult, List[TaskResult]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return TaskResult(
+            success=self._status[index] == _SUCCEEDED,
+            result=self._values[index],
+            error=self._errors.get(index),
+            execution_time=self._execution_time[index],
+            attempt_count=self._attempts[index],
+            index=index,
+            wait_time=self._wait_time[index],
+            run_time=self._run_time[index],
+            shared=self._shared.get(index),
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def pending(self) -> Iterator[int]:
+        """Indexes that have not been given a result yet."""
+
+        start = 0
+        while (index := self._status.find(_PENDING, start)) != -1:
+            yield index
+            start = index + 1
+
+    @property
+    def execution_times(self) -> array:
+        """End-to-end time of every task, in index order."""
+
+        return self._execution_time
+
+    def __repr__(self) -> str:
+        return (
+            f"ResultStore({len(self)} results, {self.successful_count} successful, "
+            f"{self.failed_count} failed)"
+        )
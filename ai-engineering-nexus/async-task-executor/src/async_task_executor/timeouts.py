@@ -0,0 +1,100 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import List, Optional
+
+
+class Timeout:
+    """A pending timeout returned by TimeoutScheduler.schedule()."""
+
+    __slots__ = ("when", "task", "fired", "cancelled")
+
+    def __init__(self, when: float, task: asyncio.Task):
+        self.when = when
+        self.task = task
+        self.fired = False  # the task has been cancelled by this timeout
+        self.cancelled = False
+
+
+# asyncio may run a timer this early, see BaseEventLoop._run_once
+_CLOCK_RESOLUTION = time.get_clock_info("monotonic").resolution
+
+
+class TimeoutScheduler:
+    """
+    Heap of timeouts for one event loop, driven by a single loop timer.
+
+    Instead of one timer handle (or wrapper task) per attempt, every
+    pending timeout sits in a heap and only the earliest one is armed
+    with loop.call_at(). When it expires, every due timeout cancels its
+    task, the same way asyncio.timeout() does, and the timer is re-armed
+    for the next one. Cancelled timeouts are dropped lazily and the heap
+    is compacted once they make up most of it.
+
+    Example:
+        >>> scheduler = TimeoutScheduler(asyncio.get_running_loop())
+        >>> timeout = scheduler.schedule(loop.time() + 2, asyncio.current_task())
+        >>> try:
+        ...     await call_upstream()
+        ... finally:
+        ...     scheduler.cancel(timeout)
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self._heap: List[tuple] = []  # (when, seq, Timeout)
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._armed_at: Optional[float] = None
+        self._cancelled = 0
+
+    def schedule(self, when: float, task: asyncio.Task) -> Timeout:
+        """Cancel task at loop time `when` unless the timeout is cancelled first."""
+
+        timeout = Timeout(when, task)
+        heapq.heappush(self._heap, (when, next(self._seq), timeout))
+        if self._armed_at is None or when < self._armed_at:
+            self._arm(when)
+        return timeout
+
+    def cancel(self, timeout: Timeout) -> None:
+        """Withdraw a timeout that has not fired."""
+
+        if timeout.fired or timeout.cancelled:
+            return
+        timeout.cancelled = True
+        timeout.task = None
+        self._cancelled += 1
+        if self._cancelled > 64 and self._cancelled * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._cancelled
+
+    def _arm(self, when: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._armed_at = when
+        self._timer = self.loop.call_at(when, self._fire)
+
+    def _fire(self) -> None:
+        self._timer = None
+        self._armed_at = None
+        now = self.loop.time() + _CLOCK_RESOLUTION
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            timeout = heapq.heappop(heap)[2]
+            if timeout.cancelled:
+                self._cancelled -= 1
+                continue
+            timeout.fired = True
+            task, timeout.task = timeout.task, None
+            task.cancel()
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+            self._cancelled -= 1
+        if heap:
+            self._arm(heap[0][0])
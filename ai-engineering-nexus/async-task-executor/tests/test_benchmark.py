@@ -0,0 +1,76 @@
+import dataclasses
+import sys
+import pytest
+from async_task_executor import benchmark
+from async_task_executor.benchmark import (
+    PROFILES,
+    build_tasks,
+    compare,
+    format_table,
+    load_baseline,
+    measure,
+    peak_rss_mb,
+    save_baseline,
+)
+
+
+def test_build_tasks_is_reproducible():
+    profile = PROFILES["flaky"]
+
+    first = [t.args for t in build_tasks(profile, 50, seed=3)]
+    second = [t.args for t in build_tasks(profile, 50, seed=3)]
+
+    assert first == second
+    assert any(fails for _, fails in first)
+
+
+def test_heavy_tail_keeps_mean_latency():
+    latencies = PROFILES["heavy_tail"].latencies(20_000)
+
+    assert sum(latencies) / len(latencies) == pytest.approx(0.01, rel=0.1)
+    assert max(latencies) > 10 * 0.01
+
+
+@pytest.mark.asyncio
+async def test_measure_reports_metrics():
+    result = await measure(PROFILES["timeouts"], 40, concurrency=20)
+
+    assert result.tasks == 40
+    assert result.successful + result.failed == 40
+    assert result.tasks_per_sec > 0
+    assert result.p50_s <= result.p99_s
+    if sys.platform != "win32":
+        assert result.peak_rss_mb > 0
+
+
+@pytest.mark.asyncio
+async def test_compare_flags_regressions(tmp_path):
+    baseline = await measure(PROFILES["overhead"], 100, concurrency=10)
+    path = tmp_path / "baseline.json"
+    save_baseline(str(path), [baseline])
+
+    loaded = load_baseline(str(path))
+    slower = dataclasses.replace(
+        baseline, tasks_per_sec=baseline.tasks_per_sec / 2, peak_rss_mb=0.0
+    )
+
+    assert loaded == [baseline]
+    assert compare(loaded, [baseline]) == []
+    regressions = compare(loaded, [slower], threshold=0.1)
+    assert len(regressions) == 1
+    assert "tasks_per_sec" in regressions[0]
+
+
+@pytest.mark.asyncio
+async def test_peak_rss_is_optional(monkeypatch):
+    # What a Windows machine without psutil sees
+    monkeypatch.setattr(benchmark, "resource", None)
+    monkeypatch.setattr(benchmark, "psutil", None)
+    assert peak_rss_mb() is None
+
+    result = await measure(PROFILES["overhead"], 10, concurrency=5)
+    baseline = dataclasses.replace(result, peak_rss_mb=100.0)
+
+    assert result.peak_rss_mb is None
+    assert "n/a" in format_table([result])
+    assert compare([baseline], [result]) == []
@@ -0,0 +1,42 @@
+import time
+import pytest
+from async_task_executor.cache import ResultCache
+
+
+def test_get_and_set():
+    cache = ResultCache(max_size=2)
+
+    assert cache.get("a") == (False, None)
+    cache.set("a", 1)
+
+    assert cache.get("a") == (True, 1)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first"""
+
+    cache = ResultCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+    assert len(cache) == 2
+
+
+def test_ttl_expiry():
+    cache = ResultCache(ttl=0.05)
+    cache.set("a", 1)
+    time.sleep(0.06)
+
+    assert cache.get("a") == (False, None)
+    assert len(cache) == 0
+
+
+def test_rejects_bad_size():
+    with pytest.raises(ValueError):
+        ResultCache(max_size=0)
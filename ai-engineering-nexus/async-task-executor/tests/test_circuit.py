@@ -0,0 +1,57 @@
+import time
+from async_task_executor.circuit import BreakerConfig, CircuitBreaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("gemini", BreakerConfig(failure_threshold=3))
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow() is False
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker("gemini", BreakerConfig(failure_threshold=2))
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_trial_closes_or_reopens():
+    config = BreakerConfig(failure_threshold=1, recovery_time=0.05)
+    breaker = CircuitBreaker("gemini", config)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    # Only one trial call while half-open
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow() is True
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_released_trial_frees_half_open_slot():
+    config = BreakerConfig(failure_threshold=1, recovery_time=0.05)
+    breaker = CircuitBreaker("gemini", config)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.allow() is True
+    breaker.release()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is True
@@ -1,6 +1,10 @@
 import asyncio
+import time
 import pytest
 from async_task_executor.executor import AsyncTaskExecutor
+from async_task_executor.cache import ResultCache
+from async_task_executor.circuit import BreakerConfig
+from async_task_executor.limits import AdaptiveConfig, PartitionLimit
 from async_task_executor.models import Task
 
 attempt_count = 0
@@ -26,6 +30,48 @@ async def very_long_task():
     return "Success"
 
 
+async def sleep_task(delay):
+    await asyncio.sleep(delay)
+    return delay
+
+
+in_flight = 0
+peak_in_flight = 0
+
+
+async def tracked_task():
+    global in_flight, peak_in_flight
+    in_flight += 1
+    peak_in_flight = max(peak_in_flight, in_flight)
+    await asyncio.sleep(0.01)
+    in_flight -= 1
+    return "Success"
+
+
+def make_flaky(failures):
+    calls = 0
+
+    async def flaky():
+        nonlocal calls
+        calls += 1
+        if calls <= failures:
+            raise ConnectionError("Upstream unavailable")
+        return calls
+
+    return flaky
+
+
+def blocking_task(delay):
+    """Sync function that would stall the event loop if called on it"""
+
+    time.sleep(delay)
+    return delay
+
+
+def cpu_task(n):
+    return sum(i * i for i in range(n))
+
+
 async def flaky_task():
     global attempt_count
     attempt_count += 1
@@ -144,7 +190,687 @@ async def test_exponential_backoff():
     tasks = [Task(func=failure_task, retry=3, backoff_factor=2)]
     executor_report = await executor.run(tasks)
     total_time = executor_report.results[0].execution_time
-    assert 13 <= total_time <= 15
+    # Backoff of 2s and 4s between the three attempts; no sleep after the last
+    assert 5.5 <= total_time <= 7
+
+
+@pytest.mark.asyncio
+async def test_stream_completion_order():
+    """Test that run_stream yields results as they complete, with indexes"""
+
+    executor = AsyncTaskExecutor(max_concurrent=3)
+    tasks = [Task(func=sleep_task, args=(d,)) for d in (0.3, 0.1, 0.2)]
+
+    results = [result async for result in executor.run_stream(tasks)]
+
+    assert [r.index for r in results] == [1, 2, 0]
+    assert [r.result for r in results] == [0.1, 0.2, 0.3]
+
+
+@pytest.mark.asyncio
+async def test_stream_bounded_in_flight():
+    """Test that run_stream only pulls max_concurrent tasks at a time"""
+
+    pulled = 0
+
+    async def task_source():
+        nonlocal pulled
+        for _ in range(50):
+            pulled += 1
+            yield Task(func=tracked_task)
+
+    executor = AsyncTaskExecutor(max_concurrent=4)
+    count = 0
+    async for result in executor.run_stream(task_source()):
+        # Lazily consumed: never more than one batch ahead of the consumer
+        assert pulled - count <= 5
+        count += 1
+
+    assert count == 50
+    assert peak_in_flight <= 4
+
+
+@pytest.mark.asyncio
+async def test_stream_first_result_early():
+    """Test that the first result arrives before the slowest task finishes"""
+
+    executor = AsyncTaskExecutor(max_concurrent=2)
+    tasks = [Task(func=sleep_task, args=(1,)), Task(func=sleep_task, args=(0.1,))]
+
+    start_time = asyncio.get_event_loop().time()
+    stream = executor.run_stream(tasks)
+    first = await anext(stream)
+    elapsed = asyncio.get_event_loop().time() - start_time
+    await stream.aclose()
+
+    assert first.index == 1
+    assert elapsed < 0.5
+    # Closing the stream early cancels the task still in flight
+    await asyncio.sleep(0)
+    assert len(asyncio.all_tasks()) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_does_not_wait_for_slow_source():
+    """Test that a finished task is yielded while the source is still busy"""
+
+    async def slow_source():
+        yield Task(func=sleep_task, args=(0.01,))
+        await asyncio.sleep(1)
+        yield Task(func=sleep_task, args=(0.01,))
+
+    executor = AsyncTaskExecutor(max_concurrent=4)
+    start_time = asyncio.get_event_loop().time()
+    elapsed = []
+    async for result in executor.run_stream(slow_source()):
+        elapsed.append(asyncio.get_event_loop().time() - start_time)
+
+    assert len(elapsed) == 2
+    # Before the source yields its second task
+    assert elapsed[0] < 0.5
+    assert elapsed[1] >= 1
+
+
+@pytest.mark.asyncio
+async def test_pool_engine_report():
+    """Test that the worker-pool engine reports like the semaphore engine"""
+
+    executor = AsyncTaskExecutor(max_concurrent=3, engine="pool")
+    tasks = [Task(func=success_task, args=(i,)) for i in range(3)]
+    tasks += [Task(func=failure_task, args=(i,), retry=1) for i in range(2)]
+
+    executor_report = await executor.run(tasks)
+
+    assert executor_report.total_tasks == 5
+    assert executor_report.successful_count == 3
+    assert executor_report.failed_count == 2
+    assert [r.index for r in executor_report.results] == [0, 1, 2, 3, 4]
+    assert len(asyncio.all_tasks()) == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_engine_concurrency_limit():
+    """Test that the worker pool never runs more than max_concurrent tasks"""
+
+    global peak_in_flight
+    peak_in_flight = 0
+    executor = AsyncTaskExecutor(max_concurrent=4, engine="pool")
+    tasks = [Task(func=tracked_task) for _ in range(40)]
+
+    executor_report = await executor.run(tasks)
+
+    assert executor_report.successful_count == 40
+    assert peak_in_flight == 4
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        AsyncTaskExecutor(max_concurrent=2, engine="threads")
+
+
+@pytest.mark.asyncio
+async def test_backoff_releases_slot():
+    """Test that a task sleeping through backoff doesn't hold its slot"""
+
+    for engine in AsyncTaskExecutor.ENGINES:
+        executor = AsyncTaskExecutor(max_concurrent=1, engine=engine)
+        tasks = [
+            Task(func=make_flaky(1), retry=2, backoff_factor=1),
+            Task(func=sleep_task, args=(0.1,)),
+        ]
+
+        executor_report = await executor.run(tasks)
+        flaky_result, quick_result = executor_report.results
+
+        assert flaky_result.success is True
+        assert flaky_result.attempt_count == 2
+        # The quick task ran during the flaky task's 1s backoff
+        assert quick_result.execution_time < 0.5
+        assert flaky_result.run_time < 0.1
+        assert flaky_result.execution_time >= 1
+
+
+@pytest.mark.asyncio
+async def test_wait_time_recorded():
+    """Test that slot wait time is reported separately from run time"""
+
+    executor = AsyncTaskExecutor(max_concurrent=1)
+    tasks = [Task(func=sleep_task, args=(0.2,)) for _ in range(2)]
+
+    executor_report = await executor.run(tasks)
+    waits = sorted(r.wait_time for r in executor_report.results)
+
+    assert waits[0] < 0.05
+    assert 0.15 <= waits[1] < 0.3
+    for r in executor_report.results:
+        assert 0.15 <= r.run_time < 0.3
+
+
+@pytest.mark.asyncio
+async def test_jittered_backoff():
+    """Test that jittered delays never exceed the exponential delay"""
+
+    executor = AsyncTaskExecutor(max_concurrent=5)
+    tasks = [
+        Task(func=make_flaky(2), retry=3, backoff_factor=0.2, jitter=True)
+        for _ in range(5)
+    ]
+
+    executor_report = await executor.run(tasks)
+
+    assert executor_report.successful_count == 5
+    for r in executor_report.results:
+        # Un-jittered this would be exactly 0.2 + 0.4
+        assert r.execution_time <= 0.65
+
+
+@pytest.mark.asyncio
+async def test_partition_concurrency_cap():
+    """Test that a partition's cap holds while other partitions keep going"""
+
+    running = {"slow": 0, "fast": 0}
+    peak = {"slow": 0, "fast": 0}
+
+    async def call(key, delay):
+        running[key] += 1
+        peak[key] = max(peak[key], running[key])
+        await asyncio.sleep(delay)
+        running[key] -= 1
+
+    for engine in AsyncTaskExecutor.ENGINES:
+        peak.update(slow=0, fast=0)
+        executor = AsyncTaskExecutor(
+            max_concurrent=4,
+            engine=engine,
+            partitions={"slow": PartitionLimit(max_concurrent=1)},
+        )
+        tasks = [Task(func=call, args=("slow", 0.3), partition="slow")] * 3
+        tasks += [Task(func=call, args=("fast", 0.05), partition="fast")] * 12
+
+        start_time = asyncio.get_event_loop().time()
+        executor_report = await executor.run(tasks)
+        fast_done = max(r.execution_time for r in executor_report.results[3:])
+
+        assert executor_report.successful_count == 15
+        assert peak["slow"] == 1
+        assert peak["fast"] == 3
+        # Slow tasks only ever hold one of the four global slots
+        assert fast_done < 0.4
+        assert asyncio.get_event_loop().time() - start_time >= 0.9
+
+
+@pytest.mark.asyncio
+async def test_partition_rate_limit():
+    """Test that a partition's token bucket spaces attempts out"""
+
+    for engine in AsyncTaskExecutor.ENGINES:
+        executor = AsyncTaskExecutor(
+            max_concurrent=10,
+            engine=engine,
+            partitions={"api": PartitionLimit(rate=20, burst=1)},
+        )
+        tasks = [Task(func=sleep_task, args=(0,), partition="api") for _ in range(5)]
+
+        start_time = asyncio.get_event_loop().time()
+        executor_report = await executor.run(tasks)
+        elapsed = asyncio.get_event_loop().time() - start_time
+
+        assert executor_report.successful_count == 5
+        assert 0.19 <= elapsed < 0.35
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_respects_time_budget():
+    """Test that tasks whose rate token comes too late fail without waiting"""
+
+    for engine in AsyncTaskExecutor.ENGINES:
+        for budget in ("batch", "task"):
+            limit = PartitionLimit(rate=2)
+            executor = AsyncTaskExecutor(
+                max_concurrent=20, engine=engine, partitions={"api": limit}
+            )
+            tasks = [
+                Task(func=sleep_task, args=(0,), partition="api") for _ in range(20)
+            ]
+            if budget == "task":
+                for task in tasks:
+                    task.total_timeout = 1.0
+
+            start = time.perf_counter()
+            executor_report = await executor.run(
+                tasks, timeout=1.0 if budget == "batch" else None
+            )
+
+            assert time.perf_counter() - start < 1.2
+            # Burst of 2, then one token every 0.5s: only 0.5s fits the budget
+            assert executor_report.successful_count == 3
+            assert executor_report.deadline_missed_count == 17
+            # Dropped tasks took no tokens: the next one is due right away
+            assert executor._partitions["api"].bucket.delay() < 0.5
+
+
+@pytest.mark.asyncio
+async def test_priority_dispatch_order():
+    """Test that higher-priority waiting tasks get the next free slot"""
+
+    for engine in AsyncTaskExecutor.ENGINES:
+        started = []
+
+        async def record(name):
+            started.append(name)
+            await asyncio.sleep(0.01)
+
+        executor = AsyncTaskExecutor(max_concurrent=1, engine=engine)
+        tasks = [Task(func=record, args=("first",))]
+        tasks += [Task(func=record, args=(f"batch-{i}",)) for i in range(3)]
+        tasks += [Task(func=record, args=("interactive",), priority=10)]
+
+        await executor.run(tasks)
+
+        # Submitted last, but starts ahead of every queued batch task
+        assert started.index("interactive") < started.index("batch-0")
+        assert started[-3:] == ["batch-0", "batch-1", "batch-2"]
+
+        # Free slots at the start of a batch go by priority as well
+        started.clear()
+        executor = AsyncTaskExecutor(max_concurrent=2, engine=engine)
+        tasks = [Task(func=record, args=(f"low{i}",)) for i in range(4)]
+        tasks.insert(2, Task(func=record, args=("HIGH",), priority=10))
+
+        await executor.run(tasks)
+
+        assert started == ["HIGH", "low0", "low1", "low2", "low3"]
+
+
+@pytest.mark.asyncio
+async def test_deadline_drops_before_slot():
+    """Test that tasks whose deadline passes while queued never run"""
+
+    for engine in AsyncTaskExecutor.ENGINES:
+        ran = []
+
+        async def record(name):
+            ran.append(name)
+            await asyncio.sleep(0.2)
+
+        executor = AsyncTaskExecutor(max_concurrent=1, engine=engine)
+        tasks = [
+            Task(func=record, args=("blocker",)),
+            Task(func=record, args=("late",), deadline=time.time() + 0.1),
+            Task(func=record, args=("expired",), deadline=time.time() - 1),
+            Task(func=record, args=("on-time",), deadline=time.time() + 5),
+        ]
+
+        executor_report = await executor.run(tasks)
+        late, expired = executor_report.results[1:3]
+
+        assert ran == ["blocker", "on-time"]
+        assert late.error == expired.error == "DeadlineExceeded"
+        assert late.attempt_count == expired.attempt_count == 0
+        assert executor_report.deadline_missed_count == 2
+        assert executor_report.failed_count == 2
+        assert executor_report.max_wait_time >= 0.15
+        assert "Deadline Missed: 2" in executor_report.summary()
+
+
+@pytest.mark.asyncio
+async def test_sync_callable_offloaded_to_threads():
+    """Test that blocking sync functions run off the event loop"""
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticking = asyncio.create_task(ticker())
+    async with AsyncTaskExecutor(max_concurrent=4, max_threads=4) as executor:
+        tasks = [Task(func=blocking_task, args=(0.2,)) for _ in range(4)]
+        start_time = asyncio.get_event_loop().time()
+        executor_report = await executor.run(tasks)
+        elapsed = asyncio.get_event_loop().time() - start_time
+    ticking.cancel()
+
+    assert executor_report.successful_count == 4
+    assert elapsed < 0.35
+    # The loop kept ticking while the threads slept
+    assert ticks >= 10
+
+
+@pytest.mark.asyncio
+async def test_sync_callable_timeout_and_retry():
+    """Test that timeouts and retries apply to offloaded calls"""
+
+    calls = 0
+
+    def flaky_sync():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise ConnectionError("Upstream unavailable")
+        return "Success"
+
+    async with AsyncTaskExecutor(max_concurrent=2) as executor:
+        executor_report = await executor.run(
+            [
+                Task(func=blocking_task, args=(0.5,), timeout=0.1, executor="thread"),
+                Task(func=flaky_sync, retry=2, backoff_factor=0.01),
+            ]
+        )
+
+    timed_out, retried = executor_report.results
+    assert timed_out.error == "TimeoutError"
+    assert retried.success is True
+    assert retried.attempt_count == 2
+
+
+@pytest.mark.asyncio
+async def test_process_executor():
+    """Test that Task(executor="process") runs on the process pool"""
+
+    async with AsyncTaskExecutor(max_concurrent=2, max_processes=2) as executor:
+        executor_report = await executor.run(
+            [Task(func=cpu_task, args=(n,), executor="process") for n in (10, 100)]
+        )
+
+    assert [r.result for r in executor_report.results] == [285, 328350]
+
+
+@pytest.mark.asyncio
+async def test_lambda_returning_coroutine():
+    """Test that plain callables returning coroutines still work"""
+
+    executor = AsyncTaskExecutor(max_concurrent=1)
+    executor_report = await executor.run([Task(func=lambda: sleep_task(0.01))])
+    executor.close()
+
+    assert executor_report.results[0].result == 0.01
+
+
+def test_unknown_task_executor():
+    with pytest.raises(ValueError):
+        Task(func=cpu_task, executor="gpu")
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast():
+    """Test that an open circuit rejects tasks without calling upstream"""
+
+    calls = 0
+
+    async def broken_upstream():
+        nonlocal calls
+        calls += 1
+        raise ConnectionError("503 Service Unavailable")
+
+    executor = AsyncTaskExecutor(
+        max_concurrent=1,
+        breaker=BreakerConfig(failure_threshold=3, recovery_time=60),
+    )
+    tasks = [Task(func=broken_upstream, retry=1, partition="gemini")] * 10
+
+    executor_report = await executor.run(tasks)
+    errors = [r.error for r in executor_report.results]
+
+    assert calls == 3
+    assert errors[3:] == ["CircuitOpen"] * 7
+    assert executor.breaker_states() == {"gemini": "open"}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_does_not_wedge_breaker():
+    """Test that cancelling a half-open trial lets the next task try again"""
+
+    healthy = False
+
+    async def upstream():
+        if not healthy:
+            raise ConnectionError("503 Service Unavailable")
+        await asyncio.sleep(0.2)
+        return "ok"
+
+    executor = AsyncTaskExecutor(
+        max_concurrent=1,
+        breaker=BreakerConfig(failure_threshold=1, recovery_time=0.05),
+    )
+    await executor.run([Task(func=upstream, retry=1, partition="gemini")])
+    assert executor.breaker_states() == {"gemini": "open"}
+
+    await asyncio.sleep(0.06)
+    healthy = True
+    trial = asyncio.create_task(executor.run([Task(func=upstream, partition="gemini")]))
+    await asyncio.sleep(0.05)
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    executor_report = await executor.run([Task(func=upstream, partition="gemini")])
+
+    assert executor_report.results[0].result == "ok"
+    assert executor.breaker_states() == {"gemini": "closed"}
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limit_shrinks_on_errors():
+    """Test that the live concurrency limit follows upstream health"""
+
+    for engine in AsyncTaskExecutor.ENGINES:
+        executor = AsyncTaskExecutor(
+            max_concurrent=8,
+            engine=engine,
+            adaptive=AdaptiveConfig(window=4, initial_limit=4),
+        )
+        assert executor.concurrency_limit == 4
+
+        await executor.run(
+            [Task(func=failure_task, args=(i,), retry=1) for i in range(8)]
+        )
+        assert executor.concurrency_limit == 1
+
+        await executor.run([Task(func=sleep_task, args=(0,)) for _ in range(12)])
+        assert executor.concurrency_limit == 4
+
+
+@pytest.mark.asyncio
+async def test_dedup_coalesces_identical_tasks():
+    """Test that identical in-flight tasks share a single execution"""
+
+    for engine in AsyncTaskExecutor.ENGINES:
+        calls = []
+
+        async def fetch(url):
+            calls.append(url)
+            await asyncio.sleep(0.1)
+            return f"page:{url}"
+
+        executor = AsyncTaskExecutor(max_concurrent=4, engine=engine, dedup=True)
+        tasks = [Task(func=fetch, args=("a",)) for _ in range(5)]
+        tasks += [Task(func=fetch, args=("b",)), Task(func=fetch, kwargs={"url": "b"})]
+
+        executor_report = await executor.run(tasks)
+        results = list(executor_report.results)
+
+        assert sorted(calls) == ["a", "b", "b"]
+        assert [r.result for r in results[:5]] == ["page:a"] * 5
+        assert executor_report.coalesced_count == 4
+        assert sum(r.attempt_count for r in results[:5]) == 1
+        assert "4 coalesced" in executor_report.summary()
+
+
+@pytest.mark.asyncio
+async def test_dedup_user_key_and_unhashable_args():
+    """Test that Task.key groups tasks and unhashable args opt out"""
+
+    calls = 0
+
+    async def ask(payload):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return len(payload)
+
+    executor = AsyncTaskExecutor(max_concurrent=4, dedup=True)
+    tasks = [Task(func=ask, args=({"q": "hi"},)) for _ in range(2)]
+    tasks += [Task(func=ask, args=({"q": "hi"},), key="hi") for _ in range(3)]
+
+    executor_report = await executor.run(tasks)
+
+    assert calls == 3
+    assert executor_report.coalesced_count == 2
+
+
+@pytest.mark.asyncio
+async def test_result_cache_across_batches():
+    """Test that a repeat batch is served from the cache"""
+
+    calls = 0
+
+    async def ask(question):
+        nonlocal calls
+        calls += 1
+        if question == "bad":
+            raise ValueError("no answer")
+        return question.upper()
+
+    executor = AsyncTaskExecutor(max_concurrent=4, cache=ResultCache(ttl=60))
+    tasks = [Task(func=ask, args=(q,), retry=1) for q in ("x", "y", "bad")]
+
+    first = await executor.run(tasks)
+    second = await executor.run(tasks)
+
+    assert first.cache_hit_count == 0
+    assert second.cache_hit_count == 2
+    assert [r.result for r in second.results[:2]] == ["X", "Y"]
+    assert second.results[0].shared == "cache"
+    # Failures are never cached
+    assert second.results[2].success is False
+    assert calls == 4
+
+
+@pytest.mark.asyncio
+async def test_shutdown_drains_running_attempts():
+    """Test that shutdown keeps running attempts and cancels queued tasks"""
+
+    for engine in AsyncTaskExecutor.ENGINES:
+        executor = AsyncTaskExecutor(max_concurrent=2, engine=engine)
+        tasks = [Task(func=sleep_task, args=(0.2,)) for _ in range(10)]
+
+        batch = asyncio.create_task(executor.run(tasks))
+        await asyncio.sleep(0.05)
+        reports = await executor.shutdown(drain_timeout=1)
+        executor_report = await batch
+
+        assert reports == [executor_report]
+        assert executor_report.successful_count == 2
+        assert executor_report.cancelled_count == 8
+        assert executor_report.total_tasks == 10
+        cancelled = [r for r in executor_report.results if not r.success]
+        assert {r.error for r in cancelled} == {"Cancelled"}
+        assert sorted(r.index for r in executor_report.results) == list(range(10))
+        assert "Cancelled: 8" in executor_report.summary()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_cancels_after_drain_timeout():
+    """Test that attempts still running after the drain budget are cancelled"""
+
+    for engine in AsyncTaskExecutor.ENGINES:
+        executor = AsyncTaskExecutor(max_concurrent=5, engine=engine)
+        tasks = [Task(func=sleep_task, args=(2,), timeout=5) for _ in range(5)]
+        tasks.append(Task(func=make_flaky(10), retry=5, backoff_factor=5))
+
+        batch = asyncio.create_task(executor.run(tasks))
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        await executor.shutdown(drain_timeout=0.1)
+        executor_report = await batch
+
+        assert time.perf_counter() - start < 0.5
+        assert executor_report.cancelled_count == 6
+        with pytest.raises(RuntimeError):
+            await executor.run(tasks)
+
+
+@pytest.mark.asyncio
+async def test_total_timeout_bounds_retries():
+    """Test that Task.total_timeout stops a task across attempts and backoff"""
+
+    for engine in AsyncTaskExecutor.ENGINES:
+        executor = AsyncTaskExecutor(max_concurrent=2, engine=engine)
+        task = Task(func=make_flaky(100), retry=10, backoff_factor=0.1)
+        task.total_timeout = 0.5
+
+        start = time.perf_counter()
+        executor_report = await executor.run([task])
+        result = executor_report.results[0]
+
+        assert time.perf_counter() - start < 0.5
+        assert result.error == "DeadlineExceeded"
+        assert 2 <= result.attempt_count < 10
+
+
+@pytest.mark.asyncio
+async def test_retry_on_timeout():
+    """Test that timed-out attempts are retried only when asked to"""
+
+    def hang_once():
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(1 if calls == 1 else 0)
+            return calls
+
+        return call
+
+    executor = AsyncTaskExecutor(max_concurrent=2)
+    tasks = [
+        Task(func=hang_once(), timeout=0.1, backoff_factor=0.01),
+        Task(func=hang_once(), timeout=0.1, backoff_factor=0.01, retry_on_timeout=True),
+    ]
+
+    executor_report = await executor.run(tasks)
+    plain, retried = executor_report.results
+
+    assert (plain.success, plain.error, plain.attempt_count) == (
+        False,
+        "TimeoutError",
+        1,
+    )
+    assert (retried.success, retried.result, retried.attempt_count) == (True, 2, 2)
+
+
+@pytest.mark.asyncio
+async def test_run_timeout_bounds_batch():
+    """Test that run(timeout=...) cuts running attempts and drops the rest"""
+
+    for engine in AsyncTaskExecutor.ENGINES:
+        executor = AsyncTaskExecutor(max_concurrent=2, engine=engine)
+        tasks = [Task(func=sleep_task, args=(0.01,))]
+        tasks += [Task(func=sleep_task, args=(1,)) for _ in range(10)]
+
+        start = time.perf_counter()
+        executor_report = await executor.run(tasks, timeout=0.3)
+
+        assert time.perf_counter() - start < 0.6
+        assert executor_report.deadline_missed_count == 10
+        assert executor_report.results[0].success
+
+
+@pytest.mark.asyncio
+async def test_outer_cancellation_still_propagates():
+    """Test that cancelling run() is not mistaken for an attempt timeout"""
+
+    executor = AsyncTaskExecutor(max_concurrent=2)
+    batch = asyncio.create_task(executor.run([Task(func=sleep_task, args=(1,))]))
+    await asyncio.sleep(0.05)
+    batch.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await batch
 
 
 if __name__ == "__main__":
@@ -156,3 +882,32 @@ if __name__ == "__main__":
     asyncio.run(test_timeout_enforcement())
     asyncio.run(test_retry_success())
     asyncio.run(test_exponential_backoff())
+    asyncio.run(test_stream_completion_order())
+    asyncio.run(test_stream_bounded_in_flight())
+    asyncio.run(test_stream_first_result_early())
+    asyncio.run(test_pool_engine_report())
+    asyncio.run(test_pool_engine_concurrency_limit())
+    test_unknown_engine()
+    asyncio.run(test_backoff_releases_slot())
+    asyncio.run(test_wait_time_recorded())
+    asyncio.run(test_jittered_backoff())
+    asyncio.run(test_partition_concurrency_cap())
+    asyncio.run(test_partition_rate_limit())
+    asyncio.run(test_priority_dispatch_order())
+    asyncio.run(test_deadline_drops_before_slot())
+    asyncio.run(test_sync_callable_offloaded_to_threads())
+    asyncio.run(test_sync_callable_timeout_and_retry())
+    asyncio.run(test_process_executor())
+    asyncio.run(test_lambda_returning_coroutine())
+    test_unknown_task_executor()
+    asyncio.run(test_circuit_breaker_fails_fast())
+    asyncio.run(test_adaptive_limit_shrinks_on_errors())
+    asyncio.run(test_dedup_coalesces_identical_tasks())
+    asyncio.run(test_dedup_user_key_and_unhashable_args())
+    asyncio.run(test_result_cache_across_batches())
+    asyncio.run(test_shutdown_drains_running_attempts())
+    asyncio.run(test_shutdown_cancels_after_drain_timeout())
+    asyncio.run(test_total_timeout_bounds_retries())
+    asyncio.run(test_retry_on_timeout())
+    asyncio.run(test_run_timeout_bounds_batch())
+    asyncio.run(test_outer_cancellation_still_propagates())
@@ -0,0 +1,144 @@
+import asyncio
+import time
+import pytest
+from async_task_executor.limits import (
+    AdaptiveConfig,
+    AdaptiveLimit,
+    Partition,
+    PartitionLimit,
+    PrioritySemaphore,
+    TokenBucket,
+)
+
+
+def test_token_bucket_burst_then_rate():
+    """Test that the bucket allows a burst, then spaces reservations out"""
+
+    bucket = TokenBucket(rate=10, capacity=2)
+
+    delays = [bucket.reserve() for _ in range(4)]
+
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_refills():
+    """Test that unused time refills the bucket up to its capacity"""
+
+    bucket = TokenBucket(rate=100, capacity=1)
+    bucket.reserve()
+    time.sleep(0.05)
+
+    assert bucket.reserve() == 0.0
+
+
+def test_token_bucket_delay_takes_no_token():
+    """Test that delay() reports the wait without reserving anything"""
+
+    bucket = TokenBucket(rate=10, capacity=1)
+    bucket.reserve()
+
+    assert bucket.delay() == pytest.approx(0.1, abs=0.01)
+    assert bucket.delay() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+
+def test_token_bucket_rejects_bad_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+@pytest.mark.asyncio
+async def test_partition_hands_slot_to_oldest_waiter():
+    """Test that release() wakes waiters in order and transfers the slot"""
+
+    partition = Partition("gemini", PartitionLimit(max_concurrent=1))
+    order = []
+
+    async def user(name):
+        await partition.acquire()
+        order.append(name)
+        await asyncio.sleep(0.01)
+        partition.release()
+
+    await asyncio.gather(*[user(i) for i in range(4)])
+
+    assert order == [0, 1, 2, 3]
+    assert partition.active == 0
+
+
+@pytest.mark.asyncio
+async def test_partition_cancelled_waiter_skipped():
+    """Test that a cancelled waiter doesn't swallow the released slot"""
+
+    partition = Partition("gemini", PartitionLimit(max_concurrent=1))
+    await partition.acquire()
+    cancelled = asyncio.create_task(partition.acquire())
+    waiting = asyncio.create_task(partition.acquire())
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    partition.release()
+    await asyncio.wait_for(waiting, timeout=1)
+
+    assert partition.active == 1
+
+
+@pytest.mark.asyncio
+async def test_priority_semaphore_resize():
+    """Test that growing wakes waiters and shrinking lets slots lapse"""
+
+    slots = PrioritySemaphore(max_concurrent=1)
+    await slots.acquire()
+    waiters = [asyncio.create_task(slots.acquire()) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    slots.resize(3)
+    await asyncio.wait_for(asyncio.gather(*waiters), timeout=1)
+    assert slots.active == 3
+
+    slots.resize(1)
+    late = asyncio.create_task(slots.acquire())
+    slots.release()
+    slots.release()
+    await asyncio.sleep(0)
+    assert slots.active == 1
+    assert not late.done()
+
+    slots.release()
+    await asyncio.wait_for(late, timeout=1)
+    assert slots.active == 1
+
+
+def test_adaptive_limit_aimd():
+    """Test additive increase while healthy, multiplicative decrease after"""
+
+    limit = AdaptiveLimit(
+        AdaptiveConfig(initial_limit=10, window=4, latency_target=0.5), max_limit=12
+    )
+
+    for _ in range(4):
+        new_limit = limit.record(latency=0.1, ok=True)
+    assert new_limit == 11
+
+    for _ in range(4):
+        new_limit = limit.record(latency=0.1, ok=False)
+    assert new_limit == 5
+
+    # Slow but error-free is still unhealthy
+    for _ in range(4):
+        new_limit = limit.record(latency=2.0, ok=True)
+    assert new_limit == 2
+    assert limit.limit == 2
+
+
+def test_adaptive_limit_bounds():
+    limit = AdaptiveLimit(AdaptiveConfig(min_limit=2, window=1), max_limit=3)
+
+    assert limit.limit == 3
+    assert limit.record(latency=0.1, ok=True) is None
+    limit.record(latency=0.1, ok=False)
+    limit.record(latency=0.1, ok=False)
+    assert limit.limit == 2
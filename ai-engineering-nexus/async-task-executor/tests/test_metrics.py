@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from async_task_executor.executor import AsyncTaskExecutor
+from async_task_executor.metrics import ExecutorMetrics, MetricsRegistry
+from async_task_executor.models import Task
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    retries = registry.counter("retries", "Retries", ["task"])
+    latency = registry.histogram("latency_seconds", "Latency", buckets=[0.1, 1])
+    retries.labels('say "hi"').inc()
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    text = registry.render()
+
+    assert "# TYPE retries_total counter" in text
+    assert 'retries_total{task="say \\"hi\\""} 1' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert "latency_seconds_sum 5.55" in text
+
+
+def test_duplicate_metric_rejected():
+    registry = MetricsRegistry()
+    registry.gauge("depth", "Depth")
+
+    with pytest.raises(ValueError):
+        registry.gauge("depth", "Depth")
+
+
+@pytest.mark.asyncio
+async def test_executor_metrics():
+    """Test that counters, histograms and gauges follow a batch"""
+
+    for engine in AsyncTaskExecutor.ENGINES:
+        calls = 0
+
+        async def flaky():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise ValueError("boom")
+            await asyncio.sleep(0.05)
+
+        async def hang():
+            await asyncio.sleep(1)
+
+        metrics = ExecutorMetrics()
+        executor = AsyncTaskExecutor(max_concurrent=2, engine=engine, metrics=metrics)
+        tasks = [
+            Task(func=flaky, backoff_factor=0.01),
+            Task(func=hang, timeout=0.1),
+            Task(func=flaky),
+            Task(func=flaky),
+        ]
+
+        batch = asyncio.create_task(executor.run(tasks))
+        await asyncio.sleep(0.03)
+        live = metrics.registry.render()
+        await batch
+        text = metrics.registry.render()
+
+        assert "async_task_executor_in_flight 2" in live
+        assert "async_task_executor_queue_depth 2" in live
+        assert "async_task_executor_in_flight 0" in text
+        assert "async_task_executor_queue_depth 0" in text
+        assert "async_task_executor_slot_wait_seconds_count 5" in text
+        name = "test_executor_metrics.<locals>"
+        assert f'async_task_executor_retries_total{{task="{name}.flaky"}} 1' in text
+        assert f'async_task_executor_timeouts_total{{task="{name}.hang"}} 1' in text
+        assert f'async_task_executor_failures_total{{task="{name}.flaky"}} 1' in text
+        assert (
+            f'async_task_executor_attempt_duration_seconds_count{{task="{name}.flaky"}} 4'
+            in text
+        )
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import pytest
+from async_task_executor.executor import AsyncTaskExecutor
+from async_task_executor.models import Task, TaskResult
+from async_task_executor.persistence import SQLiteBackend, stable_key
+
+calls = []
+
+
+async def fetch(page):
+    calls.append(page)
+    await asyncio.sleep(0.2 if page >= 4 else 0.01)
+    if page == 3:
+        raise ValueError("bad page")
+    return f"page-{page}"
+
+
+def test_stable_key():
+    assert stable_key(Task(func=fetch, args=(1,))) == stable_key(
+        Task(func=fetch, args=(1,))
+    )
+    assert stable_key(Task(func=fetch, args=(1,))) != stable_key(
+        Task(func=fetch, args=(2,))
+    )
+    assert stable_key(Task(func=fetch, args=(1,), key="p1")) == "p1"
+
+
+@pytest.mark.asyncio
+async def test_resume_after_shutdown(tmp_path):
+    """Test that a second run only executes what the first did not finish"""
+
+    path = str(tmp_path / "batch.db")
+    tasks = [Task(func=fetch, args=(page,), retry=1) for page in range(8)]
+
+    for engine in AsyncTaskExecutor.ENGINES:
+        calls.clear()
+        (tmp_path / "batch.db").unlink(missing_ok=True)
+        backend = SQLiteBackend(path, batch_size=1000)
+        executor = AsyncTaskExecutor(max_concurrent=8, engine=engine, backend=backend)
+        batch = asyncio.create_task(executor.run(tasks))
+        await asyncio.sleep(0.1)
+        await executor.shutdown(drain_timeout=0)
+        first = await batch
+        assert first.successful_count == 3
+        assert first.cancelled_count == 4
+        assert backend.counts() == {"done": 3, "failed": 1, "running": 4}
+        backend.close()
+
+        # "Restart": a new process opens the same database
+        calls.clear()
+        backend = SQLiteBackend(path)
+        second = await AsyncTaskExecutor(
+            max_concurrent=8, engine=engine, backend=backend
+        ).run(tasks)
+
+        assert sorted(calls) == [3, 4, 5, 6, 7]
+        assert second.resumed_count == 3
+        assert second.successful_count == 7
+        assert [r.result for r in second.results[:3]] == ["page-0", "page-1", "page-2"]
+        assert second.results[0].shared == "resumed"
+        assert backend.counts() == {"done": 7, "failed": 1}
+        backend.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_tasks_can_stay_failed(tmp_path):
+    path = str(tmp_path / "batch.db")
+    tasks = [Task(func=fetch, args=(page,), retry=1) for page in range(4)]
+    await AsyncTaskExecutor(max_concurrent=4, backend=SQLiteBackend(path)).run(tasks)
+
+    calls.clear()
+    backend = SQLiteBackend(path, resume_failed=False)
+    report = await AsyncTaskExecutor(max_concurrent=4, backend=backend).run(tasks)
+
+    assert calls == []
+    assert report.resumed_count == 4
+    assert report.results[3].error == "bad page"
+
+
+@pytest.mark.asyncio
+async def test_unpicklable_result_runs_again(tmp_path):
+    async def make_callback():
+        return lambda: None
+
+    path = str(tmp_path / "batch.db")
+    task = Task(func=make_callback, key="lock")
+    await AsyncTaskExecutor(max_concurrent=1, backend=SQLiteBackend(path)).run([task])
+
+    backend = SQLiteBackend(path)
+    report = await AsyncTaskExecutor(max_concurrent=1, backend=backend).run([task])
+
+    assert report.resumed_count == 0
+    assert report.successful_count == 1
+    assert backend.counts() == {"running": 1}
+
+
+def test_load_filters_by_key_in_sql(tmp_path):
+    """Test that load() returns exactly the finished tasks among its keys"""
+
+    backend = SQLiteBackend(str(tmp_path / "batch.db"))
+    keys = [f"task-{i}" for i in range(1200)]
+    backend.register(keys)
+    for key in keys[::2]:
+        backend.finished(key, TaskResult(success=True, result=key))
+    backend.flush()
+
+    # Spans several IN (...) chunks and asks for unknown keys too
+    loaded = backend.load(keys[100:1100] + ["unknown"])
+
+    assert sorted(loaded) == sorted(keys[100:1100:2])
+    assert loaded["task-100"].result == "task-100"
+    backend.close()
+
+
+@pytest.mark.asyncio
+async def test_storage_runs_off_the_event_loop(tmp_path):
+    """Test that SQLite reads and writes never run on the loop thread"""
+
+    threads = set()
+
+    class TracingBackend(SQLiteBackend):
+        def _write(self, started, finished):
+            threads.add(threading.get_ident())
+            super()._write(started, finished)
+
+        def _load(self, keys):
+            threads.add(threading.get_ident())
+            return super()._load(keys)
+
+    backend = TracingBackend(str(tmp_path / "batch.db"), batch_size=2)
+    tasks = [Task(func=fetch, args=(page,), key=f"p{page}") for page in range(3)]
+    report = await AsyncTaskExecutor(max_concurrent=3, backend=backend).run(tasks)
+
+    assert report.successful_count == 3
+    assert threads and threading.get_ident() not in threads
+    backend.close()
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import pytest
+from async_task_executor.limits import PartitionLimit
+from async_task_executor.models import Task
+from async_task_executor.sharded import (
+    ShardedExecutor,
+    _split_partitions,
+    split_budget,
+)
+
+
+async def square(x):
+    await asyncio.sleep(0.01)
+    if x == 3:
+        raise ValueError("three")
+    return x * x
+
+
+async def report_pid():
+    return os.getpid()
+
+
+async def unpicklable():
+    return lambda: None
+
+
+async def crash():
+    os._exit(1)
+
+
+def test_split_budget():
+    assert split_budget(10, 3) == [4, 3, 3]
+    assert split_budget(4, 4) == [1, 1, 1, 1]
+    with pytest.raises(ValueError):
+        split_budget(2, 4)
+
+
+def test_engine_is_rejected():
+    with pytest.raises(ValueError, match="engine"):
+        ShardedExecutor(shards=2, max_concurrent=4, engine="pool")
+
+
+def test_split_partitions():
+    split = _split_partitions(
+        {"gemini": PartitionLimit(max_concurrent=5, rate=10, burst=4)}, 2, 1
+    )
+
+    assert split["gemini"] == PartitionLimit(max_concurrent=2, rate=5, burst=2)
+
+
+@pytest.mark.asyncio
+async def test_sharded_run_merges_results():
+    """Test that results from every shard land at their input index"""
+
+    executor = ShardedExecutor(shards=2, max_concurrent=4, batch_size=3)
+    tasks = [Task(func=square, args=(i,), retry=1) for i in range(20)]
+    tasks.append(Task(func=report_pid))
+    tasks.append(Task(func=report_pid))
+
+    executor_report = await executor.run(tasks)
+    results = executor_report.results
+
+    assert executor_report.total_tasks == 22
+    assert executor_report.successful_count == 21
+    assert [r.result for r in results[:3]] == [0, 1, 4]
+    assert results[3].error == "three"
+    assert [r.index for r in results] == list(range(22))
+    pids = {results[20].result, results[21].result}
+    assert len(pids) == 2 and os.getpid() not in pids
+
+
+@pytest.mark.asyncio
+async def test_sharded_failures_are_reported():
+    executor = ShardedExecutor(shards=2, max_concurrent=2)
+    tasks = [Task(func=unpicklable), Task(func=crash)]
+
+    executor_report = await executor.run(tasks)
+    unpickled, crashed = executor_report.results
+
+    assert unpickled.error.startswith("UnpicklableResult")
+    assert crashed.error == "ShardFailed"
+
+
+@pytest.mark.asyncio
+async def test_shards_never_exceed_the_global_budget():
+    executor = ShardedExecutor(shards=4, max_concurrent=2)
+    tasks = [Task(func=report_pid) for _ in range(8)]
+
+    executor_report = await executor.run(tasks)
+
+    assert executor_report.successful_count == 8
+    assert len({r.result for r in executor_report.results}) == 2
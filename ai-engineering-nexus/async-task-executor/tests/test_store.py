@@ -0,0 +1,100 @@
+import tracemalloc
+from async_task_executor.models import ExecutionReport, TaskResult
+from async_task_executor.store import ResultStore
+
+
+def make_result(i):
+    if i % 4 == 0:
+        return TaskResult(
+            success=False, error="TimeoutError", execution_time=i, attempt_count=3
+        )
+    return TaskResult(success=True, result=i, execution_time=i, wait_time=i / 10)
+
+
+def test_set_and_materialize():
+    """Test that results read back as equal TaskResults with their index"""
+
+    store = ResultStore(size=8)
+    for i in reversed(range(8)):
+        store.set(i, make_result(i))
+
+    assert len(store) == 8
+    assert store[1] == TaskResult(
+        success=True, result=1, execution_time=1, wait_time=0.1, index=1
+    )
+    assert store[-8].error == "TimeoutError"
+    assert store[-8].attempt_count == 3
+    assert [r.index for r in store[2:5]] == [2, 3, 4]
+
+
+def test_counters_are_incremental():
+    """Test that counters match a full walk over the results"""
+
+    store = ResultStore()
+    for i in range(10):
+        store.append(make_result(i))
+    store.append(TaskResult(success=False, error="DeadlineExceeded"))
+
+    report = ExecutionReport.from_store(store)
+    walked = ExecutionReport.from_results(list(store))
+
+    assert report.successful_count == walked.successful_count == 7
+    assert report.failed_count == walked.failed_count == 4
+    assert report.deadline_missed_count == walked.deadline_missed_count == 1
+    assert report.max_wait_time == walked.max_wait_time == 0.9
+
+
+def test_latency_percentiles_in_summary():
+    store = ResultStore(size=101)
+    for i in range(101):
+        store.set(i, TaskResult(success=True, execution_time=i / 100))
+
+    report = ExecutionReport.from_store(store)
+
+    assert report.latency_percentiles() == {
+        "p50": 0.5,
+        "p95": 0.95,
+        "p99": 0.99,
+        "max": 1.0,
+    }
+    assert "p99 0.990s" in report.summary()
+
+
+def test_smaller_than_list_of_results():
+    """Test that the store holds far less memory than TaskResult objects"""
+
+    size = 20_000
+
+    def timed_result(i):
+        return TaskResult(
+            success=True,
+            result="Success",
+            execution_time=i * 0.001,
+            wait_time=i * 0.0001,
+            run_time=i * 0.0009,
+        )
+
+    tracemalloc.start()
+    results = [timed_result(i) for i in range(size)]
+    as_list = tracemalloc.get_traced_memory()[0]
+    del results
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    store = ResultStore(size)
+    for i in range(size):
+        store.set(i, timed_result(i))
+    as_store = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert as_store < as_list / 2
+
+
+def test_pending_and_cancelled():
+    store = ResultStore(4)
+    store.set(1, TaskResult(success=True, result=1))
+    store.set(2, TaskResult(success=False, error="Cancelled"))
+
+    assert list(store.pending()) == [0, 3]
+    assert store.cancelled_count == 1
+    assert store[0].success is False
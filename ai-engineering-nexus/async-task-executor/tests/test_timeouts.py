@@ -0,0 +1,36 @@
+import asyncio
+import pytest
+from async_task_executor.timeouts import TimeoutScheduler
+
+
+@pytest.mark.asyncio
+async def test_due_timeouts_cancel_their_tasks():
+    loop = asyncio.get_running_loop()
+    scheduler = TimeoutScheduler(loop)
+    slow = asyncio.create_task(asyncio.sleep(1))
+    fast = asyncio.create_task(asyncio.sleep(0.01))
+
+    late = scheduler.schedule(loop.time() + 0.05, slow)
+    spared = scheduler.schedule(loop.time() + 0.02, fast)
+    await fast
+    scheduler.cancel(spared)
+
+    with pytest.raises(asyncio.CancelledError):
+        await slow
+    assert late.fired
+    assert not spared.fired
+    assert len(scheduler) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_timeouts_are_compacted():
+    loop = asyncio.get_running_loop()
+    scheduler = TimeoutScheduler(loop)
+    task = asyncio.current_task()
+
+    timeouts = [scheduler.schedule(loop.time() + 60, task) for _ in range(1000)]
+    for timeout in timeouts:
+        scheduler.cancel(timeout)
+
+    assert len(scheduler) == 0
+    assert len(scheduler._heap) < 100
@@ -0,0 +1,48 @@
+import time
+from contextlib import asynccontextmanager
+
+import uvicorn
+from fastapi import FastAPI
+
+from event_loop_profiler.lag_sampler import LagSampler
+
+sampler = LagSampler(interval=0.05)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sampler.start()
+    yield
+    sampler.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.get("/fast")
+async def fast():
+    return {"status": "ok"}
+
+
+@app.get("/blocking")
+async def blocking():
+    """Blocks the whole loop; watch p99/max lag jump"""
+    time.sleep(0.3)
+    return {"status": "slept"}
+
+
+@app.get("/debug/lag")
+async def lag():
+    stats = sampler.stats()
+    return {
+        "samples": stats.samples,
+        "p50_ms": stats.p50_ms,
+        "p99_ms": stats.p99_ms,
+        "max_ms": stats.max_ms,
+        "overhead_ratio": stats.overhead_ratio,
+        "recent_ms": [lag * 1000 for lag in sampler.recent()[-20:]],
+    }
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="127.0.0.1", port=8000)
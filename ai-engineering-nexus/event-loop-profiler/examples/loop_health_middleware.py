@@ -0,0 +1,34 @@
+import asyncio
+import time
+
+import uvicorn
+from fastapi import BackgroundTasks, FastAPI
+
+from event_loop_profiler.middleware import LoopHealthMiddleware
+
+app = FastAPI()
+app.add_middleware(LoopHealthMiddleware, threshold_ms=50)
+
+
+async def run_task(task_name: str, duration: float):
+    """Blocks the loop: stalls are charged to POST /tasks"""
+    time.sleep(duration)
+
+
+@app.post("/tasks")
+async def create_task(task_name: str, duration: float, background_tasks: BackgroundTasks):
+    background_tasks.add_task(run_task, task_name, duration)
+    return {"message": "task accepted"}
+
+
+@app.get("/items/{item_id}")
+async def get_item(item_id: int):
+    """Counted once under GET /items/{item_id}, never stalls"""
+    await asyncio.sleep(0.01)
+    return {"item_id": item_id}
+
+
+# curl -X POST 'localhost:8000/tasks?task_name=a&duration=0.5'
+# curl localhost:8000/debug/loop
+if __name__ == "__main__":
+    uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -1,7 +1,45 @@
 import asyncio
+import collections
+import os
+import sys
+import threading
 import time
-from typing import Callable, List, Optional
+import traceback
+from typing import Callable, Dict, List, Optional, Tuple
 from .models import BlockingDetection, BlockingReport, ExecutionTimeline
+from .trace import BLOCKING, LOOP_LANE, TraceBuffer
+
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+
+def _format_stack(frame, limit: int) -> Tuple[str, ...]:
+    """Frames of a thread's stack, innermost last, without the event loop machinery"""
+    summary = traceback.extract_stack(frame, limit=limit)
+    # Skip everything up to and including the loop's own frames
+    # (run_forever -> _run_once -> Handle._run), keep the task's code
+    start = 0
+    for i, entry in enumerate(summary):
+        if entry.filename.startswith(_ASYNCIO_DIR):
+            start = i + 1
+        elif start:
+            break
+    frames = summary[start:] or summary
+    return tuple(
+        f"{entry.name} ({entry.filename}:{entry.lineno})" + (f": {entry.line}" if entry.line else "")
+        for entry in frames
+    )
+
+
+class _StallSegment:
+    """Watchdog samples of one blocking call within a stall"""
+
+    __slots__ = ("key", "first", "last", "stacks")
+
+    def __init__(self, key: Tuple[str, ...], at: float):
+        self.key = key
+        self.first = self.last = at
+        self.stacks: Dict[Tuple[str, ...], int] = collections.Counter()
+
 
 class BlockingDetector:
     """
@@ -12,18 +50,44 @@ class BlockingDetector:
     
     Strategy: Periodically check if event loop is responsive.
     If check is delayed, something is blocking.
+
+    While the loop is stuck, a watchdog thread samples the loop thread's
+    stack with sys._current_frames(), so each detection also says which
+    call blocked (e.g. time.sleep in a handler), without touching the
+    monitored code. When the stack of the stuck code changes for at
+    least threshold_ms during one stall (two blocking calls back to
+    back, or two tasks blocking in the same loop iteration), each part
+    is reported as its own detection.
     """
     
-    def __init__(self, threshold_ms: float = 50.0):
+    def __init__(
+        self,
+        threshold_ms: float = 50.0,
+        capture_stacks: bool = True,
+        stack_depth: int = 30,
+        trace: Optional[TraceBuffer] = None
+    ):
         """
         Args:
             threshold_ms: Duration in milliseconds that's considered blocking
                          (default: 50ms is a reasonable threshold)
+            capture_stacks: Run the watchdog thread that samples the stack
+                            of the blocking code
+            stack_depth: Innermost frames kept per sample
+            trace: Buffer to record detections into, on the event loop lane
         """
         self.threshold_ms = threshold_ms
+        self.capture_stacks = capture_stacks
+        self.stack_depth = stack_depth
+        self.trace = trace
+        self.check_interval = 0.01  # 10ms
         self.detections: List[BlockingDetection] = []
         self._monitoring = False
         self._current_task_name  = None
+        self._last_tick = 0.0
+        self._segments: List[_StallSegment] = []  # of the current stall
+        self._stacks_lock = threading.Lock()
+        self._watchdog_stop = threading.Event()
 
     
     async def run_with_detection(
@@ -49,9 +113,11 @@ class BlockingDetector:
         
         self._current_task_name = task_name
         self.detections = []
-        self.monitoring = True
+        self._monitoring = True
 
+        self._last_tick = started_at = time.perf_counter()
         monitor_task = asyncio.create_task(self._monitor_event_loop())
+        watchdog = self._start_watchdog(threading.get_ident()) if self.capture_stacks else None
 
         try:
             if asyncio.iscoroutinefunction(task):
@@ -61,19 +127,26 @@ class BlockingDetector:
         finally:
             self._monitoring = False
             await monitor_task
+            if watchdog is not None:
+                self._watchdog_stop.set()
+                # The thread exits within a quarter threshold; don't wait on the loop
+                await asyncio.to_thread(watchdog.join)
 
         total_blocking_time = sum(d.blocking_duration for d in self.detections)
 
         if self.detections:
             worst = max(self.detections, key=lambda d: d.blocking_duration)
             worst_offender = f"{worst.task_name} ({worst.blocking_duration:.2f}s)"
+            if worst.stack:
+                worst_offender += f" in {worst.blocking_call}"
         else:
             worst_offender = None
 
         return BlockingReport(
             detections=self.detections.copy(),
             total_blocking_time=total_blocking_time,
-            worst_offender=worst_offender
+            worst_offender=worst_offender,
+            started_at=started_at
         ), result
     
     async def _monitor_event_loop(self):
@@ -89,7 +162,7 @@ class BlockingDetector:
         # - Measure expected vs actual time
         # - If actual > expected + threshold, it's blocking
 
-        check_interval = 0.01  # 10ms
+        check_interval = self.check_interval
 
         while self._monitoring:
             expected_wake_time = time.perf_counter() + check_interval
@@ -97,21 +170,117 @@ class BlockingDetector:
             await asyncio.sleep(check_interval)
 
             actual_wake_time = time.perf_counter()
+            self._last_tick = actual_wake_time
+            with self._stacks_lock:
+                segments, self._segments = self._segments, []
             
             delay_seconds = actual_wake_time - expected_wake_time
-            delay_ms = delay_seconds * 100
+            delay_ms = delay_seconds * 1000
 
             if delay_ms > self.threshold_ms:
-                # Determine severity based on duration
-                if delay_ms > 200:  # More than 200ms is critical
-                    severity = "Critical"
-                else:
-                    severity = "Warning"
-                
-                detection = BlockingDetection(
-                    task_name=self._current_task_name,
-                    blocking_duration=delay_seconds,  # Store in seconds
-                    timestamp=actual_wake_time,
-                    severity=severity
-                )
-                self.detections.append(detection)
\ No newline at end of file
+                for start, end, stacks in self._split_stall(expected_wake_time, actual_wake_time, segments):
+                    self._record_detection(start, end, stacks)
+
+    def _split_stall(self, start: float, end: float, segments: List[_StallSegment]):
+        """
+        (start, end, stacks) of each blocking call within one stall.
+
+        A segment ends halfway between its last sample and the next
+        segment's first one. A stack seen again later in the stall (a hot
+        loop moving between helpers) joins everything since its first
+        appearance into one part, and parts shorter than the threshold
+        are folded into a neighbour, so only calls that block one after
+        the other end up as separate detections.
+        """
+        if not segments:
+            return [(start, end, collections.Counter())]
+        threshold = self.threshold_ms / 1000
+        parts = []  # [start, end, stack counts]
+        for i, segment in enumerate(segments):
+            part_end = (segment.last + segments[i + 1].first) / 2 if i + 1 < len(segments) else end
+            seen = next((k for k, part in enumerate(parts) if segment.key in part[2]), None)
+            if seen is not None:
+                for later in parts[seen + 1:]:
+                    parts[seen][2].update(later[2])
+                del parts[seen + 1:]
+            elif not parts or part_end - parts[-1][1] >= threshold:
+                parts.append([parts[-1][1] if parts else start, part_end, collections.Counter()])
+            parts[-1][1] = part_end
+            parts[-1][2].update(segment.stacks)
+        if len(parts) > 1 and parts[0][1] - parts[0][0] < threshold:
+            # A short first part belongs to the one after it
+            parts[1][0] = parts[0][0]
+            parts[1][2].update(parts[0][2])
+            del parts[0]
+        return [tuple(part) for part in parts]
+
+    def _record_detection(self, start: float, end: float, stacks) -> None:
+        duration = end - start
+        # Determine severity based on duration
+        if duration * 1000 > 200:  # More than 200ms is critical
+            severity = "Critical"
+        else:
+            severity = "Warning"
+
+        # The stack seen most often during the stall is the culprit
+        stack, samples = stacks.most_common(1)[0] if stacks else ((), 0)
+
+        detection = BlockingDetection(
+            task_name=self._current_task_name,
+            blocking_duration=duration,  # Store in seconds
+            timestamp=end,
+            severity=severity,
+            stack=list(stack),
+            stack_samples=samples
+        )
+        self.detections.append(detection)
+
+        if self.trace is not None:
+            name = f"blocked: {detection.blocking_call}" if stack else "blocked"
+            self.trace.record(BLOCKING, self.trace.intern(name), LOOP_LANE, start, duration)
+
+    def _start_watchdog(self, loop_thread_id: int) -> threading.Thread:
+        self._watchdog_stop.clear()
+        with self._stacks_lock:
+            self._segments = []
+        watchdog = threading.Thread(
+            target=self._watchdog,
+            args=(loop_thread_id,),
+            name="blocking-detector-watchdog",
+            daemon=True
+        )
+        watchdog.start()
+        return watchdog
+
+    def _watchdog(self, loop_thread_id: int) -> None:
+        """
+        Sample the loop thread's stack whenever the loop stops ticking.
+
+        Runs in its own thread, so it keeps running while the loop is
+        blocked. The monitor ticks every check_interval, so the loop
+        counts as stuck once check_interval + threshold_ms have passed
+        since the last tick; samples are then taken every quarter
+        threshold until the monitor wakes up and collects them.
+
+        Consecutive samples with the same stack form a segment, so
+        back-to-back blocking calls in one stall can be told apart.
+        """
+        stall_after = self.check_interval + self.threshold_ms / 1000
+        period = self.threshold_ms / 4000
+
+        while not self._watchdog_stop.wait(period):
+            if time.perf_counter() - self._last_tick < stall_after:
+                continue
+            frame = sys._current_frames().get(loop_thread_id)
+            if frame is None:
+                continue
+            stack = _format_stack(frame, self.stack_depth)
+            del frame
+            now = time.perf_counter()
+            with self._stacks_lock:
+                segments = self._segments
+                if not segments or segments[-1].key != stack:
+                    segments.append(_StallSegment(stack, now))
+                segment = segments[-1]
+                segment.last = now
+                segment.stacks[stack] += 1
\ No newline at end of file
@@ -0,0 +1,214 @@
+import asyncio
+import math
+import time
+from array import array
+from typing import List, Optional
+from .models import LagStats
+
+
+class LagHistogram:
+    """
+    Fixed-memory histogram of lag values, bucketed like HdrHistogram.
+
+    Every power of two between `lowest` and `highest` seconds is split
+    into `precision` linear sub-buckets, so a recorded value is reported
+    within 1/precision of its true value (about 3% by default) and
+    recording is O(1) no matter how many samples there are.
+    """
+
+    def __init__(self, lowest: float = 1e-6, highest: float = 3600.0, precision: int = 32):
+        """
+        Args:
+            lowest: Smallest value told apart from zero, in seconds
+            highest: Values above this land in the last bucket
+            precision: Linear sub-buckets per power of two
+        """
+        self.lowest = lowest
+        self.precision = precision
+        self._buckets = math.frexp(highest / lowest)[1] * precision
+        self.counts = array("q", bytes(8 * self._buckets))
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        units = value / self.lowest
+        if units < 1.0:
+            index = 0
+        else:
+            # units = mantissa * 2**exponent with mantissa in [0.5, 1)
+            mantissa, exponent = math.frexp(units)
+            index = (exponent - 1) * self.precision + int((mantissa * 2.0 - 1.0) * self.precision)
+            if index >= self._buckets:
+                index = self._buckets - 1
+        self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def _upper_bound(self, index: int) -> float:
+        exponent, sub = divmod(index, self.precision)
+        return self.lowest * 2.0 ** exponent * (1.0 + (sub + 1) / self.precision)
+
+    def percentile(self, percent: float) -> float:
+        """Value below which `percent` % of recorded values fall, in seconds."""
+        if not self.total:
+            return 0.0
+        target = max(1, math.ceil(percent / 100 * self.total))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                if index == self._buckets - 1:
+                    # Overflow bucket: values above `highest` have no upper bound
+                    return self.max
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+    def reset(self) -> None:
+        self.counts = array("q", bytes(8 * self._buckets))
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+
+class LagSampler:
+    """
+    Always-on event loop lag sampler, cheap enough for production.
+
+    Every `interval` seconds a timer callback (no task, no coroutine)
+    compares the loop time it was due at with the time it actually ran.
+    The difference is how long the loop was busy with something else:
+    a blocking call, a CPU-heavy callback, a flood of ready tasks.
+
+    Samples go into a fixed-size ring buffer (the most recent `capacity`
+    lags) and a LagHistogram for p50/p99/max over the sampler's lifetime,
+    so memory doesn't grow however long it runs. The time spent inside
+    the callback itself is measured too and reported in stats(): the
+    work is a few microseconds per sample, so at the default 100ms
+    interval the sampler stays far below 0.1% of loop time. Intervals
+    under MIN_INTERVAL are refused.
+
+    Example:
+        >>> sampler = LagSampler(interval=0.05)
+        >>> sampler.start()  # from inside the running loop, e.g. at lifespan startup
+        >>> ...
+        >>> print(sampler.stats().summary())
+        >>> sampler.stop()
+    """
+
+    # Shorter intervals make the sampler itself a measurable load
+    MIN_INTERVAL = 0.001
+
+    def __init__(self, interval: float = 0.1, capacity: int = 1024):
+        """
+        Args:
+            interval: Seconds between samples (at least 1ms)
+            capacity: Number of recent samples kept in the ring buffer
+        """
+        if interval < self.MIN_INTERVAL:
+            raise ValueError(f"interval must be at least {self.MIN_INTERVAL}s")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.interval = interval
+        self.capacity = capacity
+        self.histogram = LagHistogram()
+        self._ring = array("d", bytes(8 * capacity))
+        self._count = 0
+        self._overhead = 0.0
+        self._started_at = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._expected = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._handle is not None
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        Start sampling.
+
+        Args:
+            loop: Loop to attach to; defaults to the running loop. Another
+                thread can pass a loop, the first sample is then scheduled
+                thread-safely.
+        """
+        if self.running:
+            return
+        if loop is None:
+            loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._started_at = time.perf_counter()
+        try:
+            running = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            running = False
+        if running:
+            self._schedule()
+        else:
+            loop.call_soon_threadsafe(self._schedule)
+
+    def stop(self) -> None:
+        """Stop sampling; recorded samples stay available."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def reset(self) -> None:
+        """Forget all samples and overhead measured so far."""
+        self.histogram.reset()
+        self._count = 0
+        self._overhead = 0.0
+        self._started_at = time.perf_counter()
+
+    async def __aenter__(self) -> "LagSampler":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _schedule(self) -> None:
+        self._expected = self._loop.time() + self.interval
+        self._handle = self._loop.call_at(self._expected, self._tick)
+
+    def _tick(self) -> None:
+        started = time.perf_counter()
+        now = self._loop.time()
+        # asyncio may run a timer up to one clock tick early
+        lag = now - self._expected
+        if lag < 0.0:
+            lag = 0.0
+        self._ring[self._count % self.capacity] = lag
+        self._count += 1
+        self.histogram.record(lag)
+        # Next sample is due one interval after this one actually ran, so a
+        # long stall counts once instead of as a burst of late samples
+        self._expected = now + self.interval
+        self._handle = self._loop.call_at(self._expected, self._tick)
+        self._overhead += time.perf_counter() - started
+
+    def recent(self) -> List[float]:
+        """The most recent lag samples in seconds, oldest first."""
+        if self._count <= self.capacity:
+            return self._ring[:self._count].tolist()
+        start = self._count % self.capacity
+        return (self._ring[start:] + self._ring[:start]).tolist()
+
+    def stats(self) -> LagStats:
+        """Percentiles over every sample since start (or the last reset)."""
+        histogram = self.histogram
+        elapsed = time.perf_counter() - self._started_at
+        samples = histogram.total
+        return LagStats(
+            samples=samples,
+            interval=self.interval,
+            p50_ms=histogram.percentile(50) * 1000,
+            p99_ms=histogram.percentile(99) * 1000,
+            max_ms=histogram.max * 1000,
+            mean_ms=histogram.sum / samples * 1000 if samples else 0.0,
+            overhead_ratio=self._overhead / elapsed if elapsed > 0 else 0.0,
+            overhead_per_sample_us=self._overhead / samples * 1e6 if samples else 0.0,
+        )
@@ -0,0 +1,268 @@
+import asyncio
+import contextvars
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from .lag_sampler import LagSampler
+
+# ASGI scope of the request the current task is serving
+_current_scope: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("event_loop_profiler_scope", default=None)
+
+
+def _route_label(scope: dict) -> str:
+    """Route template when the router has matched one, else the raw path"""
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    method = "WS" if scope["type"] == "websocket" else scope.get("method", "")
+    return f"{method} {path}"
+
+
+def current_route() -> Optional[str]:
+    """Route of the request being served by the calling task, if any"""
+    scope = _current_scope.get()
+    return _route_label(scope) if scope is not None else None
+
+
+class RouteStats:
+    """Requests and loop stalls of one route"""
+
+    __slots__ = ("requests", "total_time", "max_time", "stalls", "stall_time", "max_stall")
+
+    def __init__(self):
+        self.requests = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.stalls = 0
+        self.stall_time = 0.0
+        self.max_stall = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "avg_ms": self.total_time / self.requests * 1000 if self.requests else 0.0,
+            "max_ms": self.max_time * 1000,
+            "stalls": self.stalls,
+            "stall_ms_total": self.stall_time * 1000,
+            "stall_max_ms": self.max_stall * 1000,
+        }
+
+
+class _HeartbeatSampler(LagSampler):
+    """LagSampler that also reports every lag sample to a callback"""
+
+    def __init__(self, interval: float, on_tick):
+        super().__init__(interval=interval)
+        self.on_tick = on_tick
+        self.last_tick = time.perf_counter()  # read by the watchdog thread
+
+    def _tick(self) -> None:
+        super()._tick()
+        self.last_tick = time.perf_counter()
+        self.on_tick(self._ring[(self._count - 1) % self.capacity])
+
+
+class LoopHealthMiddleware:
+    """
+    Pure ASGI middleware that attributes event loop stalls to routes.
+
+    Each request's scope (HTTP, or a whole websocket connection, labelled
+    "WS /path") is put in a contextvar, which child tasks (background
+    tasks included) inherit. A LagSampler heartbeat measures
+    loop lag; when the loop stops ticking, a watchdog thread looks up the
+    asyncio Task running on the loop and reads the request from that
+    task's context, so the stall is charged to the route whose handler
+    blocked (a time.sleep or sync requests call in an async def). When
+    handlers of different routes block one after the other within one
+    stall, each route is charged its own part.
+
+    GET `path` (default /debug/loop) returns JSON with lag percentiles
+    and, per route, request counts and durations plus stall counts and
+    durations. The per-request cost is a contextvar set/reset, two clock
+    reads and one dict update; everything else happens off the request
+    path. The heartbeat and the watchdog start with the app's lifespan
+    (or the first request) and stop at lifespan shutdown.
+
+    Example:
+        >>> app = FastAPI()
+        >>> app.add_middleware(LoopHealthMiddleware, threshold_ms=50)
+    """
+
+    def __init__(
+        self,
+        app,
+        threshold_ms: float = 50.0,
+        interval: float = 0.01,
+        path: str = "/debug/loop",
+        max_routes: int = 500
+    ):
+        """
+        Args:
+            app: ASGI application to wrap
+            threshold_ms: Loop lag that counts as a stall
+            interval: Seconds between heartbeat samples
+            path: Path of the JSON debug endpoint
+            max_routes: Distinct routes tracked; unmatched paths beyond
+                        this are counted under "(other)"
+        """
+        self.app = app
+        self.threshold_ms = threshold_ms
+        self.path = path
+        self.max_routes = max_routes
+        self.routes: Dict[str, RouteStats] = {}
+        self.sampler = _HeartbeatSampler(interval, self._on_tick)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # (route, perf_counter() first seen) of the current stall, appended
+        # to by the watchdog thread and swapped out by the heartbeat
+        self._stall_routes: List[Tuple[str, float]] = []
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.app(scope, self._lifespan_receive(receive), send)
+            return
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        if self._loop is None:
+            self._start()
+        if scope["type"] == "http" and scope["path"] == self.path:
+            await self._serve_stats(send)
+            return
+
+        token = _current_scope.set(scope)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_scope.reset(token)
+            stats = self._stats_for(_route_label(scope))
+            stats.requests += 1
+            stats.total_time += elapsed
+            if elapsed > stats.max_time:
+                stats.max_time = elapsed
+
+    def _stats_for(self, label: str) -> RouteStats:
+        stats = self.routes.get(label)
+        if stats is None:
+            if len(self.routes) >= self.max_routes:
+                label = "(other)"
+                stats = self.routes.get(label)
+            if stats is None:
+                stats = self.routes[label] = RouteStats()
+        return stats
+
+    def _lifespan_receive(self, receive):
+        """receive() of the lifespan protocol, starting and stopping with the app"""
+
+        async def wrapped():
+            message = await receive()
+            if message["type"] == "lifespan.startup" and self._loop is None:
+                self._start()
+            elif message["type"] == "lifespan.shutdown":
+                self.close()
+            return message
+
+        return wrapped
+
+    def _start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self.sampler.start(self._loop)
+        # A fresh event per watchdog, so a restart never revives an old one
+        self._stop = threading.Event()
+        self._watchdog = threading.Thread(target=self._watch, args=(self._loop, self._stop), name="loop-health-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def close(self) -> None:
+        """
+        Stop the heartbeat and the watchdog thread.
+
+        Doesn't wait for the thread: it exits by itself within a quarter
+        threshold, so close() is safe to call on the event loop.
+        """
+        self.sampler.stop()
+        if self._watchdog is not None:
+            self._stop.set()
+            self._watchdog = None
+        self._loop = None
+
+    def _watch(self, loop: asyncio.AbstractEventLoop, stop: threading.Event) -> None:
+        """Note which routes the loop is stuck in while it isn't ticking"""
+        stall_after = self.sampler.interval + self.threshold_ms / 1000
+        period = self.threshold_ms / 4000
+
+        while not stop.wait(period):
+            if time.perf_counter() - self.sampler.last_tick < stall_after:
+                continue
+            task = asyncio.current_task(loop)
+            if task is None:
+                label = "(no task)"
+            else:
+                scope = task.get_context().get(_current_scope)
+                label = _route_label(scope) if scope is not None else "(background)"
+            routes = self._stall_routes
+            if not routes or routes[-1][0] != label:
+                routes.append((label, time.perf_counter()))
+
+    def _on_tick(self, lag: float) -> None:
+        routes = self._stall_routes
+        if routes:
+            self._stall_routes = []
+        if lag * 1000 < self.threshold_ms:
+            return
+        now = time.perf_counter()
+        if not routes:
+            self._record_stall("(unattributed)", lag)
+            return
+        # Each route is charged from when the watchdog first saw it until
+        # the next one took over; parts under the threshold are folded
+        # into a neighbour
+        threshold = self.threshold_ms / 1000
+        parts = []  # [label, duration]
+        for i, (label, seen) in enumerate(routes):
+            start = now - lag if i == 0 else seen
+            end = routes[i + 1][1] if i + 1 < len(routes) else now
+            if parts and (parts[-1][0] == label or end - start < threshold):
+                parts[-1][1] += end - start
+            else:
+                parts.append([label, end - start])
+        if len(parts) > 1 and parts[0][1] < threshold:
+            parts[1][1] += parts.pop(0)[1]
+        for label, duration in parts:
+            self._record_stall(label, duration)
+
+    def _record_stall(self, label: str, duration: float) -> None:
+        stats = self._stats_for(label)
+        stats.stalls += 1
+        stats.stall_time += duration
+        if duration > stats.max_stall:
+            stats.max_stall = duration
+
+    def snapshot(self) -> dict:
+        """Everything /debug/loop reports"""
+        lag = self.sampler.stats()
+        return {
+            "threshold_ms": self.threshold_ms,
+            "lag": {
+                "samples": lag.samples,
+                "p50_ms": lag.p50_ms,
+                "p99_ms": lag.p99_ms,
+                "max_ms": lag.max_ms,
+                "overhead_ratio": lag.overhead_ratio,
+            },
+            "routes": {
+                label: stats.as_dict()
+                for label, stats in sorted(self.routes.items(), key=lambda item: -item[1].stall_time)
+            },
+        }
+
+    async def _serve_stats(self, send) -> None:
+        body = json.dumps(self.snapshot()).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
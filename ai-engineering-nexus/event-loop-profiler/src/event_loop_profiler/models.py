@@ -1,14 +1,21 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, List
-import time
 
 @dataclass
 class TaskExecution:
     """Record of a single task execution"""
     task_name: str
-    start_time: float  # timestamp
-    end_time: float    # timestamp
+    start_time: float  # perf_counter() value
+    end_time: float    # perf_counter() value
     duration: float    # seconds
+    slices: int = 0            # times the task ran on the loop (task steps)
+    cpu_time: float = 0.0      # CPU seconds spent on the loop thread
+    on_loop_time: float = 0.0  # wall seconds the task held the loop
+    longest_slice: float = 0.0 # wall seconds of its longest single step
+
+    @property
+    def cpu_per_slice(self) -> float:
+        return self.cpu_time / self.slices if self.slices else 0.0
     
 
 @dataclass
@@ -16,13 +23,22 @@ class ExecutionTimeline:
     """Timeline of all task executions"""
     executions: List[TaskExecution]
     total_duration: float
+    started_at: float = 0.0  # perf_counter() when the run began
     
     def print_execution(self) -> None:
         """Printing execution timeline"""
 
         res = []
         for exec in self.executions:
-            res.append(f"Task: {exec.task_name}, Start: {time.ctime(exec.start_time)}, End: {time.ctime(exec.end_time)}, Duration: {exec.duration:.2f} seconds")
+            res.append(f"Task: {exec.task_name}, Start: +{exec.start_time - self.started_at:.3f}s, End: +{exec.end_time - self.started_at:.3f}s, Duration: {exec.duration:.2f} seconds, Slices: {exec.slices}, On loop: {exec.on_loop_time * 1000:.2f}ms, Longest slice: {exec.longest_slice * 1000:.2f}ms")
+        return res
+
+    def loop_hogs(self, limit: int = 5) -> List[str]:
+        """Tasks that held the event loop longest, worst first"""
+
+        res = []
+        for exec in sorted(self.executions, key=lambda e: e.on_loop_time, reverse=True)[:limit]:
+            res.append(f"{exec.task_name}: {exec.on_loop_time * 1000:.2f}ms on loop ({exec.on_loop_time / exec.duration if exec.duration else 0:.0%} of its {exec.duration:.2f}s) in {exec.slices} slices, CPU {exec.cpu_per_slice * 1000:.3f}ms/slice, longest slice {exec.longest_slice * 1000:.2f}ms")
         return res
 
     def summary(self) -> str:
@@ -30,6 +46,7 @@ class ExecutionTimeline:
         return f"""Execution Timeline Summary:
               Total Duration: {self.total_duration:.2f} seconds
               Task Timeline: {self.print_execution()}
+              Loop hogs: {self.loop_hogs()}
               """
     
 @dataclass
@@ -37,8 +54,15 @@ class BlockingDetection:
     """Record of detected blocking operation"""
     task_name: str
     blocking_duration: float  # How long it blocked
-    timestamp: float  # When it happened
+    timestamp: float  # When it happened (perf_counter() value)
     severity: str  # "Warning" or "Critical"
+    stack: List[str] = field(default_factory=list)  # Blocking code, innermost frame last
+    stack_samples: int = 0  # Watchdog samples that saw this stack
+
+    @property
+    def blocking_call(self) -> str:
+        """Innermost frame of the captured stack, i.e. the call that blocked"""
+        return self.stack[-1] if self.stack else "unknown"
     
 @dataclass
 class BlockingReport:
@@ -46,20 +70,54 @@ class BlockingReport:
     detections: List[BlockingDetection]
     total_blocking_time: float
     worst_offender: str  # Task with longest block
+    started_at: float = 0.0  # perf_counter() when detection began
     
     def blocked_operations(self):
         """Return blocked operations"""
 
         res = []
         for op in self.detections:
-            res.append(f"Task: {op.task_name}, Duration: {op.blocking_duration} seconds, End: {time.ctime(op.timestamp)}, Severity: {op.severity}")
+            line = f"Task: {op.task_name}, Duration: {op.blocking_duration} seconds, End: +{op.timestamp - self.started_at:.3f}s, Severity: {op.severity}"
+            if op.stack:
+                line += f", Blocked in: {op.blocking_call}"
+            res.append(line)
         return res
 
 
+    def blocking_stacks(self) -> List[str]:
+        """Captured stack of every detection that has one"""
+
+        res = []
+        for op in self.detections:
+            if op.stack:
+                frames = "\n".join(f"    {frame}" for frame in op.stack)
+                res.append(f"{op.task_name} blocked {op.blocking_duration * 1000:.0f}ms in:\n{frames}")
+        return res
+
     def summary(self) -> str:
         """Human-readable blocking report"""
         return f"""Blocking Summary:
               Total Blocking time: {self.total_blocking_time:.2f} seconds
               Worst offender: {self.worst_offender}
               Blocked operations: {self.blocked_operations()}
-              """   
\ No newline at end of file
+              """   
+
+@dataclass
+class LagStats:
+    """Snapshot of event loop lag measured by a LagSampler"""
+    samples: int           # lag samples recorded since start/reset
+    interval: float        # seconds between samples
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+    mean_ms: float
+    overhead_ratio: float  # share of loop time spent inside the sampler
+    overhead_per_sample_us: float
+
+    def summary(self) -> str:
+        """Human-readable lag summary"""
+        return f"""Event Loop Lag Summary:
+              Samples: {self.samples} (every {self.interval * 1000:.0f}ms)
+              Lag p50: {self.p50_ms:.2f}ms, p99: {self.p99_ms:.2f}ms, max: {self.max_ms:.2f}ms, mean: {self.mean_ms:.2f}ms
+              Sampler overhead: {self.overhead_per_sample_us:.1f}us per sample ({self.overhead_ratio:.4%} of loop time)
+              """
@@ -1,8 +1,103 @@
 import asyncio
+import collections.abc
 import time
-from typing import Callable, List
+from typing import Callable, List, Optional
 from .models import TaskExecution, ExecutionTimeline, BlockingDetection, BlockingReport
 from .blocking_detector import BlockingDetector
+from .trace import SLICE, TASK, TraceBuffer
+
+
+class SliceTimer(collections.abc.Coroutine):
+    """
+    Coroutine wrapper that times every step the event loop runs.
+
+    A Task drives its coroutine with send()/throw(), one call per
+    scheduling slice: from being picked off the ready queue to the next
+    await that suspends. Wrapping the coroutine counts those slices and
+    measures each one, without changing the wrapped code. A task that
+    waits 2s on I/O shows a few short slices; one that burns 2s of CPU
+    shows up as on-loop time and a long longest_slice.
+
+    With a TraceBuffer, every slice and the task's whole span (first
+    slice to completion) are also recorded as timeline events.
+
+    Example:
+        >>> timer = SliceTimer(fetch())
+        >>> await asyncio.create_task(timer)
+        >>> timer.slices, timer.cpu_time, timer.longest_slice
+    """
+
+    __slots__ = (
+        "_coro", "__name__", "slices", "cpu_time", "on_loop_time", "longest_slice",
+        "_trace", "_name_id", "_lane", "_first_slice", "_done"
+    )
+
+    def __init__(self, coro, trace: Optional[TraceBuffer] = None, name: Optional[str] = None):
+        """
+        Args:
+            coro: Coroutine to run and time
+            trace: Buffer to record slice and task events into
+            name: Event name on the trace (default: the coroutine's name)
+        """
+        self._coro = coro
+        # Shown in the Task's repr instead of the wrapper's class name
+        self.__name__ = getattr(coro, "__qualname__", type(coro).__name__)
+        self.slices = 0
+        self.cpu_time = 0.0
+        self.on_loop_time = 0.0
+        self.longest_slice = 0.0
+        self._trace = trace
+        self._name_id = trace.intern(name or self.__name__) if trace is not None else 0
+        self._lane = None
+        self._first_slice = 0.0
+        self._done = False
+
+    def send(self, value):
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            return self._coro.send(value)
+        except BaseException:
+            # StopIteration (returned) or an exception: the task is over
+            self._done = True
+            raise
+        finally:
+            self._record(wall, cpu)
+
+    def throw(self, *args):
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            return self._coro.throw(*args)
+        except BaseException:
+            self._done = True
+            raise
+        finally:
+            self._record(wall, cpu)
+
+    def close(self):
+        return self._coro.close()
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    def _record(self, wall: float, cpu: float) -> None:
+        elapsed = time.perf_counter() - wall
+        self.cpu_time += time.thread_time() - cpu
+        self.slices += 1
+        self.on_loop_time += elapsed
+        if elapsed > self.longest_slice:
+            self.longest_slice = elapsed
+        trace = self._trace
+        if trace is not None:
+            if self._lane is None:
+                self._lane = trace.acquire_lane()
+                self._first_slice = wall
+            trace.record(SLICE, self._name_id, self._lane, wall, elapsed)
+            if self._done:
+                trace.record(TASK, self._name_id, self._lane, self._first_slice, wall + elapsed - self._first_slice)
+                trace.release_lane(self._lane)
+
 
 class EventLoopMonitor:
     """
@@ -10,9 +105,20 @@ class EventLoopMonitor:
     
     Tracks when tasks start, end, and how long they take.
     Useful for understanding event loop behavior and finding bottlenecks.
+
+    Each task also runs under a SliceTimer, so the timeline shows how
+    often it was scheduled and how much of its duration it actually held
+    the loop, separating tasks that wait from tasks that hog the loop.
+    Pass a TraceBuffer to also record tasks, slices and blocking
+    detections for a trace viewer.
     """
     
-    def __init__(self):
+    def __init__(self, trace: Optional[TraceBuffer] = None):
+        """
+        Args:
+            trace: Buffer to record timeline events into (see TraceBuffer)
+        """
+        self.trace = trace
         self.executions: List[TaskExecution] = []
         self._start_time: float = 0.0
     
@@ -50,54 +156,51 @@ class EventLoopMonitor:
         # - Build ExecutionTimeline from results
 
         if task_names is None:
-            task_names = [f'Task: {i}' for i in ramge(len(tasks))]
+            task_names = [f'Task: {i}' for i in range(len(tasks))]
         
         self._start_time = time.perf_counter()
 
-        wrapped_tasks = [self._wrap_task(tasks[i], task_names[i]) for i in range(len(task_names))]
+        timers = [
+            SliceTimer(self._wrap_task(tasks[i], task_names[i]), self.trace, task_names[i])
+            for i in range(len(task_names))
+        ]
 
-        self.executions = await asyncio.gather(*wrapped_tasks)
+        self.executions = await asyncio.gather(*timers)
+
+        for execution, timer in zip(self.executions, timers):
+            execution.slices = timer.slices
+            execution.cpu_time = timer.cpu_time
+            execution.on_loop_time = timer.on_loop_time
+            execution.longest_slice = timer.longest_slice
         
         end_time = time.perf_counter()
 
         duration = end_time - self._start_time
 
-        executionTimeline = ExecutionTimeline(executions = self.executions, total_duration = duration)
+        executionTimeline = ExecutionTimeline(executions = self.executions, total_duration = duration, started_at = self._start_time)
 
         return executionTimeline
-    
-async def run_with_full_analysis(
-    self,
-    tasks: List[Callable],
-    task_names: List[str] = None,
-    detect_blocking: bool = True
-) -> tuple[ExecutionTimeline, BlockingReport]:
-    """
-    Run tasks with both timing and blocking detection.
-    
-    Returns:
-        (timeline, blocking_report)
-    """
-    # Your implementation
-    # Should run tasks with monitoring AND blocking detection
 
-    if task_names is None:
-            task_names = [f'Task: {i}' for i in ramge(len(tasks))]
+    async def run_with_full_analysis(
+        self,
+        tasks: List[Callable],
+        task_names: List[str] = None,
+        detect_blocking: bool = True
+    ) -> tuple[ExecutionTimeline, BlockingReport]:
+        """
+        Run tasks with both timing and blocking detection.
         
-    self._start_time = time.perf_counter()
-
-    wrapped_tasks = [self._wrap_task(tasks[i], task_names[i]) for i in range(len(task_names))]
-
-    if detect_blocking:
-        detector = BlockingDetector()
-        report, timeline = detector.run_with_detection(asyncio.gather(*wrapped_tasks))
-
-    self.executions = await asyncio.gather(*wrapped_tasks)
-    
-    end_time = time.perf_counter()
-
-    duration = end_time - self._start_time
+        Returns:
+            (timeline, blocking_report)
+        """
+        if not detect_blocking:
+            timeline = await self.run_with_monitoring(tasks, task_names)
+            return timeline, BlockingReport(detections=[], total_blocking_time=0.0, worst_offender=None)
 
-    executionTimeline = ExecutionTimeline(executions = self.executions, total_duration = duration)
+        detector = BlockingDetector(trace=self.trace)
+        report, timeline = await detector.run_with_detection(
+            self.run_with_monitoring(tasks, task_names),
+            task_name="run_with_full_analysis"
+        )
 
-    return executionTimeline
\ No newline at end of file
+        return timeline, report
@@ -0,0 +1,204 @@
+import asyncio
+import collections
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from .blocking_detector import _ASYNCIO_DIR
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for code running on an event loop.
+
+    A background thread wakes every `interval` seconds, grabs the loop
+    thread's current stack with sys._current_frames() and asks asyncio
+    which Task is running. Samples are aggregated on the fly by (task,
+    stack), keyed by code objects, so memory depends on the number of
+    distinct stacks, not on how long it runs. Nothing is formatted until
+    export, and the monitored code isn't touched. That keeps it cheap
+    enough to leave on for minutes against a server under load.
+
+    Samples are weighted by the time since the previous one, so stacks
+    that hold the GIL (and delay the sampler) still get their full share.
+    Samples taken while no task runs are filed under "(no task)": time
+    spent idle in select() or in plain callbacks.
+
+    Output is folded stacks (one "root;...;leaf weight" line per stack,
+    for flamegraph.pl or speedscope) or a speedscope JSON file, with the
+    task as the root frame.
+
+    Example:
+        >>> profiler = SamplingProfiler(interval=0.005)
+        >>> profiler.start()  # from inside the loop, e.g. at lifespan startup
+        >>> ...
+        >>> profiler.stop()
+        >>> profiler.write_speedscope("profile.speedscope.json")
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64, by_task_name: bool = False):
+        """
+        Args:
+            interval: Seconds between samples
+            max_depth: Innermost frames kept per sample
+            by_task_name: Root stacks at each task's name (Task-42) instead
+                          of its coroutine, which merges all tasks running
+                          the same code (e.g. every request to one handler)
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self.by_task_name = by_task_name
+        self.samples = 0
+        self.sampling_time = 0.0  # seconds the sampler thread spent sampling
+        self._weights: Dict[Tuple[str, tuple], float] = collections.defaultdict(float)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._started_at = 0.0
+        self._duration = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start sampling the loop running in the calling thread."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling; collected samples stay available for export."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._duration += time.perf_counter() - self._started_at
+
+    async def __aenter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # Joining the sampler thread takes up to one interval; not on the loop
+        await asyncio.to_thread(self.stop)
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self._sample(now - last)
+            last = time.perf_counter()
+            self.sampling_time += last - now
+
+    def _sample(self, weight: float) -> None:
+        frame = sys._current_frames().get(self._thread_id)
+        if frame is None:
+            return
+        task = asyncio.current_task(self._loop)
+        codes = []
+        while frame is not None and len(codes) < self.max_depth:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        del frame
+        codes.reverse()
+
+        if task is None:
+            root = "(no task)"
+        else:
+            # Drop the loop's own frames (run_forever -> _run_once ->
+            # Handle._run) above the task's coroutine
+            start = 0
+            for i, code in enumerate(codes):
+                if code.co_filename.startswith(_ASYNCIO_DIR):
+                    start = i + 1
+                elif start:
+                    break
+            codes = codes[start:] or codes
+            if self.by_task_name:
+                root = f"task {task.get_name()}"
+            else:
+                coro = task.get_coro()
+                root = f"task {getattr(coro, '__qualname__', None) or getattr(coro, '__name__', type(coro).__name__)}"
+
+        self._weights[(root, tuple(codes))] += weight
+        self.samples += 1
+
+    @staticmethod
+    def _frame_name(code) -> str:
+        return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def folded(self) -> List[str]:
+        """Aggregated stacks in folded format, weights in microseconds"""
+
+        res = []
+        for (root, codes), weight in sorted(self._weights.items(), key=lambda item: -item[1]):
+            frames = [root] + [self._frame_name(code) for code in codes]
+            stack = ";".join(frame.replace(";", ",") for frame in frames)
+            res.append(f"{stack} {max(1, round(weight * 1e6))}")
+        return res
+
+    def write_folded(self, path: str) -> None:
+        """Write folded stacks for flamegraph.pl, inferno or speedscope"""
+
+        with open(path, "w") as f:
+            f.write("\n".join(self.folded()) + "\n")
+
+    def speedscope(self, name: str = "event loop") -> dict:
+        """Samples as a speedscope "sampled" profile, weights in seconds"""
+
+        frames = []
+        frame_index: Dict[object, int] = {}
+
+        def index(key, frame: dict) -> int:
+            if key not in frame_index:
+                frame_index[key] = len(frames)
+                frames.append(frame)
+            return frame_index[key]
+
+        samples = []
+        weights = []
+        for (root, codes), weight in self._weights.items():
+            stack = [index(root, {"name": root})]
+            for code in codes:
+                stack.append(index(code, {"name": code.co_qualname, "file": code.co_filename, "line": code.co_firstlineno}))
+            samples.append(stack)
+            weights.append(weight)
+
+        total = sum(weights)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": total,
+                "samples": samples,
+                "weights": weights,
+            }],
+            "name": name,
+            "exporter": "event_loop_profiler",
+        }
+
+    def write_speedscope(self, path: str, name: str = "event loop") -> None:
+        """Write a file that https://www.speedscope.app opens directly"""
+
+        with open(path, "w") as f:
+            json.dump(self.speedscope(name), f)
+
+    def overhead_ratio(self) -> float:
+        """Share of wall time the sampler thread spent taking samples"""
+
+        duration = self._duration + (time.perf_counter() - self._started_at if self.running else 0.0)
+        return self.sampling_time / duration if duration > 0 else 0.0
@@ -0,0 +1,154 @@
+import asyncio
+import functools
+import json
+import time
+from array import array
+from typing import Callable, Dict, Iterator, List
+
+# Event kinds, stored as one byte per event
+TASK = 0
+SLICE = 1
+BLOCKING = 2
+ATTEMPT = 3
+KIND_NAMES = ("task", "slice", "blocking", "attempt")
+
+# Lane (trace "thread") reserved for events of the loop as a whole
+LOOP_LANE = 0
+
+
+class TraceBuffer:
+    """
+    Preallocated, fixed-size buffer of timeline events.
+
+    Every event is a few numbers in parallel arrays (kind, name id, lane,
+    start, duration: 25 bytes), so recording one is a handful of array
+    stores and a 100k-task run doesn't build a dict or string per event.
+    Names are interned once. Once `capacity` events are stored, further
+    events are counted in `dropped` instead of growing the buffer.
+
+    Events land on lanes, shown as rows by trace viewers. Lane 0 is the
+    event loop itself (blocking detections); other lanes are handed out
+    to running tasks and reused once they finish, so the number of rows
+    follows peak concurrency rather than the number of tasks.
+
+    write_chrome_trace() streams the buffer as Chrome Trace Event JSON,
+    which chrome://tracing and https://ui.perfetto.dev open directly.
+
+    Example:
+        >>> trace = TraceBuffer()
+        >>> monitor = EventLoopMonitor(trace=trace)
+        >>> await monitor.run_with_full_analysis(tasks)
+        >>> trace.write_chrome_trace("run.trace.json")
+    """
+
+    def __init__(self, capacity: int = 500_000):
+        """
+        Args:
+            capacity: Maximum number of events kept
+        """
+        self.capacity = capacity
+        self.size = 0
+        self.dropped = 0
+        self.origin = time.perf_counter()  # trace time zero
+        self._kinds = array("B", bytes(capacity))
+        self._names = array("I", bytes(4 * capacity))
+        self._lanes = array("I", bytes(4 * capacity))
+        self._starts = array("d", bytes(8 * capacity))
+        self._durations = array("d", bytes(8 * capacity))
+        self._name_table: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self._free_lanes: List[int] = []
+        self._lane_count = 1
+
+    def intern(self, name: str) -> int:
+        """Id of an event name, to pass to record()"""
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self._name_table)
+            self._name_table.append(name)
+        return name_id
+
+    def acquire_lane(self) -> int:
+        if self._free_lanes:
+            return self._free_lanes.pop()
+        lane = self._lane_count
+        self._lane_count += 1
+        return lane
+
+    def release_lane(self, lane: int) -> None:
+        self._free_lanes.append(lane)
+
+    def record(self, kind: int, name_id: int, lane: int, start: float, duration: float) -> None:
+        """Store one event; start is a perf_counter() value, duration in seconds"""
+        i = self.size
+        if i >= self.capacity:
+            self.dropped += 1
+            return
+        self._kinds[i] = kind
+        self._names[i] = name_id
+        self._lanes[i] = lane
+        self._starts[i] = start
+        self._durations[i] = duration
+        self.size = i + 1
+
+    def clear(self) -> None:
+        self.size = 0
+        self.dropped = 0
+        self.origin = time.perf_counter()
+
+    def traced(self, func: Callable, name: str = None) -> Callable:
+        """
+        Wrap a coroutine function so each call is recorded as an attempt.
+
+        Pass the wrapper as Task.func to async-task-executor to see every
+        attempt (retries included) on the timeline. The wrapper is a
+        closure, so it can't be sent to a process pool or sharded run.
+        """
+        if not asyncio.iscoroutinefunction(func):
+            raise TypeError("traced() needs a coroutine function")
+        name_id = self.intern(name or getattr(func, "__qualname__", repr(func)))
+
+        @functools.wraps(func)
+        async def attempt(*args, **kwargs):
+            lane = self.acquire_lane()
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.record(ATTEMPT, name_id, lane, start, time.perf_counter() - start)
+                self.release_lane(lane)
+
+        return attempt
+
+    def events(self) -> Iterator[dict]:
+        """Stored events as Chrome trace "complete" events, oldest first"""
+        for i in range(self.size):
+            yield {
+                "name": self._name_table[self._names[i]],
+                "cat": KIND_NAMES[self._kinds[i]],
+                "ph": "X",
+                "ts": (self._starts[i] - self.origin) * 1e6,
+                "dur": self._durations[i] * 1e6,
+                "pid": 1,
+                "tid": self._lanes[i],
+            }
+
+    def write_chrome_trace(self, path: str, process_name: str = "event loop") -> None:
+        """Write the buffer as Chrome Trace Event JSON, one event at a time"""
+        names = [json.dumps(name) for name in self._name_table]
+        kinds, name_ids, lanes = self._kinds, self._names, self._lanes
+        starts, durations, origin = self._starts, self._durations, self.origin
+
+        with open(path, "w") as f:
+            f.write('{"traceEvents":[\n')
+            f.write(json.dumps({"name": "process_name", "ph": "M", "pid": 1, "args": {"name": process_name}}))
+            for lane in range(self._lane_count):
+                label = "event loop" if lane == LOOP_LANE else f"lane {lane}"
+                f.write(f',\n{{"name":"thread_name","ph":"M","pid":1,"tid":{lane},"args":{{"name":"{label}"}}}}')
+            for i in range(self.size):
+                f.write(
+                    f',\n{{"name":{names[name_ids[i]]},"cat":"{KIND_NAMES[kinds[i]]}","ph":"X",'
+                    f'"ts":{(starts[i] - origin) * 1e6:.3f},"dur":{durations[i] * 1e6:.3f},'
+                    f'"pid":1,"tid":{lanes[i]}}}'
+                )
+            f.write(f'\n],"displayTimeUnit":"ms","otherData":{{"dropped":{self.dropped}}}}}\n')
@@ -0,0 +1,2 @@
+# tests/__init__.py
+# Empty file - just makes tests/ a package if needed
@@ -0,0 +1,91 @@
+import asyncio
+import time
+import pytest
+from event_loop_profiler.blocking_detector import BlockingDetector
+from event_loop_profiler.trace import TraceBuffer
+
+
+def hog():
+    time.sleep(0.3)
+
+
+def blocker():
+    time.sleep(0.2)
+
+
+def crunch(n):
+    return sum(i * i for i in range(n))
+
+
+@pytest.mark.asyncio
+async def test_watchdog_captures_blocking_stack():
+    """Test that a time.sleep stall is detected together with the call that blocked"""
+
+    async def handler():
+        await asyncio.sleep(0.05)
+        hog()
+        await asyncio.sleep(0.05)
+        return "done"
+
+    detector = BlockingDetector(threshold_ms=50)
+    report, result = await detector.run_with_detection(handler, "handler")
+
+    assert result == "done"
+    [detection] = report.detections
+    assert detection.blocking_duration == pytest.approx(0.3, abs=0.05)
+    assert detection.severity == "Critical"
+    assert detection.blocking_call.startswith("hog (")
+    assert any(frame.startswith("handler (") for frame in detection.stack)
+    # No event loop internals in the reported stack
+    assert not any("base_events.py" in frame for frame in detection.stack)
+    assert detection.stack_samples > 5
+    assert "in hog (" in report.worst_offender
+
+
+@pytest.mark.asyncio
+async def test_back_to_back_blockers_reported_separately():
+    async def handler():
+        await asyncio.sleep(0.05)
+        hog()
+        blocker()
+        await asyncio.sleep(0.05)
+
+    trace = TraceBuffer()
+    report, _ = await BlockingDetector(threshold_ms=50, trace=trace).run_with_detection(handler)
+
+    first, second = report.detections
+    assert first.blocking_call.startswith("hog (")
+    assert first.blocking_duration == pytest.approx(0.3, abs=0.05)
+    assert second.blocking_call.startswith("blocker (")
+    assert second.blocking_duration == pytest.approx(0.2, abs=0.05)
+    assert [event["cat"] for event in trace.events()] == ["blocking", "blocking"]
+
+
+@pytest.mark.asyncio
+async def test_hot_loop_is_one_detection():
+    """Test that a CPU-bound loop moving between helpers isn't split up"""
+
+    async def handler():
+        await asyncio.sleep(0.05)
+        end = time.perf_counter() + 0.3
+        while time.perf_counter() < end:
+            crunch(20_000)
+            sum(range(20_000))
+        await asyncio.sleep(0.05)
+
+    report, _ = await BlockingDetector(threshold_ms=50).run_with_detection(handler)
+
+    [detection] = report.detections
+    assert detection.blocking_duration == pytest.approx(0.3, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_no_detection_without_blocking():
+    async def handler():
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+
+    report, _ = await BlockingDetector(threshold_ms=50).run_with_detection(handler)
+
+    assert report.detections == []
+    assert report.worst_offender is None
@@ -0,0 +1,72 @@
+import asyncio
+import time
+import pytest
+from event_loop_profiler.lag_sampler import LagHistogram, LagSampler
+
+
+def test_histogram_percentiles_within_precision():
+    histogram = LagHistogram()
+    for ms in range(1, 1001):
+        histogram.record(ms / 1000)
+
+    assert histogram.total == 1000
+    assert histogram.percentile(50) == pytest.approx(0.5, rel=1 / 32)
+    assert histogram.percentile(99) == pytest.approx(0.99, rel=1 / 32)
+    assert histogram.percentile(100) == histogram.max == 1.0
+    assert histogram.sum == pytest.approx(500.5)
+
+
+def test_histogram_extremes_and_reset():
+    histogram = LagHistogram(lowest=1e-6, highest=1.0)
+    histogram.record(0.0)
+    histogram.record(1e-9)
+    histogram.record(50.0)
+
+    assert histogram.counts[0] == 2
+    assert histogram.counts[-1] == 1
+    assert histogram.percentile(50) <= 2e-6
+    assert histogram.percentile(100) == 50.0
+
+    histogram.reset()
+    assert histogram.total == 0
+    assert histogram.percentile(99) == 0.0
+
+
+def test_sampler_rejects_bad_settings():
+    with pytest.raises(ValueError):
+        LagSampler(interval=0.0001)
+    with pytest.raises(ValueError):
+        LagSampler(capacity=0)
+
+
+@pytest.mark.asyncio
+async def test_sampler_measures_blocking():
+    """Test that a blocked loop shows up as one late sample"""
+
+    async with LagSampler(interval=0.01, capacity=4) as sampler:
+        await asyncio.sleep(0.05)
+        time.sleep(0.1)
+        await asyncio.sleep(0.05)
+
+    stats = sampler.stats()
+    recent = sampler.recent()
+
+    assert not sampler.running
+    assert stats.samples > 4
+    assert stats.max_ms >= 90
+    assert stats.p50_ms < 50
+    # Ring buffer keeps only the last `capacity` samples, oldest first
+    assert len(recent) == 4
+    assert max(recent) < 0.05
+
+
+@pytest.mark.asyncio
+async def test_sampler_reset():
+    sampler = LagSampler(interval=0.01)
+    sampler.start()
+    await asyncio.sleep(0.05)
+    sampler.reset()
+    sampler.stop()
+
+    assert sampler.stats().samples == 0
+    assert sampler.recent() == []
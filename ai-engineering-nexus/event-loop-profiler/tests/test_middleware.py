@@ -0,0 +1,106 @@
+import asyncio
+import json
+import time
+import pytest
+from event_loop_profiler.middleware import LoopHealthMiddleware, current_route
+
+
+async def app(scope, receive, send):
+    """Tiny ASGI app: /slow and the websocket block the loop, /fast doesn't"""
+
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            else:
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    app.routes_seen.append(current_route())
+    await asyncio.sleep(0.02)
+    if scope["path"] in ("/slow", "/ws1"):
+        time.sleep(0.2)
+    if scope["type"] == "http":
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+app.routes_seen = []
+
+
+async def call(middleware, scope_type="http", path="/", method="GET"):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": scope_type, "path": path}
+    if scope_type == "http":
+        scope["method"] = method
+    await middleware(scope, receive, send)
+    return sent
+
+
+@pytest.mark.asyncio
+async def test_stalls_are_charged_to_the_blocking_route():
+    middleware = LoopHealthMiddleware(app, threshold_ms=50)
+    try:
+        await asyncio.gather(
+            call(middleware, path="/fast"),
+            call(middleware, path="/slow", method="POST"),
+            call(middleware, "websocket", path="/ws1"),
+        )
+        await asyncio.sleep(0.05)
+        routes = middleware.snapshot()["routes"]
+    finally:
+        middleware.close()
+
+    assert sorted(app.routes_seen[-3:]) == ["GET /fast", "POST /slow", "WS /ws1"]
+    assert routes["POST /slow"]["stalls"] == 1
+    assert routes["POST /slow"]["stall_max_ms"] >= 150
+    assert routes["WS /ws1"]["stalls"] == 1
+    assert routes["GET /fast"]["stalls"] == 0
+    assert routes["GET /fast"]["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_debug_endpoint_serves_json():
+    middleware = LoopHealthMiddleware(app, threshold_ms=50)
+    try:
+        await call(middleware, path="/fast")
+        start, body = await call(middleware, path="/debug/loop")
+    finally:
+        middleware.close()
+
+    assert start["status"] == 200
+    snapshot = json.loads(body["body"])
+    assert snapshot["threshold_ms"] == 50
+    assert "GET /fast" in snapshot["routes"]
+    assert "/debug/loop" not in "".join(snapshot["routes"])
+
+
+@pytest.mark.asyncio
+async def test_lifespan_starts_and_stops_the_watchdog():
+    middleware = LoopHealthMiddleware(app, threshold_ms=20)
+    messages = asyncio.Queue()
+    for message in ("lifespan.startup", "lifespan.shutdown"):
+        messages.put_nowait({"type": message})
+    sent = []
+
+    async def send(message):
+        sent.append(message["type"])
+        if message["type"] == "lifespan.startup.complete":
+            assert middleware.sampler.running
+            watchdogs.append(middleware._watchdog)
+
+    watchdogs = []
+    await middleware({"type": "lifespan"}, messages.get, send)
+
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    assert not middleware.sampler.running
+    # close() didn't wait for the thread, it stops on its own shortly after
+    await asyncio.sleep(0.05)
+    assert not watchdogs[0].is_alive()
@@ -0,0 +1,80 @@
+import asyncio
+import time
+import pytest
+from event_loop_profiler.monitor import EventLoopMonitor, SliceTimer
+
+
+def spin(seconds):
+    """Burn CPU on the loop thread"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def waiter():
+    await asyncio.sleep(0.1)
+    await asyncio.sleep(0.1)
+    return "waited"
+
+
+async def hog():
+    for _ in range(3):
+        spin(0.05)
+        await asyncio.sleep(0)
+    return "hogged"
+
+
+@pytest.mark.asyncio
+async def test_slice_timer_counts_steps():
+    timer = SliceTimer(waiter())
+    task = asyncio.create_task(timer)
+
+    assert await task == "waited"
+    # Start, two wake-ups after each sleep
+    assert timer.slices == 3
+    assert timer.on_loop_time < 0.01
+    assert "waiter" in repr(task)
+
+
+@pytest.mark.asyncio
+async def test_slice_timer_attributes_cpu_to_the_hog():
+    timers = [SliceTimer(waiter()), SliceTimer(hog())]
+
+    assert await asyncio.gather(*timers) == ["waited", "hogged"]
+
+    waiting, hogging = timers
+    assert hogging.slices == 4
+    assert hogging.on_loop_time == pytest.approx(0.15, abs=0.03)
+    assert hogging.cpu_time == pytest.approx(0.15, abs=0.03)
+    assert hogging.longest_slice == pytest.approx(0.05, abs=0.02)
+    # The other task was only waiting while the hog held the loop
+    assert waiting.on_loop_time < 0.01
+
+
+@pytest.mark.asyncio
+async def test_slice_timer_sees_exceptions():
+    async def broken():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    timer = SliceTimer(broken())
+
+    with pytest.raises(ValueError):
+        await asyncio.create_task(timer)
+    assert timer.slices == 2
+
+
+@pytest.mark.asyncio
+async def test_monitor_timeline_and_loop_hogs():
+    monitor = EventLoopMonitor()
+
+    timeline, report = await monitor.run_with_full_analysis(
+        [waiter, hog], ["waiter", "hog"], detect_blocking=False
+    )
+
+    waiting, hogging = timeline.executions
+    assert (waiting.task_name, hogging.task_name) == ("waiter", "hog")
+    assert waiting.duration >= 0.2
+    assert hogging.cpu_per_slice == pytest.approx(hogging.cpu_time / hogging.slices)
+    assert timeline.loop_hogs(limit=1)[0].startswith("hog: ")
+    assert report.detections == []
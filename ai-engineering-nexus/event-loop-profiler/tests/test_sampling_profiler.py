@@ -0,0 +1,78 @@
+import asyncio
+import json
+import time
+import pytest
+from event_loop_profiler.sampling_profiler import SamplingProfiler
+
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def crunch():
+    await asyncio.sleep(0)
+    spin(0.2)
+
+
+async def idle():
+    await asyncio.sleep(0.1)
+
+
+@pytest.mark.asyncio
+async def test_folded_stacks_attribute_time_to_task_and_frame():
+    async with SamplingProfiler(interval=0.002) as profiler:
+        await asyncio.gather(asyncio.create_task(crunch()), asyncio.create_task(idle()))
+
+    assert not profiler.running
+    assert profiler.samples > 20
+    assert 0 < profiler.overhead_ratio() < 0.5
+
+    weights = {}
+    for line in profiler.folded():
+        stack, weight = line.rsplit(" ", 1)
+        weights[stack] = int(weight)
+    spinning = [stack for stack in weights if stack.endswith(";spin (test_sampling_profiler.py:8)")]
+    assert spinning
+    assert all(stack.startswith("task crunch;crunch (") for stack in spinning)
+    # Weights are microseconds of wall time
+    assert sum(weights[stack] for stack in spinning) == pytest.approx(200_000, rel=0.25)
+    # No event loop internals between the task root and its coroutine
+    assert not any("_run_once" in stack for stack in spinning)
+
+
+@pytest.mark.asyncio
+async def test_by_task_name_roots(tmp_path):
+    async with SamplingProfiler(interval=0.002, by_task_name=True) as profiler:
+        await asyncio.create_task(crunch(), name="worker-1")
+
+    path = tmp_path / "profile.folded"
+    profiler.write_folded(str(path))
+    lines = path.read_text().splitlines()
+
+    assert lines == profiler.folded()
+    assert any(line.startswith("task worker-1;") for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_speedscope_profile_is_consistent(tmp_path):
+    async with SamplingProfiler(interval=0.002) as profiler:
+        await crunch()
+
+    path = tmp_path / "profile.speedscope.json"
+    profiler.write_speedscope(str(path), name="test run")
+    document = json.loads(path.read_text())
+
+    frames = document["shared"]["frames"]
+    [profile] = document["profiles"]
+    assert document["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+    assert profile["type"] == "sampled" and profile["name"] == "test run"
+    assert len(profile["samples"]) == len(profile["weights"])
+    assert profile["endValue"] == pytest.approx(sum(profile["weights"]))
+    assert all(0 <= i < len(frames) for stack in profile["samples"] for i in stack)
+    names = {frames[i]["name"] for stack in profile["samples"] for i in stack}
+    assert "spin" in names
+    spin_frame = next(frame for frame in frames if frame["name"] == "spin")
+    assert spin_frame["file"].endswith("test_sampling_profiler.py")
+    assert spin_frame["line"] == 8
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import time
+import pytest
+from event_loop_profiler.monitor import EventLoopMonitor
+from event_loop_profiler.trace import ATTEMPT, BLOCKING, LOOP_LANE, TraceBuffer
+
+
+def test_record_and_capacity():
+    trace = TraceBuffer(capacity=2)
+    name = trace.intern("fetch")
+
+    assert trace.intern("fetch") == name
+    trace.record(BLOCKING, name, LOOP_LANE, trace.origin + 0.5, 0.25)
+    trace.record(ATTEMPT, name, 1, trace.origin + 1.0, 0.125)
+    trace.record(ATTEMPT, name, 1, trace.origin + 2.0, 0.125)
+
+    assert trace.size == 2
+    assert trace.dropped == 1
+    first, second = trace.events()
+    assert first == {
+        "name": "fetch",
+        "cat": "blocking",
+        "ph": "X",
+        "ts": pytest.approx(500_000),
+        "dur": pytest.approx(250_000),
+        "pid": 1,
+        "tid": LOOP_LANE,
+    }
+    assert second["cat"] == "attempt"
+
+
+def test_lanes_are_reused():
+    trace = TraceBuffer()
+    a, b = trace.acquire_lane(), trace.acquire_lane()
+    trace.release_lane(a)
+
+    assert LOOP_LANE not in (a, b)
+    assert trace.acquire_lane() == a
+
+
+@pytest.mark.asyncio
+async def test_traced_records_every_attempt():
+    trace = TraceBuffer()
+
+    async def fetch(page):
+        await asyncio.sleep(0.01)
+        if page == 2:
+            raise ValueError("bad page")
+        return page
+
+    traced = trace.traced(fetch)
+    assert await traced(1) == 1
+    with pytest.raises(ValueError):
+        await traced(2)
+
+    events = list(trace.events())
+    assert [event["cat"] for event in events] == ["attempt", "attempt"]
+    assert all(event["dur"] >= 10_000 for event in events)
+    assert events[0]["name"].endswith("fetch")
+
+    with pytest.raises(TypeError):
+        trace.traced(time.sleep)
+
+
+@pytest.mark.asyncio
+async def test_chrome_trace_file(tmp_path):
+    trace = TraceBuffer()
+
+    def hog():
+        time.sleep(0.1)
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        hog()
+
+    async def fast():
+        await asyncio.sleep(0.01)
+
+    monitor = EventLoopMonitor(trace=trace)
+    await monitor.run_with_full_analysis([slow, fast], ["slow", "fast"])
+
+    path = tmp_path / "run.trace.json"
+    trace.write_chrome_trace(str(path), process_name="test")
+    document = json.loads(path.read_text())
+
+    events = document["traceEvents"]
+    metadata = [event for event in events if event["ph"] == "M"]
+    complete = [event for event in events if event["ph"] == "X"]
+    assert metadata[0] == {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "test"}}
+    assert {"name": "thread_name", "ph": "M", "pid": 1, "tid": LOOP_LANE, "args": {"name": "event loop"}} in metadata
+    assert document["otherData"] == {"dropped": 0}
+    # The file holds exactly what events() yields, rounded to nanoseconds
+    assert len(complete) == trace.size
+    for written, expected in zip(complete, trace.events()):
+        assert written["name"] == expected["name"]
+        assert written["cat"] == expected["cat"]
+        assert written["tid"] == expected["tid"]
+        assert written["ts"] == pytest.approx(expected["ts"], abs=0.001)
+
+    by_name = {(event["cat"], event["name"]) for event in complete}
+    assert ("task", "slow") in by_name and ("task", "fast") in by_name
+    assert ("slice", "slow") in by_name
+    blocking = [event for event in complete if event["cat"] == "blocking"]
+    assert blocking and blocking[0]["tid"] == LOOP_LANE
+    assert "hog" in blocking[0]["name"]
+    assert blocking[0]["dur"] == pytest.approx(100_000, rel=0.3)
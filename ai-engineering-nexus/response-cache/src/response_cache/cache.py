@@ -0,0 +1,287 @@
+import collections
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple, Union
+
+_WORD = re.compile(r"\w+")
+_TOKEN = re.compile(r"\S+\s*|\s+")
+
+
+def normalize(prompt: str) -> str:
+    """Case, whitespace and trailing punctuation don't change the answer"""
+    return " ".join(prompt.lower().split()).rstrip("?!. ")
+
+
+# Words that phrase a question rather than say what it is about
+_FILLER = frozenset(
+    "a an the of to in on for and or me you i we it this that "
+    "what whats s how please tell explain about give".split()
+)
+
+# Auxiliaries that set the tense or mood of a question, so "what is X"
+# and "what was X" (or "can I" and "should I") are different questions
+_TENSE = frozenset(
+    "am is are was were be been being do does did has have had "
+    "will would shall should can could may might must".split()
+)
+
+# Never filler: "should I use X" and "should I not use X" (or "shouldn't",
+# split into "shouldn" and "t") are opposite questions
+_NEGATIONS = frozenset("no not never nor none neither without t".split())
+
+# Share of a prompt's squared norm that goes to its tense words
+_TENSE_SHARE = 0.2
+
+# Sparse feature dict, or a dense embedding such as a model returns
+Vector = Union[Mapping[str, float], Sequence[float]]
+
+
+def embed(text: str) -> Dict[str, float]:
+    """
+    Local sparse embedding of a prompt, as a unit-length feature dict.
+
+    Content words and pairs of consecutive content words carry the
+    weight; filler words barely count. Tense and modal words get a
+    fixed share of the vector whatever the prompt's length, enough
+    that a different tense never scores above 0.9 while dropping the
+    auxiliary still does. Cheap and deterministic, no model call.
+    Rephrasings score above 0.99 ("what's the capital of France" /
+    "tell me the capital of France"), "what is the capital of France"
+    / "what was the capital of France" about 0.83, and a changed key
+    word about 0.35 ("capital of France" / "capital of Germany").
+    """
+    words = _WORD.findall(text)
+    content = [word for word in words if word not in _FILLER and word not in _TENSE]
+    features: Dict[str, float] = collections.defaultdict(float)
+    tense: Dict[str, int] = collections.Counter()
+    for word in words:
+        if word in _TENSE:
+            tense[word] += 1
+        else:
+            features[word] += 0.1 if word in _FILLER else 1.0
+    for pair in zip(content, content[1:]):
+        features[" ".join(pair)] += 1.0
+    if tense:
+        rest = sum(w * w for w in features.values())
+        scale = math.sqrt(_TENSE_SHARE * rest / sum(n * n for n in tense.values())) if rest else 1.0
+        for word, n in tense.items():
+            features[word] = n * scale
+    norm = math.sqrt(sum(w * w for w in features.values())) or 1.0
+    return {feature: w / norm for feature, w in features.items()}
+
+
+def key_words(text: str) -> FrozenSet[str]:
+    """
+    Words of a prompt that a near-duplicate must share exactly.
+
+    Everything but filler: content words, tense words and negations. A
+    similar-tier hit is vetoed when these differ, however high the
+    cosine similarity, so "... in Python" never gets the answer cached
+    for "... in Java".
+    """
+    return frozenset(word for word in _WORD.findall(text) if word not in _FILLER or word in _NEGATIONS)
+
+
+def _unit(vector: Vector) -> Union[Mapping[str, float], Tuple[float, ...]]:
+    """Sparse vectors as given, dense ones as a unit-length tuple"""
+    if isinstance(vector, Mapping):
+        return vector
+    dense = tuple(map(float, vector))
+    norm = math.sqrt(math.sumprod(dense, dense)) or 1.0
+    return tuple(x / norm for x in dense)
+
+
+@dataclass
+class CachedAnswer:
+    text: str
+    created: float
+    latency: float  # seconds it took to generate the first time
+    vector: Union[Mapping[str, float], Tuple[float, ...]]
+
+
+class _SimilarityIndex:
+    """
+    Nearest cached prompt by cosine similarity.
+
+    Sparse vectors go in an inverted index, so only shared features are
+    scored; dense vectors (unit length) are scanned with one C-level dot
+    product each, which is fine for the few thousand entries a cache
+    holds.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[tuple, float]] = collections.defaultdict(dict)
+        self._dense: Dict[tuple, Tuple[float, ...]] = {}
+
+    def add(self, key: tuple, vector) -> None:
+        if not isinstance(vector, Mapping):
+            self._dense[key] = vector
+            return
+        for feature, weight in vector.items():
+            self._postings[feature][key] = weight
+
+    def remove(self, key: tuple, vector) -> None:
+        if not isinstance(vector, Mapping):
+            self._dense.pop(key, None)
+            return
+        for feature in vector:
+            postings = self._postings.get(feature)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[feature]
+
+    def ranked(self, vector, threshold: float) -> List[tuple]:
+        """Keys scoring at least threshold, most similar first"""
+        scores: Dict[tuple, float] = collections.defaultdict(float)
+        if isinstance(vector, Mapping):
+            for feature, weight in vector.items():
+                for key, other in self._postings.get(feature, {}).items():
+                    scores[key] += weight * other
+        else:
+            for key, other in self._dense.items():
+                if len(other) == len(vector):
+                    scores[key] = math.sumprod(vector, other)
+        keys = [key for key, score in scores.items() if score >= threshold]
+        keys.sort(key=scores.__getitem__, reverse=True)
+        return keys
+
+
+class ResponseCache:
+    """
+    Answers of earlier questions, replayed instead of calling the model.
+
+    Two tiers, both keyed by model: an exact match on the normalized
+    prompt, then (if similarity is set) the most similar cached prompt,
+    used when its cosine similarity is at least `similarity` and it has
+    the same key_words(): a differing content word or negation vetoes
+    the hit. Prompts are compared as vectors from `embedder`: the
+    default is a local sparse word embedding, but any function
+    returning a dense vector (e.g. a sentence-embedding model) works
+    too. Entries expire after `ttl` seconds and the least recently used
+    ones are evicted beyond `max_entries`.
+
+    The similarity tier is off by default: a wrong cached answer costs
+    more than a model call, so it is opt-in.
+
+    Example:
+        >>> cache = ResponseCache(ttl=3600, max_entries=1000)
+        >>> tokens = cache.stream(model, question, lambda: get_model_stream(...))
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        max_entries: int = 1000,
+        similarity: Optional[float] = None,
+        embedder: Callable[[str], Vector] = embed,
+    ):
+        """
+        Args:
+            ttl: Seconds an answer stays valid
+            max_entries: Answers kept; least recently used go first
+            similarity: Cosine similarity for a near-duplicate hit,
+                e.g. 0.9; None (the default) keeps exact matches only
+            embedder: Turns a normalized prompt into a vector: a sparse
+                unit-length feature dict like embed(), or a dense
+                sequence of floats (normalized here)
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self.embedder = embedder
+        self._entries: "collections.OrderedDict[tuple, CachedAnswer]" = collections.OrderedDict()
+        self._indexes: Dict[str, _SimilarityIndex] = collections.defaultdict(_SimilarityIndex)
+        self.lookups = 0
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.saved_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, model: str, prompt: str) -> Optional[CachedAnswer]:
+        """Cached answer for prompt (or a near-duplicate of it), if any"""
+        self.lookups += 1
+        normalized = normalize(prompt)
+        key = (model, normalized)
+        entry = self._live(key)
+        if entry is not None:
+            self.exact_hits += 1
+        elif self.similarity is not None:
+            words = key_words(normalized)
+            for similar in self._indexes[model].ranked(_unit(self.embedder(normalized)), self.similarity):
+                if key_words(similar[1]) != words:
+                    continue
+                entry = self._live(similar)
+                if entry is not None:
+                    key = similar
+                    self.similar_hits += 1
+                    break
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        self.saved_seconds += entry.latency
+        return entry
+
+    def put(self, model: str, prompt: str, text: str, latency: float) -> None:
+        normalized = normalize(prompt)
+        key = (model, normalized)
+        if key in self._entries:
+            self._remove(key)
+        vector = _unit(self.embedder(normalized)) if self.similarity is not None else {}
+        self._entries[key] = CachedAnswer(text=text, created=time.monotonic(), latency=latency, vector=vector)
+        if vector:
+            self._indexes[model].add(key, vector)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _live(self, key: tuple) -> Optional[CachedAnswer]:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.created > self.ttl:
+            self._remove(key)
+            return None
+        return entry
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key)
+        if entry.vector:
+            self._indexes[key[0]].remove(key, entry.vector)
+
+    async def stream(
+        self,
+        model: str,
+        prompt: str,
+        generate: Callable[[], AsyncIterator[Optional[str]]],
+    ) -> AsyncIterator[Optional[str]]:
+        """
+        Token stream for prompt: replayed from the cache, or generated and
+        then cached. Only streams that run to the end are cached.
+        """
+        entry = self.get(model, prompt)
+        if entry is not None:
+            for token in _TOKEN.findall(entry.text):
+                yield token
+            return
+
+        started = time.perf_counter()
+        parts = []
+        async for token in generate():
+            if token:
+                parts.append(token)
+            yield token
+        if parts:
+            self.put(model, prompt, "".join(parts), time.perf_counter() - started)
+
+    def stats(self) -> dict:
+        hits = self.exact_hits + self.similar_hits
+        return {
+            "entries": len(self._entries),
+            "lookups": self.lookups,
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "hit_rate": hits / self.lookups if self.lookups else 0.0,
+            "saved_seconds": self.saved_seconds,
+        }
@@ -0,0 +1,139 @@
+import pytest
+from response_cache.cache import ResponseCache, normalize
+
+
+async def model_tokens(*tokens):
+    for token in tokens:
+        yield token
+    yield None
+
+
+def test_normalize():
+    assert normalize("  What is   the Capital of France?? ") == "what is the capital of france"
+
+
+def test_exact_and_similar_hits():
+    cache = ResponseCache(similarity=0.9)
+    cache.put("gemini", "Tell me the capital of France", "Paris", latency=1.5)
+
+    assert cache.get("gemini", "tell me the capital of france!").text == "Paris"
+    assert cache.get("gemini", "What's the capital of France?").text == "Paris"
+    assert cache.get("gemini", "What's the capital of Germany?") is None
+    assert cache.get("other-model", "Tell me the capital of France") is None
+
+    stats = cache.stats()
+    assert stats["exact_hits"] == 1
+    assert stats["similar_hits"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["saved_seconds"] == 3.0
+
+
+def test_similarity_tier_is_opt_in():
+    cache = ResponseCache()
+    cache.put("gemini", "Tell me the capital of France", "Paris", latency=1.0)
+
+    assert cache.get("gemini", "What's the capital of France?") is None
+
+
+def test_ttl_and_lru_eviction(monkeypatch):
+    cache = ResponseCache(ttl=10, max_entries=2)
+    cache.put("gemini", "first question", "1", latency=1.0)
+    cache.put("gemini", "second question", "2", latency=1.0)
+    cache.get("gemini", "first question")
+    cache.put("gemini", "third question", "3", latency=1.0)
+
+    assert len(cache) == 2
+    assert cache.get("gemini", "second question") is None
+
+    now = __import__("time").monotonic()
+    monkeypatch.setattr("response_cache.cache.time.monotonic", lambda: now + 60)
+    assert cache.get("gemini", "first question") is None
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_replays_cached_answer():
+    cache = ResponseCache()
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return model_tokens("Paris ", "is the ", "capital.")
+
+    first = [t async for t in cache.stream("gemini", "Capital of France?", generate)]
+    second = [t async for t in cache.stream("gemini", "capital of france", generate)]
+
+    assert "".join(t for t in first if t) == "Paris is the capital."
+    assert "".join(second) == "Paris is the capital."
+    assert len(second) > 1  # replayed as a token stream
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_unfinished_stream_is_not_cached():
+    cache = ResponseCache()
+
+    async for _ in cache.stream("gemini", "question", lambda: model_tokens("a", "b")):
+        break
+
+    assert len(cache) == 0
+
+
+def test_tense_changes_the_question():
+    cache = ResponseCache(similarity=0.9)
+    cache.put("gemini", "What is the capital of France?", "Paris", latency=1.0)
+
+    assert cache.get("gemini", "What was the capital of France?") is None
+    assert cache.get("gemini", "What was the capital of France in 1500?") is None
+
+
+def test_different_content_word_is_a_miss():
+    # Scores 0.89 with the default embedding, right at a 0.9 threshold
+    cache = ResponseCache(similarity=0.85)
+    cache.put(
+        "gemini",
+        "How do I reverse a linked list in Python using recursion without extra memory and in O(n) time?",
+        "def reverse(node): ...",
+        latency=1.0,
+    )
+
+    assert cache.get(
+        "gemini",
+        "How do I reverse a linked list in Java using recursion without extra memory and in O(n) time?",
+    ) is None
+
+
+def test_negation_is_a_miss():
+    # Scores 0.96 with the default embedding
+    cache = ResponseCache(similarity=0.9)
+    cache.put(
+        "gemini",
+        "Should I use asyncio for a web scraper that makes thousands of concurrent HTTP requests?",
+        "YES",
+        latency=1.0,
+    )
+
+    for question in [
+        "Should I not use asyncio for a web scraper that makes thousands of concurrent HTTP requests?",
+        "Shouldn't I use asyncio for a web scraper that makes thousands of concurrent HTTP requests?",
+    ]:
+        assert cache.get("gemini", question) is None
+
+
+def test_dense_embedder():
+    vectors = {
+        "tell me the capital of france": [0.9, 0.1, 0.0],
+        "what's the capital of france": [1.8, 0.25, 0.0],  # not unit length
+        "tell me the capital of germany": [0.9, 0.1, 0.0],  # a poor embedder
+        "tell me the history of rome": [0.1, 0.9, 0.2],
+    }
+    cache = ResponseCache(similarity=0.9, embedder=lambda prompt: vectors[prompt])
+    cache.put("gemini", "Tell me the capital of France", "Paris", latency=1.0)
+
+    assert cache.get("gemini", "What's the capital of France?").text == "Paris"
+    assert cache.get("gemini", "Tell me the capital of Germany") is None  # vetoed
+    assert cache.get("gemini", "Tell me the history of Rome") is None
+
+    cache.put("gemini", "Tell me the capital of France", "Paris!", latency=1.0)
+    assert len(cache) == 1
+    assert cache.get("gemini", "What's the capital of France?").text == "Paris!"